@@ -0,0 +1,250 @@
+"""
+Project 5: Deque
+async_deque.py
+asyncio-native deque with awaitable put/get at both ends
+"""
+
+import asyncio
+import sys
+from collections import deque as waiter_queue
+from typing import TypeVar, List
+
+from solution import CircularDeque, ResizePolicy, _memory_report
+
+T = TypeVar('T')
+
+
+class AsyncCircularDeque:
+    """
+    CircularDeque for asyncio tasks, with awaitable put/get at both ends
+    Tasks that cannot proceed wait on a future of their own, kept in a FIFO queue per side, and every put or get wakes
+    exactly one waiter on the other side, so waiters are served in arrival order with no polling or spurious wakeups.
+    With a maxlen, put waits for a free slot, giving producers backpressure.
+    Like asyncio.Queue, it is not thread-safe and must be used from a single event loop.
+    """
+
+    __slots__ = ['deque', 'maxlen', 'getters', 'putters']
+
+    def __init__(self, maxlen: int = None, policy: ResizePolicy = None) -> None:
+        """
+        Creates an empty AsyncCircularDeque
+        :param maxlen: if given, put waits (and put_nowait raises asyncio.QueueFull) while this many items are queued
+        :param policy: growth and shrink rules for the underlying CircularDeque
+        :return: None
+        """
+        if maxlen is not None and maxlen < 1:
+            raise ValueError(f"maxlen must be at least 1, got {maxlen}")
+        self.deque: CircularDeque = CircularDeque(policy=policy)
+        self.maxlen: int = maxlen
+        self.getters = waiter_queue()
+        self.putters = waiter_queue()
+
+    def __len__(self) -> int:
+        """
+        :return: the number of queued items
+        """
+        return self.deque.size
+
+    def is_empty(self) -> bool:
+        """
+        :return: True if no items are queued
+        """
+        return self.deque.size == 0
+
+    def is_full(self) -> bool:
+        """
+        :return: True if the deque is bounded and holds maxlen or more items
+        """
+        return self.maxlen is not None and self.deque.size >= self.maxlen
+
+    def memory_usage(self, deep: bool = False) -> dict:
+        """
+        Accounts for the memory held by the underlying CircularDeque and this wrapper, see
+        CircularDeque.memory_usage. The waiter queues are not counted.
+
+        Args:
+            deep (bool): If True, also counts the items themselves (each distinct object once).
+
+        Time Complexity:
+            O(1) - Constant time, or O(n) with deep.
+
+        Space Complexity:
+            O(1) - Constant space, or O(n) with deep to recognize shared items.
+
+        Returns:
+            dict: Bytes by kind: live, slack, overhead, payload and total.
+        """
+        usage = self.deque.memory_usage(deep)
+        return _memory_report(usage['live'], usage['slack'], usage['overhead'] + sys.getsizeof(self),
+                              usage['payload'])
+
+    @staticmethod
+    def _wakeup_next(waiters: waiter_queue) -> None:
+        """
+        Wakes the longest-waiting task that is still waiting
+        :param waiters: the getters or putters
+        :return: None
+        """
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def _wait(self, waiters: waiter_queue, timeout: float = None) -> bool:
+        """
+        Waits at the back of a waiter queue until woken
+        :param waiters: the getters or putters
+        :param timeout: the most seconds to wait, or None to wait until woken
+        :return: True if woken, False if the timeout elapsed first
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            if timeout is None:
+                await waiter
+            else:
+                await asyncio.wait_for(waiter, timeout)
+        except BaseException as error:
+            if waiter.done() and not waiter.cancelled():
+                # Woken just as the wait was abandoned, so hand the wakeup to the next waiter
+                self._wakeup_next(waiters)
+            try:
+                waiters.remove(waiter)
+            except ValueError:
+                pass
+            if isinstance(error, asyncio.TimeoutError):
+                return False
+            raise
+        return True
+
+    def put_nowait(self, item: T, front: bool = False) -> None:
+        """
+        Adds an item to the back (or front) without waiting.
+
+        Args:
+            item (T): The item to add.
+            front (bool): If True, adds the item to the front; if False, adds it to the back.
+
+        Time Complexity:
+            O(1)* - Amortized constant time.
+
+        Space Complexity:
+            O(1)* - Amortized constant space.
+
+        Returns:
+            None
+        """
+        if self.is_full():
+            raise asyncio.QueueFull
+        self.deque.enqueue(item, front)
+        self._wakeup_next(self.getters)
+
+    async def put(self, item: T, front: bool = False) -> None:
+        """
+        Adds an item to the back (or front), first waiting for a free slot if the deque is bounded and full.
+
+        Args:
+            item (T): The item to add.
+            front (bool): If True, adds the item to the front; if False, adds it to the back.
+
+        Time Complexity:
+            O(1)* - Amortized constant time once a slot is free.
+
+        Space Complexity:
+            O(1)* - Amortized constant space.
+
+        Returns:
+            None
+        """
+        while self.is_full():
+            await self._wait(self.putters)
+        self.put_nowait(item, front)
+
+    def get_nowait(self, front: bool = True) -> T:
+        """
+        Removes and returns the front (or back) item without waiting.
+
+        Args:
+            front (bool): If True, removes the front item; if False, removes the back item.
+
+        Time Complexity:
+            O(1)* - Amortized constant time.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            T: The removed item.
+        """
+        if self.deque.size == 0:
+            raise asyncio.QueueEmpty
+        item = self.deque.dequeue(front)
+        self._wakeup_next(self.putters)
+        return item
+
+    async def get(self, front: bool = True) -> T:
+        """
+        Removes and returns the front (or back) item, first waiting for one if the deque is empty.
+
+        Args:
+            front (bool): If True, removes the front item; if False, removes the back item.
+
+        Time Complexity:
+            O(1)* - Amortized constant time once an item is available.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            T: The removed item.
+        """
+        while self.deque.size == 0:
+            await self._wait(self.getters)
+        return self.get_nowait(front)
+
+    async def get_many(self, n: int, timeout: float = None, front: bool = True) -> List[T]:
+        """
+        Removes and returns n items from the front (or back), waiting until n have arrived or the timeout elapses.
+        Available items are taken in batches with popmany. If the call is cancelled, the items it has taken are put
+        back where they came from, and one waiting getter is woken for each. Putting them back never drops an item, so
+        puts made in the meantime may leave a bounded deque holding more than maxlen items; put waits until it is
+        below maxlen again.
+
+        Args:
+            n (int): The number of items to remove.
+            timeout (float): The most seconds to wait, or None to wait for all n items.
+            front (bool): If True, removes items from the front; if False, removes them from the back.
+
+        Time Complexity:
+            O(k)* - Amortized linear time in the number of items removed.
+
+        Space Complexity:
+            O(k) - Linear space in the number of items removed.
+
+        Returns:
+            List[T]: The removed items in the order repeated gets would return them, fewer than n on a timeout.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        items = []
+        try:
+            while True:
+                if self.deque.size:
+                    batch = self.deque.popmany(n - len(items), front)
+                    items.extend(batch)
+                    for _ in range(len(batch)):
+                        self._wakeup_next(self.putters)
+                if len(items) >= n:
+                    return items
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    return items
+                if not await self._wait(self.getters, remaining):
+                    return items
+        except asyncio.CancelledError:
+            # Undo the partial batch in reverse so the items keep their order at that end
+            for item in reversed(items):
+                self.deque.enqueue(item, front)
+                self._wakeup_next(self.getters)
+            raise
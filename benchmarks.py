@@ -0,0 +1,885 @@
+"""
+Project 5: Deque
+benchmarks.py
+Headless, reproducible benchmarks for every deque backend (replaces plot_speed)
+
+Usage:
+    python benchmarks.py                                  # every scenario, printed as a table
+    python benchmarks.py grow random --sizes 1000 10000   # selected scenarios and sizes
+    python benchmarks.py --json out.json --csv out.csv    # save the results
+    python benchmarks.py --baseline out.json              # flag regressions against saved results
+    python benchmarks.py --memory                         # bytes held by every backend instead of timings
+"""
+
+import argparse
+import csv
+import gc
+import json
+import math
+import multiprocessing
+import pickle
+import queue
+import random
+import statistics
+import sys
+import tempfile
+import threading
+from time import sleep
+from timeit import default_timer
+from typing import Callable, Dict, List
+
+from solution import CircularDeque, TypedCircularDeque, CDLL, CDLLCD, UnrolledCDLLCD, ResizePolicy
+from concurrent_deque import ConcurrentCircularDeque, SPSCCircularDeque
+from shared_deque import SharedCircularDeque
+from durable_deque import DurableDeque
+from sliding_window import SlidingWindow
+from scheduler import LaneScheduler
+
+# Each backend is built empty by calling its factory
+BACKENDS: Dict[str, Callable[[], object]] = {
+    'array': CircularDeque,
+    'typed': lambda: TypedCircularDeque(dtype=int),
+    'cdll': CDLLCD,
+    'unrolled': UnrolledCDLLCD,
+}
+
+DEFAULT_SIZES = [100 * i for i in range(5, 200, 20)]
+
+
+def max_len_subarray(data: List[int], bound: int, structure) -> int:
+    """
+    returns the length of the largest subarray of `data` with sum less or eq to than `bound`
+    :param data: list of integers to operate on
+    :param bound: largest allowable sum
+    :param structure: any of the deque backends
+    :return: the length
+    """
+    index, max_len, subarray_sum = 0, 0, 0
+    while index < len(data):
+
+        while subarray_sum <= bound and index < len(data):
+            structure.enqueue(data[index])
+            subarray_sum += data[index]
+            index += 1
+        max_len = max(max_len, subarray_sum)
+
+        while subarray_sum > bound:
+            subarray_sum -= structure.dequeue(False)
+
+    return max_len
+
+
+# ============ Scenarios ============#
+# A scenario takes a size and a seeded random generator and returns one benchmark callable per variant.
+# All randomness is drawn up front, so every variant replays exactly the same operations.
+
+def scenario_grow(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    (1) Grow large: enqueue shuffled items to alternating ends
+    """
+    data = list(range(size))
+    rng.shuffle(data)
+
+    def bench(make):
+        def run():
+            deque = make()
+            for item in data:
+                deque.enqueue(item, item % 2)
+        return run
+
+    return {name: bench(make) for name, make in BACKENDS.items()}
+
+
+def scenario_grow_shrink(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    (2) Grow large then shrink to zero
+    """
+    data = list(range(size))
+    rng.shuffle(data)
+
+    def bench(make):
+        def run():
+            deque = make()
+            for item in data:
+                deque.enqueue(item, item % 2)
+            for item in data:
+                deque.dequeue(not item % 2)
+        return run
+
+    return {name: bench(make) for name, make in BACKENDS.items()}
+
+
+def scenario_random(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    (3) Random operations: three enqueues to every dequeue on average
+    """
+    data = list(range(size))
+    rng.shuffle(data)
+    ops = [(item, rng.randint(0, 3) <= 2) for item in data]
+
+    def bench(make):
+        def run():
+            deque = make()
+            for item, enqueue in ops:
+                if enqueue:
+                    deque.enqueue(item, item % 2)
+                else:
+                    deque.dequeue(item % 2)
+        return run
+
+    return {name: bench(make) for name, make in BACKENDS.items()}
+
+
+def scenario_sliding_window(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    (4) A common application: the sliding window in max_len_subarray, with size as the window bound
+    """
+    data = [rng.randint(0, 1) for _ in range(5000)]
+
+    def bench(make):
+        def run():
+            max_len_subarray(data, size, make())
+        return run
+
+    return {name: bench(make) for name, make in BACKENDS.items()}
+
+
+def scenario_extend(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Bulk loading: per-item enqueue against extend/extendleft
+    """
+    data = list(range(size))
+    rng.shuffle(data)
+    odd = [item for item in data if item % 2]
+    even = [item for item in data if not item % 2]
+
+    def enqueue_loop():
+        deque = CircularDeque()
+        for item in data:
+            deque.enqueue(item, item % 2)
+
+    def extend():
+        deque = CircularDeque()
+        deque.extendleft(odd)
+        deque.extend(even)
+
+    return {'enqueue': enqueue_loop, 'extend': extend}
+
+
+def scenario_thrash(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Resize thrash: swing between half full and full across a grow and shrink boundary
+    """
+    # Filling to a power of two grows just as the fill completes
+    top = max(4, 1 << (size - 1).bit_length())
+    policies = {'default': None,
+                'shrink_1/8': ResizePolicy(shrink_threshold=0.125),
+                'never_shrink': ResizePolicy(shrink=False)}
+
+    def bench(policy):
+        def run():
+            deque = CircularDeque(policy=policy)
+            deque.extend(range(top))
+            for cycle in range(20):
+                for item in range(top // 2):
+                    deque.dequeue(False)
+                for item in range(top // 2):
+                    deque.enqueue(item, False)
+        return run
+
+    return {name: bench(policy) for name, policy in policies.items()}
+
+
+def scenario_churn(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Node churn: a steady population of 64 while every item passes through a CDLLCD, with and without the node pool.
+    Each run returns the pool's hit and miss counts, misses being node allocations
+    """
+    data = list(range(size))
+    rng.shuffle(data)
+
+    def bench(pool_size):
+        def run():
+            deque = CDLLCD(pool_size)
+            for item in data:
+                deque.enqueue(item, item % 2)
+                if len(deque) > 64:
+                    deque.dequeue(not item % 2)
+            stats = deque.CDLL.pool_stats()
+            return {'pool_hits': stats['hits'], 'allocations': stats['misses']}
+        return run
+
+    return {'cdll': bench(0), 'cdll_pooled': bench(1024)}
+
+
+def run_threads(producer: Callable[[int], None], consumer: Callable[[int], None], producers: int,
+                consumers: int, items: int) -> None:
+    """
+    Runs producer and consumer threads to completion, splitting the items evenly between them
+    :param producer: puts the given number of items
+    :param consumer: gets the given number of items
+    :param producers: number of producer threads
+    :param consumers: number of consumer threads
+    :param items: total number of items, rounded down to a multiple of both thread counts by the caller
+    :return: None
+    """
+    threads = [threading.Thread(target=producer, args=(items // producers,)) for _ in range(producers)]
+    threads += [threading.Thread(target=consumer, args=(items // consumers,)) for _ in range(consumers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def scenario_mpmc(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Multi-producer/multi-consumer throughput: 4 producers and 4 consumers pass size items through a bounded queue
+    """
+    workers = 4
+    items = size - size % workers
+
+    def bench_concurrent(batch):
+        def run():
+            shared = ConcurrentCircularDeque(maxlen=1024)
+
+            def producer(count):
+                for item in range(count):
+                    shared.put(item)
+
+            def consumer(count):
+                while count > 0:
+                    if batch:
+                        count -= len(shared.get_many(min(batch, count)))
+                    else:
+                        shared.get()
+                        count -= 1
+
+            run_threads(producer, consumer, workers, workers, items)
+        return run
+
+    def bench_queue():
+        shared = queue.Queue(maxsize=1024)
+
+        def producer(count):
+            for item in range(count):
+                shared.put(item)
+
+        def consumer(count):
+            for _ in range(count):
+                shared.get()
+
+        run_threads(producer, consumer, workers, workers, items)
+
+    return {'concurrent': bench_concurrent(0), 'concurrent_batched': bench_concurrent(64), 'queue.Queue': bench_queue}
+
+
+def scenario_spsc(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Single-producer/single-consumer handoff of size items
+    """
+    def bench_spsc():
+        ring = SPSCCircularDeque(1024)
+
+        def producer(count):
+            for item in range(count):
+                while not ring.enqueue(item):
+                    sleep(0)
+
+        def consumer(count):
+            while count > 0:
+                if ring.dequeue() is None:
+                    sleep(0)
+                else:
+                    count -= 1
+
+        run_threads(producer, consumer, 1, 1, size)
+
+    def bench_locked():
+        shared = ConcurrentCircularDeque(maxlen=1024)
+
+        def producer(count):
+            for item in range(count):
+                shared.put(item)
+
+        def consumer(count):
+            for _ in range(count):
+                shared.get()
+
+        run_threads(producer, consumer, 1, 1, size)
+
+    def bench_simple_queue():
+        shared = queue.SimpleQueue()
+
+        def producer(count):
+            for item in range(count):
+                shared.put(item)
+
+        def consumer(count):
+            for _ in range(count):
+                shared.get()
+
+        run_threads(producer, consumer, 1, 1, size)
+
+    return {'spsc': bench_spsc, 'concurrent': bench_locked, 'queue.SimpleQueue': bench_simple_queue}
+
+
+def _shared_producer(shared: SharedCircularDeque, count: int, record: bytes) -> None:
+    """
+    Enqueues count copies of a record, spinning while the deque is full; runs in a child process
+    :param shared: the deque, attached to the parent's block
+    :param count: number of records to enqueue
+    :param record: the record to enqueue
+    :return: None
+    """
+    for _ in range(count):
+        while not shared.enqueue(record, front=False):
+            sleep(0)
+    shared.close()
+
+
+def _queue_producer(shared: multiprocessing.Queue, count: int, record: bytes) -> None:
+    """
+    Puts count copies of a record on a multiprocessing.Queue; runs in a child process
+    :param shared: the queue
+    :param count: number of records to put
+    :param record: the record to put
+    :return: None
+    """
+    for _ in range(count):
+        shared.put(record)
+
+
+def scenario_multiprocess(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Cross-process throughput: 1, 2, 4 or 8 producer processes send size 64-byte records to the parent process,
+    including the cost of starting the processes
+    """
+    record = bytes(rng.getrandbits(8) for _ in range(64))
+
+    def bench_shared(processes):
+        items = size - size % processes
+
+        def run():
+            with SharedCircularDeque(capacity=1024, record_size=len(record)) as shared:
+                workers = [multiprocessing.Process(target=_shared_producer, args=(shared, items // processes, record))
+                           for _ in range(processes)]
+                for worker in workers:
+                    worker.start()
+                count = items
+                while count > 0:
+                    if shared.dequeue() is None:
+                        sleep(0)
+                    else:
+                        count -= 1
+                for worker in workers:
+                    worker.join()
+        return run
+
+    def bench_queue(processes):
+        items = size - size % processes
+
+        def run():
+            shared = multiprocessing.Queue(maxsize=1024)
+            workers = [multiprocessing.Process(target=_queue_producer, args=(shared, items // processes, record))
+                       for _ in range(processes)]
+            for worker in workers:
+                worker.start()
+            for _ in range(items):
+                shared.get()
+            for worker in workers:
+                worker.join()
+            shared.close()
+            shared.join_thread()
+        return run
+
+    variants = {}
+    for processes in (1, 2, 4, 8):
+        variants[f'shared_{processes}p'] = bench_shared(processes)
+        variants[f'mp.Queue_{processes}p'] = bench_queue(processes)
+    return variants
+
+
+def scenario_durability(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Durable deque throughput under each fsync policy: size enqueues to the back, then size dequeues from the front,
+    with a snapshot every size // 2 operations
+    """
+    values = [rng.randint(0, 1 << 30) for _ in range(size)]
+
+    def bench(fsync, batch=0):
+        def run():
+            with tempfile.TemporaryDirectory() as directory:
+                with DurableDeque(directory, fsync=fsync, snapshot_every=max(1, size // 2)) as deque:
+                    if batch:
+                        for start in range(0, size, batch):
+                            with deque.batch():
+                                for value in values[start:start + batch]:
+                                    deque.enqueue(value, False)
+                        for start in range(0, size, batch):
+                            with deque.batch():
+                                for _ in range(min(batch, size - start)):
+                                    deque.dequeue()
+                    else:
+                        for value in values:
+                            deque.enqueue(value, False)
+                        for _ in range(size):
+                            deque.dequeue()
+        return run
+
+    return {'fsync_always': bench('always'), 'fsync_always_batched': bench('always', 64),
+            'fsync_interval': bench('interval'), 'fsync_never': bench('never')}
+
+
+def scenario_checkpoint(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Serializing a deque of size items that has wrapped around its buffer
+    """
+    values = [rng.randint(0, 1 << 30) for _ in range(size)]
+    half = size // 2
+
+    array_deque = CircularDeque()
+    array_deque.extend(values[half:])
+    array_deque.extendleft(values[:half])
+    typed = TypedCircularDeque(dtype=int)
+    typed.extend(values[half:])
+    typed.extendleft(values[:half])
+    linked = CDLLCD()
+    for value in values:
+        linked.enqueue(value, False)
+
+    return {'array_pickle': lambda: pickle.dumps(array_deque, pickle.HIGHEST_PROTOCOL),
+            'typed_pickle': lambda: pickle.dumps(typed, pickle.HIGHEST_PROTOCOL),
+            'typed_to_bytes': typed.to_bytes,
+            'cdll_pickle': lambda: pickle.dumps(linked, pickle.HIGHEST_PROTOCOL)}
+
+
+def scenario_window_stats(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Sum, mean, min and max over the last 100 of size samples, read after every sample (after every batch of 50 for
+    push_many)
+    """
+    samples = [rng.uniform(-1000, 1000) for _ in range(size)]
+    width = 100
+
+    def bench_window():
+        window = SlidingWindow(width)
+        for value in samples:
+            window.push(value)
+            window.sum(), window.mean(), window.min(), window.max()
+
+    def bench_recompute():
+        window = CircularDeque(maxlen=width)
+        for value in samples:
+            window.enqueue(value, False)
+            total = sum(window)
+            total, total / len(window), min(window), max(window)
+
+    def bench_batched():
+        window = SlidingWindow(width)
+        for start in range(0, size, width // 2):
+            window.push_many(samples[start:start + width // 2])
+            window.sum(), window.mean(), window.min(), window.max()
+
+    return {'sliding_window': bench_window, 'push_many': bench_batched, 'recompute': bench_recompute}
+
+
+def scenario_lanes(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Priority scheduling over 64 lanes: size items pushed to random lanes, mostly low priority, then all popped
+    """
+    lanes = 64
+    pushes = [min(lanes - 1, int(rng.expovariate(0.2))) for _ in range(size)]
+    pushes = [lanes - 1 - lane for lane in pushes]
+
+    def bench_scheduler(batch, fair=False):
+        def run():
+            scheduler = LaneScheduler(lanes)
+            for item, lane in enumerate(pushes):
+                scheduler.push(item, lane)
+            if batch:
+                while scheduler.size:
+                    scheduler.pop_many(batch, fair)
+            else:
+                pop = scheduler.pop_fair if fair else scheduler.pop
+                for _ in range(size):
+                    pop()
+        return run
+
+    def bench_scan():
+        deques = [CircularDeque() for _ in range(lanes)]
+        for item, lane in enumerate(pushes):
+            deques[lane].enqueue(item, False)
+        for _ in range(size):
+            for deque in deques:
+                if deque.size:
+                    deque.dequeue()
+                    break
+
+    return {'scheduler': bench_scheduler(0), 'scheduler_batched': bench_scheduler(64),
+            'scheduler_fair': bench_scheduler(0, True), 'scan': bench_scan}
+
+
+def scenario_wrapper(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Per-operation cost of the CDLLCD wrapper: size enqueues and dequeues at random ends through the CDLLCD, through
+    the calls its enqueue and dequeue used to make (CDLL.insert, and is_empty / front_element / remove), and straight
+    on a CDLL
+    """
+    ends = [rng.random() < 0.5 for _ in range(size)]
+
+    def fused():
+        deque = CDLLCD()
+        enqueue, dequeue = deque.enqueue, deque.dequeue
+        for front in ends:
+            enqueue(front, front)
+        for front in ends:
+            dequeue(front)
+
+    def unfused():
+        deque = CDLLCD()
+        for front in ends:
+            deque.CDLL.insert(front, front)
+        for front in ends:
+            if not deque.is_empty():
+                deque.front_element() if front else deque.back_element()
+                deque.CDLL.remove(front)
+
+    def bare():
+        cdll = CDLL()
+        insert, remove = cdll.insert, cdll.remove
+        for front in ends:
+            insert(front, front)
+        for front in ends:
+            remove(front)
+
+    return {'cdllcd': fused, 'cdllcd_unfused': unfused, 'cdll_bare': bare}
+
+
+def scenario_merge(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Merging work queues: 16 shards of size // 16 items each are merged into one queue, by relinking with
+    CDLLCD.splice or by draining each shard item by item
+    """
+    shards = 16
+    items = [rng.random() for _ in range(size // shards)]
+
+    def build():
+        queues = []
+        for _ in range(shards):
+            shard = CDLLCD()
+            for item in items:
+                shard.enqueue(item, False)
+            queues.append(shard)
+        return queues
+
+    def spliced():
+        merged = CDLLCD()
+        for shard in build():
+            merged.splice(shard, False)
+
+    def drained():
+        merged = CDLLCD()
+        for shard in build():
+            while not shard.is_empty():
+                merged.enqueue(shard.dequeue(), False)
+
+    return {'cdll_splice': spliced, 'cdll_drain': drained}
+
+
+def scenario_cancel(size: int, rng: random.Random) -> Dict[str, Callable[[], None]]:
+    """
+    Cancelling queued jobs: size jobs are queued and a random quarter of them cancelled, by handle or by rotating the
+    queue once round to drop each job, the only way without handles
+    """
+    cancelled = rng.sample(range(size), size // 4)
+
+    def by_handle():
+        deque = CDLLCD()
+        handles = [deque.enqueue(job, False, True) for job in range(size)]
+        for job in cancelled:
+            deque.cancel(handles[job])
+
+    def by_scan():
+        deque = CDLLCD()
+        for job in range(size):
+            deque.enqueue(job, False)
+        for job in cancelled:
+            for _ in range(len(deque)):
+                item = deque.dequeue()
+                if item != job:
+                    deque.enqueue(item, False)
+
+    return {'cdll_handle': by_handle, 'cdll_scan': by_scan}
+
+
+SCENARIOS: Dict[str, Callable[[int, random.Random], Dict[str, Callable[[], None]]]] = {
+    'grow': scenario_grow,
+    'grow_shrink': scenario_grow_shrink,
+    'random': scenario_random,
+    'sliding_window': scenario_sliding_window,
+    'extend': scenario_extend,
+    'thrash': scenario_thrash,
+    'churn': scenario_churn,
+    'mpmc': scenario_mpmc,
+    'spsc': scenario_spsc,
+    'multiprocess': scenario_multiprocess,
+    'durability': scenario_durability,
+    'checkpoint': scenario_checkpoint,
+    'window_stats': scenario_window_stats,
+    'lanes': scenario_lanes,
+    'wrapper': scenario_wrapper,
+    'merge': scenario_merge,
+    'cancel': scenario_cancel,
+}
+
+# Scenarios whose size means something other than the number of items
+SCENARIO_SIZES: Dict[str, List[int]] = {
+    'sliding_window': list(range(5, 200, 20)),
+    'durability': [1000, 5000, 10000],
+    'cancel': [100, 500, 1000, 2000],
+}
+
+# Operations each run of a scenario performs, for scenarios reported in ops/sec
+SCENARIO_OPS: Dict[str, Callable[[int], int]] = {
+    'durability': lambda size: 2 * size,
+    'wrapper': lambda size: 2 * size,
+}
+
+
+# ============ Measurement ============#
+
+def percentile(samples: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile
+    :param samples: the measurements
+    :param q: the percentile, in [0, 100]
+    :return: the smallest sample that is at least q percent of the samples
+    """
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def measure(run: Callable[[], None], warmup: int, trials: int) -> Dict[str, float]:
+    """
+    Times a benchmark callable after warming it up, collecting garbage before every timed trial
+    :param run: the benchmark, which may return a dict of figures other than time, such as allocation counts
+    :param warmup: number of untimed runs
+    :param trials: number of timed runs
+    :return: median, p99, mean and min of the trial times in seconds, plus the figures the last trial returned
+    """
+    for _ in range(warmup):
+        run()
+
+    times = []
+    figures = None
+    for _ in range(trials):
+        gc.collect()  # What happens if you remove this? Hint: memory fragmention
+        start = default_timer()
+        figures = run()
+        times.append(default_timer() - start)
+
+    result = {'median': statistics.median(times), 'p99': percentile(times, 99),
+              'mean': statistics.fmean(times), 'min': min(times)}
+    if isinstance(figures, dict):
+        result.update(figures)
+    return result
+
+
+def run_benchmarks(scenarios: List[str] = None, sizes: List[int] = None, variants: List[str] = None,
+                   seed: int = 1342, warmup: int = 1, trials: int = 5) -> List[dict]:
+    """
+    Runs scenarios over a range of sizes
+    :param scenarios: names of the scenarios to run, defaults to all of them
+    :param sizes: sizes to run every scenario at, defaults to each scenario's own sizes
+    :param variants: only run these variants (backends), defaults to all of them
+    :param seed: seed for the data of every (scenario, size) pair
+    :param warmup: number of untimed runs per variant
+    :param trials: number of timed runs per variant
+    :return: one result row per (scenario, variant, size)
+    """
+    results = []
+    for scenario in scenarios or list(SCENARIOS):
+        for size in sizes or SCENARIO_SIZES.get(scenario, DEFAULT_SIZES):
+            # Seeding per pair keeps results reproducible when only some scenarios or sizes are run
+            rng = random.Random(f"{seed}:{scenario}:{size}")
+            for variant, run in SCENARIOS[scenario](size, rng).items():
+                if variants and variant not in variants:
+                    continue
+                row = {'scenario': scenario, 'variant': variant, 'size': size, 'trials': trials}
+                row.update(measure(run, warmup, trials))
+                if scenario in SCENARIO_OPS and row['median'] > 0:
+                    row['ops_per_sec'] = SCENARIO_OPS[scenario](size) / row['median']
+                results.append(row)
+    return results
+
+
+def run_memory(sizes: List[int] = None, variants: List[str] = None) -> List[dict]:
+    """
+    Measures the memory every backend holds after size enqueues to the back, through its memory_usage
+    :param sizes: numbers of items, defaults to DEFAULT_SIZES
+    :param variants: only measure these backends, defaults to all of them
+    :return: one result row per (variant, size) with the deep memory_usage and the total bytes per item
+    """
+    results = []
+    for size in sizes or DEFAULT_SIZES:
+        for variant, factory in BACKENDS.items():
+            if variants and variant not in variants:
+                continue
+            deque = factory()
+            for i in range(size):
+                # Distinct ints above the small-int cache, so every item has its own payload
+                deque.enqueue(i + 1000, False)
+            row = {'scenario': 'memory', 'variant': variant, 'size': size}
+            row.update(deque.memory_usage(deep=True))
+            row.pop('per_node', None)
+            row['bytes_per_item'] = row['total'] / size if size else 0.0
+            results.append(row)
+    return results
+
+
+def compare(results: List[dict], baseline: List[dict], threshold: float = 0.1) -> List[dict]:
+    """
+    Finds results whose median time regressed against a saved baseline
+    :param results: rows from run_benchmarks
+    :param baseline: rows from an earlier run
+    :param threshold: allowed slowdown as a fraction of the baseline median
+    :return: one row per regression, with the baseline median and the ratio to it
+    """
+    timed = {(row['scenario'], row['variant'], row['size']): row for row in baseline if 'median' in row}
+    regressions = []
+    for row in results:
+        base = timed.get((row['scenario'], row['variant'], row['size']))
+        if base is None or 'median' not in row or base['median'] <= 0:
+            continue
+        ratio = row['median'] / base['median']
+        if ratio > 1 + threshold:
+            regressions.append(dict(row, baseline_median=base['median'], ratio=ratio))
+    return regressions
+
+
+# ============ Output ============#
+
+def write_json(results: List[dict], path: str) -> None:
+    """
+    :param results: result rows
+    :param path: file to write
+    :return: None
+    """
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2)
+
+
+def write_csv(results: List[dict], path: str) -> None:
+    """
+    :param results: result rows, which may not all have the same columns
+    :param path: file to write
+    :return: None
+    """
+    columns = []
+    for row in results:
+        columns.extend(key for key in row if key not in columns)
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def format_table(results: List[dict]) -> str:
+    """
+    :param results: result rows
+    :return: the rows as an aligned text table, with times in milliseconds
+    """
+    lines = [f"{'scenario':<16}{'variant':<24}{'size':>8}{'median ms':>12}{'p99 ms':>12}{'ops/sec':>14}"]
+    for row in results:
+        ops = f"{row['ops_per_sec']:>14.0f}" if 'ops_per_sec' in row else ''
+        lines.append(f"{row['scenario']:<16}{row['variant']:<24}{row['size']:>8}"
+                     f"{row['median'] * 1000:>12.3f}{row['p99'] * 1000:>12.3f}{ops}")
+    return "\n".join(lines)
+
+
+def format_memory_table(results: List[dict]) -> str:
+    """
+    :param results: rows from run_memory
+    :return: the rows as an aligned text table, in bytes
+    """
+    lines = [f"{'variant':<12}{'size':>8}{'live':>10}{'slack':>10}{'overhead':>10}{'payload':>10}{'total':>10}"
+             f"{'bytes/item':>12}"]
+    for row in results:
+        lines.append(f"{row['variant']:<12}{row['size']:>8}{row['live']:>10}{row['slack']:>10}{row['overhead']:>10}"
+                     f"{row['payload']:>10}{row['total']:>10}{row['bytes_per_item']:>12.1f}")
+    return "\n".join(lines)
+
+
+def plot(results: List[dict], metric: str = 'median') -> None:
+    """
+    Plots a metric against size, one figure per scenario (requires matplotlib)
+    :param results: result rows
+    :param metric: the column to plot, such as median for timings or total for memory
+    :return: None
+    """
+    from matplotlib import pyplot as plt
+
+    for scenario in dict.fromkeys(row['scenario'] for row in results):
+        rows = [row for row in results if row['scenario'] == scenario]
+        for variant in dict.fromkeys(row['variant'] for row in rows):
+            points = [(row['size'], row[metric]) for row in rows if row['variant'] == variant]
+            plt.plot([size for size, _ in points], [value for _, value in points], label=variant)
+        plt.title(scenario)
+        plt.legend(loc='best')
+        plt.show()
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Command line entry point
+    :param argv: arguments, defaults to sys.argv
+    :return: exit status, 1 if any regression was found against the baseline
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the deque backends.")
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--sizes', type=int, nargs='+', help="sizes to run every scenario at")
+    parser.add_argument('--variants', nargs='+', help="only run these variants, e.g. array cdll")
+    parser.add_argument('--seed', type=int, default=1342)
+    parser.add_argument('--warmup', type=int, default=1, help="untimed runs per variant (default: 1)")
+    parser.add_argument('--trials', type=int, default=5, help="timed runs per variant (default: 5)")
+    parser.add_argument('--json', help="write the results to this JSON file")
+    parser.add_argument('--csv', help="write the results to this CSV file")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="allowed median slowdown against the baseline (default: 0.1 = 10%%)")
+    parser.add_argument('--plot', action='store_true', help="plot the results (requires matplotlib)")
+    parser.add_argument('--memory', action='store_true',
+                        help="report the bytes every backend holds at each size instead of timing scenarios")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s) {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}")
+
+    if args.memory:
+        results = run_memory(args.sizes, args.variants)
+        print(format_memory_table(results))
+    else:
+        results = run_benchmarks(args.scenarios, args.sizes, args.variants, args.seed, args.warmup, args.trials)
+        print(format_table(results))
+
+    if args.json:
+        write_json(results, args.json)
+    if args.csv:
+        write_csv(results, args.csv)
+    if args.plot:
+        plot(results, 'total' if args.memory else 'median')
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for row in regressions:
+            print(f"REGRESSION {row['scenario']}/{row['variant']}/{row['size']}: "
+                  f"{row['baseline_median'] * 1000:.3f} ms -> {row['median'] * 1000:.3f} ms ({row['ratio']:.2f}x)")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,413 @@
+"""
+Project 5: Deque
+concurrent_deque.py
+Thread-safe deques for producer/consumer pipelines
+"""
+
+import sys
+import threading
+from time import monotonic, perf_counter_ns
+from typing import TypeVar, List
+
+from solution import CircularDeque, ResizePolicy, POINTER_SIZE, _memory_report, _payload_bytes
+
+T = TypeVar('T')
+
+# Unlocked copies an unbounded deque tries before growing under the lock
+GROW_ATTEMPTS = 3
+
+
+class Empty(Exception):
+    """
+    Raised by a non-blocking or timed get on an empty deque
+    """
+
+
+class Full(Exception):
+    """
+    Raised by a non-blocking or timed put on a full bounded deque
+    """
+
+
+class ConcurrentCircularDeque:
+    """
+    Thread-safe CircularDeque with blocking and timed put/get at both ends
+    Every operation holds one lock for a constant number of steps. Waiters sleep on two conditions sharing that lock,
+    not_empty for getters and not_full for putters, and each put or get wakes only as many waiters as it can satisfy
+    (skipping the notify entirely when nobody is waiting).
+    A bounded deque reserves all of its slots up front under a never-shrink policy, so it never resizes. An unbounded
+    deque grows without stalling other threads: the put that would fill it copies the items into a larger list with the
+    lock released, then takes the lock only to swap the list in, provided version shows nothing changed meanwhile
+    (otherwise the copy is retried, and after a few tries the grow falls back to copying under the lock). Shrinks still
+    copy under the lock; pass ResizePolicy(shrink=False) to an unbounded deque whose getters must never stall.
+    """
+
+    __slots__ = ['deque', 'maxlen', 'lock', 'not_empty', 'not_full', 'waiting_getters', 'waiting_putters', 'version']
+
+    def __init__(self, maxlen: int = None, policy: ResizePolicy = None) -> None:
+        """
+        Creates an empty ConcurrentCircularDeque
+        :param maxlen: if given, puts block (or raise Full) while the deque holds this many items
+        :param policy: growth and shrink rules for an unbounded deque
+        :return: None
+        """
+        if maxlen is None:
+            self.deque: CircularDeque = CircularDeque(policy=policy)
+        else:
+            if maxlen < 1:
+                raise ValueError(f"maxlen must be at least 1, got {maxlen}")
+            self.deque = CircularDeque(policy=ResizePolicy(shrink=False))
+            self.deque.reserve(maxlen)
+        self.maxlen: int = maxlen
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+        self.waiting_getters: int = 0
+        self.waiting_putters: int = 0
+        # Bumped, with the lock held, by every change to the deque
+        self.version: int = 0
+
+    def __len__(self) -> int:
+        """
+        :return: the number of items, which may be stale as soon as it is returned
+        """
+        return self.deque.size
+
+    def is_empty(self) -> bool:
+        """
+        :return: True if the deque held no items when checked
+        """
+        return self.deque.size == 0
+
+    def memory_usage(self, deep: bool = False) -> dict:
+        """
+        Accounts for the memory held by the underlying CircularDeque and this wrapper, see
+        CircularDeque.memory_usage. The lock and conditions are not counted.
+
+        Args:
+            deep (bool): If True, also counts the items themselves (each distinct object once).
+
+        Time Complexity:
+            O(1) - Constant time, or O(n) with deep.
+
+        Space Complexity:
+            O(1) - Constant space, or O(n) with deep to recognize shared items.
+
+        Returns:
+            dict: Bytes by kind: live, slack, overhead, payload and total.
+        """
+        with self.lock:
+            usage = self.deque.memory_usage(deep)
+        return _memory_report(usage['live'], usage['slack'], usage['overhead'] + sys.getsizeof(self),
+                              usage['payload'])
+
+    def _ready(self, getter: bool) -> bool:
+        """
+        :param getter: True to check for a getter, False for a putter
+        :return: True if there is an item to get, or a free slot to put into
+        """
+        if getter:
+            return self.deque.size > 0
+        return self.maxlen is None or self.deque.size < self.maxlen
+
+    def _wait(self, getter: bool, block: bool, timeout: float) -> None:
+        """
+        Waits, with the lock held, until a getter has an item or a putter has a free slot
+        :param getter: True to wait on not_empty, False to wait on not_full
+        :param block: if False, raise immediately instead of waiting
+        :param timeout: the most seconds to wait, or None to wait forever
+        :return: None
+        """
+        if not block:
+            raise Empty if getter else Full
+        if timeout is not None and timeout < 0:
+            raise ValueError("timeout must be a non-negative number")
+        condition = self.not_empty if getter else self.not_full
+        deadline = None if timeout is None else monotonic() + timeout
+
+        if getter:
+            self.waiting_getters += 1
+        else:
+            self.waiting_putters += 1
+        try:
+            while not self._ready(getter):
+                if deadline is None:
+                    condition.wait()
+                    continue
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    raise Empty if getter else Full
+                condition.wait(remaining)
+        finally:
+            if getter:
+                self.waiting_getters -= 1
+            else:
+                self.waiting_putters -= 1
+
+    def _grow(self) -> None:
+        """
+        Grows an unbounded deque about to fill up, copying the items with the lock released
+        Called without the lock. The copy is kept only if no other thread changed the deque while it was made.
+        :return: None
+        """
+        deque = self.deque
+        for _ in range(GROW_ATTEMPTS):
+            with self.lock:
+                if deque.size + 1 < deque.capacity:
+                    return
+                version = self.version
+                capacity = deque.policy.grown(deque.capacity)
+            if deque.stats is not None:
+                started = perf_counter_ns()
+            new_queue = deque._copy(capacity)
+            with self.lock:
+                if self.version == version:
+                    deque._adopt(new_queue, capacity)
+                    self.version += 1
+                    if deque.stats is not None:
+                        deque.stats.record_resize(True, perf_counter_ns() - started)
+                    return
+
+    def put(self, item: T, front: bool = False, block: bool = True, timeout: float = None) -> None:
+        """
+        Adds an item to the back (or front) of the deque, waiting for a free slot if the deque is bounded and full.
+
+        Args:
+            item (T): The item to add.
+            front (bool): If True, adds the item to the front of the deque; if False, adds it to the back.
+            block (bool): If False, raises Full at once rather than waiting.
+            timeout (float): The most seconds to wait for a free slot, or None to wait as long as it takes.
+
+        Time Complexity:
+            O(1)* - Amortized constant time once a slot is free. A grow copies the items with the lock released.
+
+        Space Complexity:
+            O(1)* - Amortized constant space.
+
+        Returns:
+            None
+        """
+        deque = self.deque
+        if self.maxlen is None and deque.size + 1 >= deque.capacity:
+            # Unlocked reads, only a hint: whoever fills the deque first grows it, under the lock if need be
+            self._grow()
+        with self.lock:
+            if self.maxlen is not None and deque.size >= self.maxlen:
+                self._wait(False, block, timeout)
+            deque.enqueue(item, front)
+            self.version += 1
+            if self.waiting_getters:
+                self.not_empty.notify()
+
+    def put_nowait(self, item: T, front: bool = False) -> None:
+        """
+        Adds an item without waiting, raising Full if the deque is bounded and full.
+
+        Args:
+            item (T): The item to add.
+            front (bool): If True, adds the item to the front of the deque; if False, adds it to the back.
+
+        Returns:
+            None
+        """
+        self.put(item, front, block=False)
+
+    def get(self, front: bool = True, block: bool = True, timeout: float = None) -> T:
+        """
+        Removes and returns the front (or back) item, waiting for one if the deque is empty.
+
+        Args:
+            front (bool): If True, removes the front item; if False, removes the back item.
+            block (bool): If False, raises Empty at once rather than waiting.
+            timeout (float): The most seconds to wait for an item, or None to wait as long as it takes.
+
+        Time Complexity:
+            O(1)* - Amortized constant time once an item is available.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            T: The removed item.
+        """
+        with self.lock:
+            if self.deque.size == 0:
+                self._wait(True, block, timeout)
+            item = self.deque.dequeue(front)
+            self.version += 1
+            if self.waiting_putters:
+                self.not_full.notify()
+            return item
+
+    def get_nowait(self, front: bool = True) -> T:
+        """
+        Removes and returns the front (or back) item without waiting, raising Empty if there is none.
+
+        Args:
+            front (bool): If True, removes the front item; if False, removes the back item.
+
+        Returns:
+            T: The removed item.
+        """
+        return self.get(front, block=False)
+
+    def get_many(self, n: int, front: bool = True, block: bool = True, timeout: float = None) -> List[T]:
+        """
+        Removes and returns up to n items from the front (or back), waiting only until at least one is available.
+        The items are taken with a single popmany under one lock acquisition.
+
+        Args:
+            n (int): The maximum number of items to remove.
+            front (bool): If True, removes items from the front; if False, removes them from the back.
+            block (bool): If False, raises Empty at once rather than waiting.
+            timeout (float): The most seconds to wait for the first item, or None to wait as long as it takes.
+
+        Time Complexity:
+            O(k)* - Amortized linear time in the number of items removed.
+
+        Space Complexity:
+            O(k) - Linear space in the number of items removed.
+
+        Returns:
+            List[T]: The removed items, in the order repeated gets would return them.
+        """
+        with self.lock:
+            if self.deque.size == 0:
+                self._wait(True, block, timeout)
+            items = self.deque.popmany(n, front)
+            self.version += 1
+            if self.waiting_putters:
+                self.not_full.notify(len(items))
+            if self.deque.size > 0 and self.waiting_getters:
+                # Pass the wakeup on, since this put's notify was consumed by a batch that left items behind
+                self.not_empty.notify()
+            return items
+
+
+class SPSCCircularDeque:
+    """
+    Lock-free single-producer/single-consumer ring buffer
+    The capacity is a fixed power of two, so wraparound is a bitmask rather than % capacity. head and tail count every
+    item ever dequeued and enqueued: only the producer thread writes tail and only the consumer thread writes head, and
+    each side publishes its index only after it is done with the slot. This relies on the interpreter making single
+    attribute and list item stores atomic and visible in program order, as CPython's global interpreter lock does.
+    Exactly one thread may call enqueue and exactly one thread may call dequeue.
+    """
+
+    __slots__ = ['queue', 'capacity', 'mask', 'head', 'tail']
+
+    def __init__(self, capacity: int = 1024) -> None:
+        """
+        Creates an empty SPSCCircularDeque
+        :param capacity: number of slots, a power of two
+        :return: None
+        """
+        if capacity < 1 or capacity & (capacity - 1):
+            raise ValueError(f"capacity must be a power of two, got {capacity}")
+        self.capacity: int = capacity
+        self.mask: int = capacity - 1
+        self.queue: List[T] = [None] * capacity
+        self.head: int = 0
+        self.tail: int = 0
+
+    def __len__(self) -> int:
+        """
+        :return: the number of items, which may be stale as soon as it is returned
+        """
+        return self.tail - self.head
+
+    def is_empty(self) -> bool:
+        """
+        :return: True if the ring held no items when checked
+        """
+        return self.tail == self.head
+
+    def memory_usage(self, deep: bool = False) -> dict:
+        """
+        Accounts for the memory held by the ring and its list, as seen by the calling thread.
+
+        Args:
+            deep (bool): If True, also counts the items themselves (each distinct object once).
+
+        Time Complexity:
+            O(1) - Constant time, or O(n) with deep.
+
+        Space Complexity:
+            O(1) - Constant space, or O(n) with deep to recognize shared items.
+
+        Returns:
+            dict: Bytes by kind: live (slots holding items), slack (free slots), overhead (the ring object and the list
+            header), payload (the items, 0 unless deep) and their total.
+        """
+        head, tail = self.head, self.tail
+        size = tail - head
+        payload = 0
+        if deep:
+            payload = _payload_bytes(self.queue[index & self.mask] for index in range(head, tail))
+        overhead = sys.getsizeof(self) + sys.getsizeof(self.queue) - self.capacity * POINTER_SIZE
+        return _memory_report(size * POINTER_SIZE, (self.capacity - size) * POINTER_SIZE, overhead, payload)
+
+    def enqueue(self, value: T) -> bool:
+        """
+        Adds a value to the back of the ring. Only the producer thread may call this.
+
+        Args:
+            value (T): The value to add.
+
+        Time Complexity:
+            O(1) - Constant time, as the ring never resizes.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            bool: True if the value was added, False if the ring was full.
+        """
+        tail = self.tail
+        if tail - self.head == self.capacity:
+            return False
+        self.queue[tail & self.mask] = value
+        # Publish only once the slot is written
+        self.tail = tail + 1
+        return True
+
+    def dequeue(self) -> T:
+        """
+        Removes and returns the front value of the ring. Only the consumer thread may call this.
+
+        Time Complexity:
+            O(1) - Constant time.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            T: The removed value, or None if the ring was empty.
+        """
+        head = self.head
+        if head == self.tail:
+            return None
+        index = head & self.mask
+        value = self.queue[index]
+        self.queue[index] = None
+        # Hand the slot back to the producer only once it has been read and cleared
+        self.head = head + 1
+        return value
+
+    def front_element(self) -> T:
+        """
+        Retrieves the front value without removing it. Only the consumer thread may call this.
+
+        Time Complexity:
+            O(1) - Constant time.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            T: The front value, or None if the ring is empty.
+        """
+        head = self.head
+        if head == self.tail:
+            return None
+        return self.queue[head & self.mask]
@@ -0,0 +1,344 @@
+"""
+Project 5: Deque
+durable_deque.py
+Write-ahead log and snapshots that let a deque survive a restart
+"""
+
+import os
+import pickle
+import struct
+import sys
+import zlib
+from contextlib import contextmanager
+from time import monotonic
+from typing import Callable, Iterator, TypeVar
+
+from persistent_deque import fsync_directory, replace_file
+from solution import CircularDeque, _memory_report
+
+T = TypeVar('T')
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+# Body length and CRC-32 of the body; the body is an opcode byte, then the pickled value of an enqueue
+RECORD = struct.Struct('<II')
+ENQUEUE_BACK, ENQUEUE_FRONT, DEQUEUE_BACK, DEQUEUE_FRONT = range(4)
+
+SNAPSHOT = 'snapshot'
+
+
+class DurableDeque:
+    """
+    Durability layer around a CircularDeque, CDLLCD or any deque with the same enqueue/dequeue interface
+    Every enqueue and dequeue is applied to the in-memory deque and appended to a write-ahead log as a length-prefixed,
+    CRC-checked record. Records collect in a buffer and reach the file in groups, each with a single write and at most
+    one fsync, as the fsync policy allows:
+        'always'   - commit and fsync before every operation returns, or once per batch() block (group commit)
+        'interval' - fsync at most every interval_ms milliseconds, so a crash loses at most that much work
+        'never'    - leave flushing to the operating system, writing whenever buffer_size bytes are pending
+    Every snapshot_every operations the live items are written to a snapshot and a fresh log is started, so replay
+    on startup reads one snapshot and at most snapshot_every log records. Log and snapshot share a generation number,
+    so a crash part way through a snapshot never replays a log against the wrong snapshot. A record torn by a crash
+    fails its length or CRC check; replay stops there and the log is truncated to its last whole record.
+    The 'interval' policy syncs on the next operation once the interval has passed, so call flush() when going idle.
+    """
+
+    __slots__ = ['directory', 'deque', 'fsync', 'interval', 'buffer_size', 'snapshot_every', 'generation', 'log',
+                 'pending', 'logged', 'last_sync', 'batching']
+
+    def __init__(self, directory: str, factory: Callable[[], object] = CircularDeque, fsync: str = 'interval',
+                 interval_ms: float = 10, buffer_size: int = 1 << 16, snapshot_every: int = 100000) -> None:
+        """
+        Opens the durable deque stored in a directory, replaying its snapshot and log, or creates an empty one
+        :param directory: where the snapshot and log live
+        :param factory: builds the empty in-memory deque
+        :param fsync: 'always', 'interval' or 'never'
+        :param interval_ms: the longest time between fsyncs under the 'interval' policy
+        :param buffer_size: pending log bytes that force a write to the file
+        :param snapshot_every: operations logged between snapshots
+        :return: None
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        if interval_ms < 0:
+            raise ValueError(f"interval_ms must be non-negative, got {interval_ms}")
+        if snapshot_every < 1:
+            raise ValueError(f"snapshot_every must be at least 1, got {snapshot_every}")
+        self.directory: str = directory
+        self.deque = factory()
+        self.fsync: str = fsync
+        self.interval: float = interval_ms / 1000
+        self.buffer_size: int = buffer_size
+        self.snapshot_every: int = snapshot_every
+        self.pending: bytearray = bytearray()
+        self.logged: int = 0
+        self.last_sync: float = monotonic()
+        self.batching: int = 0
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+        self.log = open(self._log_path(self.generation), 'ab', buffering=0)
+
+    def _log_path(self, generation: int) -> str:
+        """
+        :param generation: snapshot generation
+        :return: the path of the log that follows that snapshot
+        """
+        return os.path.join(self.directory, f'wal-{generation:012d}.log')
+
+    def _recover(self) -> None:
+        """
+        Loads the latest snapshot, replays its log, truncates a torn tail and deletes stale files
+        :return: None
+        """
+        self.generation: int = 0
+        path = os.path.join(self.directory, SNAPSHOT)
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                self.generation, items = pickle.load(file)
+            if hasattr(self.deque, 'extend'):
+                self.deque.extend(items)
+            else:
+                for item in items:
+                    self.deque.enqueue(item, False)
+
+        path = self._log_path(self.generation)
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                data = file.read()
+            end = self._replay(data)
+            if end < len(data):
+                with open(path, 'r+b') as file:
+                    file.truncate(end)
+                    os.fsync(file.fileno())
+
+        current = os.path.basename(path)
+        for name in os.listdir(self.directory):
+            if name.endswith('.tmp') or (name.startswith('wal-') and name != current):
+                os.remove(os.path.join(self.directory, name))
+
+    def _replay(self, data: bytes) -> int:
+        """
+        Applies every whole, intact record of a log to the deque, counting them in logged so the next snapshot comes
+        after snapshot_every records in all, not snapshot_every more
+        :param data: the log's contents
+        :return: the offset just past the last record applied
+        """
+        deque = self.deque
+        view = memoryview(data)
+        offset = 0
+        while offset + RECORD.size <= len(data):
+            length, checksum = RECORD.unpack_from(data, offset)
+            start = offset + RECORD.size
+            body = view[start:start + length]
+            if length == 0 or len(body) < length or zlib.crc32(body) != checksum:
+                break
+            opcode = body[0]
+            if opcode <= ENQUEUE_FRONT:
+                deque.enqueue(pickle.loads(body[1:]), opcode == ENQUEUE_FRONT)
+            else:
+                deque.dequeue(opcode == DEQUEUE_FRONT)
+            self.logged += 1
+            offset = start + length
+        return offset
+
+    def __len__(self) -> int:
+        """
+        :return: the number of items
+        """
+        return len(self.deque)
+
+    def __iter__(self) -> Iterator[T]:
+        """
+        :return: an iterator over the items from front to back
+        """
+        return iter(self.deque)
+
+    def is_empty(self) -> bool:
+        """
+        :return: True if the deque holds no items
+        """
+        return len(self.deque) == 0
+
+    def front_element(self) -> T:
+        """
+        :return: the front item, or None if the deque is empty
+        """
+        return self.deque.front_element()
+
+    def back_element(self) -> T:
+        """
+        :return: the back item, or None if the deque is empty
+        """
+        return self.deque.back_element()
+
+    def memory_usage(self, deep: bool = False) -> dict:
+        """
+        Accounts for the memory held by the in-memory deque, see its memory_usage, plus the log records waiting in the
+        pending buffer, which count as overhead.
+
+        Args:
+            deep (bool): If True, also counts the items themselves.
+
+        Time Complexity:
+            O(1) - Constant time, or O(n) with deep.
+
+        Space Complexity:
+            O(1) - Constant space, or O(n) with deep.
+
+        Returns:
+            dict: Bytes by kind: live, slack, overhead, payload and total.
+        """
+        usage = self.deque.memory_usage(deep)
+        overhead = usage['overhead'] + sys.getsizeof(self) + sys.getsizeof(self.pending)
+        return _memory_report(usage['live'], usage['slack'], overhead, usage['payload'])
+
+    def _append(self, body: bytes) -> None:
+        """
+        Adds a record to the pending buffer and commits it as the fsync policy requires
+        :param body: the record body
+        :return: None
+        """
+        self.pending += RECORD.pack(len(body), zlib.crc32(body))
+        self.pending += body
+        self.logged += 1
+        if self.batching:
+            return
+        self._commit_due()
+        if self.logged >= self.snapshot_every:
+            self.snapshot()
+
+    def _commit_due(self) -> None:
+        """
+        Commits the pending records if the fsync policy calls for it now
+        :return: None
+        """
+        if self.fsync == 'always':
+            self._commit(True)
+        elif self.fsync == 'interval' and monotonic() - self.last_sync >= self.interval:
+            self._commit(True)
+        elif len(self.pending) >= self.buffer_size:
+            self._commit(False)
+
+    def _commit(self, sync: bool) -> None:
+        """
+        Writes the pending records to the log with one write call
+        :param sync: if True, fsync the log afterwards
+        :return: None
+        """
+        if self.pending:
+            self.log.write(self.pending)
+            self.pending = bytearray()
+        if sync:
+            os.fsync(self.log.fileno())
+            self.last_sync = monotonic()
+
+    @contextmanager
+    def batch(self) -> Iterator['DurableDeque']:
+        """
+        Groups the operations inside a with block into a single commit at its end, so under the 'always' policy a
+        whole batch costs one write and one fsync
+        :return: a context manager yielding this deque
+        """
+        self.batching += 1
+        try:
+            yield self
+        finally:
+            self.batching -= 1
+            if not self.batching:
+                self._commit_due()
+                if self.logged >= self.snapshot_every:
+                    self.snapshot()
+
+    def enqueue(self, value: T, front: bool = True) -> None:
+        """
+        Adds a value to the front (or back) of the deque and logs it.
+
+        Args:
+            value (T): The value to add, which must be picklable.
+            front (bool): If True, adds the value to the front of the deque; if False, adds it to the back.
+
+        Time Complexity:
+            O(1)* - Amortized constant time, plus the commit the fsync policy calls for.
+
+        Space Complexity:
+            O(1)* - Amortized constant space.
+
+        Returns:
+            None
+        """
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        self.deque.enqueue(value, front)
+        self._append(bytes([ENQUEUE_FRONT if front else ENQUEUE_BACK]) + payload)
+
+    def dequeue(self, front: bool = True) -> T:
+        """
+        Removes and returns the front (or back) value of the deque and logs the removal.
+
+        Args:
+            front (bool): If True, removes the front value; if False, removes the back value.
+
+        Time Complexity:
+            O(1)* - Amortized constant time, plus the commit the fsync policy calls for.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            T: The removed value, or None if the deque was empty.
+        """
+        if len(self.deque) == 0:
+            return None
+        value = self.deque.dequeue(front)
+        self._append(bytes([DEQUEUE_FRONT if front else DEQUEUE_BACK]))
+        return value
+
+    def snapshot(self) -> None:
+        """
+        Writes the live items to a new snapshot and starts an empty log, so that replay begins from here.
+
+        Time Complexity:
+            O(n) - Linear time in the number of items.
+
+        Space Complexity:
+            O(n) - Linear space in the number of items.
+
+        Returns:
+            None
+        """
+        self._commit(True)
+        generation = self.generation + 1
+        replace_file(os.path.join(self.directory, SNAPSHOT),
+                     pickle.dumps((generation, list(self.deque)), pickle.HIGHEST_PROTOCOL))
+        fsync_directory(self.directory)
+        self.log.close()
+        os.remove(self._log_path(self.generation))
+        self.generation = generation
+        self.log = open(self._log_path(generation), 'ab', buffering=0)
+        self.logged = 0
+
+    def flush(self) -> None:
+        """
+        Commits and fsyncs every pending record, whatever the fsync policy
+        :return: None
+        """
+        self._commit(True)
+
+    def close(self) -> None:
+        """
+        Flushes the log and closes it; the deque may be reopened from its directory afterwards
+        :return: None
+        """
+        self.flush()
+        self.log.close()
+
+    def __enter__(self) -> 'DurableDeque':
+        """
+        :return: this deque
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Closes the deque
+        :return: None
+        """
+        self.close()
@@ -0,0 +1,285 @@
+"""
+Project 5: Deque
+metrics.py
+Opt-in counters and latency histograms for the deque backends, exported as a dict or in Prometheus text format
+"""
+
+from math import ceil
+from time import monotonic
+from typing import Dict, List, Tuple
+
+
+def escape_label(value: str) -> str:
+    """
+    :param value: a label value
+    :return: the value with backslashes, double quotes and newlines escaped, as the Prometheus text format requires
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of non-negative integers, such as durations in nanoseconds
+    Values below 2 ** precision get a bucket each; above that every power of two is split into 2 ** (precision - 1)
+    equal buckets, so a bucket's width is never more than 1 / 2 ** (precision - 1) of the values in it and the
+    histogram stays small however wide the range of values. Buckets are kept sparsely, by index.
+    """
+
+    __slots__ = ['precision', 'half', 'counts', 'count', 'total', 'min', 'max']
+
+    def __init__(self, precision: int = 5) -> None:
+        """
+        Creates an empty LatencyHistogram
+        :param precision: significant bits kept of each value, at least 1
+        :return: None
+        """
+        if precision < 1:
+            raise ValueError(f"precision must be at least 1, got {precision}")
+        self.precision: int = precision
+        self.half: int = 1 << (precision - 1)
+        self.counts: Dict[int, int] = {}
+        self.count: int = 0
+        self.total: int = 0
+        self.min: int = None
+        self.max: int = None
+
+    def _index(self, value: int) -> int:
+        """
+        :param value: a non-negative integer
+        :return: the index of the bucket holding it
+        """
+        shift = max(0, value.bit_length() - self.precision)
+        return shift * self.half + (value >> shift)
+
+    def bound(self, index: int) -> int:
+        """
+        :param index: bucket index
+        :return: the largest value the bucket holds
+        """
+        if index < 2 * self.half:
+            return index
+        shift = index // self.half - 1
+        top = index - shift * self.half
+        return ((top + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        """
+        Adds a value to the histogram
+        :param value: a non-negative integer
+        :return: None
+        """
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> int:
+        """
+        :param q: percentile between 0 and 100
+        :return: the upper bound of the bucket holding the nearest-rank q-th percentile (at most the largest value
+        recorded), or None if the histogram is empty
+        """
+        if self.count == 0:
+            return None
+        rank = max(1, ceil(q / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.bound(index), self.max)
+        return self.max
+
+    def buckets(self) -> List[Tuple[int, int]]:
+        """
+        :return: (upper bound, cumulative count) for every non-empty bucket, in increasing order
+        """
+        cumulative = 0
+        result = []
+        for index in sorted(self.counts):
+            cumulative += self.counts[index]
+            result.append((self.bound(index), cumulative))
+        return result
+
+    def snapshot(self) -> dict:
+        """
+        :return: count, sum, min, max and the 50th, 90th, 99th and 99.9th percentiles
+        """
+        return {'count': self.count, 'sum': self.total, 'min': self.min, 'max': self.max,
+                'p50': self.percentile(50), 'p90': self.percentile(90), 'p99': self.percentile(99),
+                'p999': self.percentile(99.9)}
+
+
+class DequeStats:
+    """
+    Counters for one deque, kept only while stats are enabled on it
+    The deque calls the record_ methods from its hot paths. While stats are disabled its stats slot is None, so the
+    only cost is one attribute check per operation. Resize durations are recorded in nanoseconds.
+    """
+
+    __slots__ = ['owner', 'started', 'enqueued_front', 'enqueued_back', 'dequeued_front', 'dequeued_back',
+                 'evictions', 'peak_size', 'grow_ns', 'shrink_ns']
+
+    def __init__(self, owner: object) -> None:
+        """
+        Creates zeroed stats for a deque
+        :param owner: the deque, read for its current size and capacity when a snapshot is taken
+        :return: None
+        """
+        self.owner = owner
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Zeroes every counter and histogram and restarts the clock used for rates
+        :return: None
+        """
+        self.started: float = monotonic()
+        self.enqueued_front: int = 0
+        self.enqueued_back: int = 0
+        self.dequeued_front: int = 0
+        self.dequeued_back: int = 0
+        self.evictions: int = 0
+        self.peak_size: int = len(self.owner)
+        self.grow_ns: LatencyHistogram = LatencyHistogram()
+        self.shrink_ns: LatencyHistogram = LatencyHistogram()
+
+    def record_enqueue(self, front: bool, size: int, count: int = 1) -> None:
+        """
+        :param front: True if the items went to the front
+        :param size: the deque's size afterwards
+        :param count: the number of items enqueued
+        :return: None
+        """
+        if front:
+            self.enqueued_front += count
+        else:
+            self.enqueued_back += count
+        if size > self.peak_size:
+            self.peak_size = size
+
+    def record_dequeue(self, front: bool, count: int = 1) -> None:
+        """
+        :param front: True if the items came from the front
+        :param count: the number of items dequeued
+        :return: None
+        """
+        if front:
+            self.dequeued_front += count
+        else:
+            self.dequeued_back += count
+
+    def record_resize(self, grew: bool, nanoseconds: int) -> None:
+        """
+        :param grew: True for a grow, False for a shrink
+        :param nanoseconds: how long the resize took
+        :return: None
+        """
+        (self.grow_ns if grew else self.shrink_ns).record(nanoseconds)
+
+    def snapshot(self) -> dict:
+        """
+        :return: every counter, the current size, capacity and occupancy (size / capacity, for array-backed deques),
+        per-end rates per second since the stats were enabled or reset, and the resize histograms
+        """
+        elapsed = max(monotonic() - self.started, 1e-9)
+        size = len(self.owner)
+        capacity = getattr(self.owner, 'capacity', None)
+        return {
+            'size': size,
+            'capacity': capacity,
+            'occupancy': size / capacity if capacity else None,
+            'peak_size': self.peak_size,
+            'enqueued_front': self.enqueued_front,
+            'enqueued_back': self.enqueued_back,
+            'dequeued_front': self.dequeued_front,
+            'dequeued_back': self.dequeued_back,
+            'evictions': self.evictions,
+            'enqueue_front_rate': self.enqueued_front / elapsed,
+            'enqueue_back_rate': self.enqueued_back / elapsed,
+            'dequeue_front_rate': self.dequeued_front / elapsed,
+            'dequeue_back_rate': self.dequeued_back / elapsed,
+            'grows': self.grow_ns.count,
+            'shrinks': self.shrink_ns.count,
+            'grow_ns': self.grow_ns.snapshot(),
+            'shrink_ns': self.shrink_ns.snapshot(),
+            'uptime_seconds': elapsed,
+        }
+
+    def prometheus(self, name: str = 'deque', labels: Dict[str, str] = None) -> str:
+        """
+        Formats the stats in the Prometheus text exposition format
+        :param name: prefix of every metric name
+        :param labels: labels added to every sample, such as {'queue': 'jobs'}
+        :return: the exposition text, ending with a newline
+        """
+        base = dict(labels or {})
+
+        def sample(metric, value, **extra):
+            pairs = dict(base, **extra)
+            label_text = ','.join(f'{key}="{escape_label(str(val))}"' for key, val in pairs.items())
+            return f"{name}_{metric}{{{label_text}}} {value}" if label_text else f"{name}_{metric} {value}"
+
+        size = len(self.owner)
+        capacity = getattr(self.owner, 'capacity', None)
+        lines = [f"# HELP {name}_enqueued_total Items enqueued, by end",
+                 f"# TYPE {name}_enqueued_total counter",
+                 sample('enqueued_total', self.enqueued_front, end='front'),
+                 sample('enqueued_total', self.enqueued_back, end='back'),
+                 f"# HELP {name}_dequeued_total Items dequeued, by end",
+                 f"# TYPE {name}_dequeued_total counter",
+                 sample('dequeued_total', self.dequeued_front, end='front'),
+                 sample('dequeued_total', self.dequeued_back, end='back'),
+                 f"# HELP {name}_evictions_total Items overwritten by an enqueue to a full bounded deque",
+                 f"# TYPE {name}_evictions_total counter",
+                 sample('evictions_total', self.evictions),
+                 f"# HELP {name}_size Items currently held",
+                 f"# TYPE {name}_size gauge",
+                 sample('size', size),
+                 f"# HELP {name}_peak_size Most items held at once",
+                 f"# TYPE {name}_peak_size gauge",
+                 sample('peak_size', self.peak_size)]
+        if capacity:
+            lines += [f"# HELP {name}_capacity Slots in the underlying buffer",
+                      f"# TYPE {name}_capacity gauge",
+                      sample('capacity', capacity),
+                      f"# HELP {name}_occupancy Fraction of the underlying buffer in use",
+                      f"# TYPE {name}_occupancy gauge",
+                      sample('occupancy', size / capacity)]
+
+        lines += [f"# HELP {name}_resize_seconds Time spent resizing the underlying buffer",
+                  f"# TYPE {name}_resize_seconds histogram"]
+        for kind, histogram in (('grow', self.grow_ns), ('shrink', self.shrink_ns)):
+            for bound, cumulative in histogram.buckets():
+                lines.append(sample('resize_seconds_bucket', cumulative, kind=kind, le=f"{bound / 1e9:g}"))
+            lines.append(sample('resize_seconds_bucket', histogram.count, kind=kind, le='+Inf'))
+            lines.append(sample('resize_seconds_sum', f"{histogram.total / 1e9:g}", kind=kind))
+            lines.append(sample('resize_seconds_count', histogram.count, kind=kind))
+        return "\n".join(lines) + "\n"
+
+
+class StatsMixin:
+    """
+    enable_stats and disable_stats for a deque that records into a stats attribute from its hot paths
+    Array-backed deques also time their resizes into the stats.
+    """
+
+    __slots__ = ()
+
+    def enable_stats(self) -> DequeStats:
+        """
+        Starts counting operations, replacing any stats already kept
+        :return: the DequeStats, also kept in the stats attribute
+        """
+        self.stats = DequeStats(self)
+        return self.stats
+
+    def disable_stats(self) -> None:
+        """
+        Stops counting, so the hot paths are back to a single None check
+        :return: None
+        """
+        self.stats = None
@@ -0,0 +1,395 @@
+"""
+Project 5: Deque
+persistent_deque.py
+Deque of byte records that keeps its ends in memory and spills its middle to disk
+"""
+
+import mmap
+import os
+import struct
+import sys
+from typing import List, Tuple
+
+from solution import CircularDeque, _memory_report
+
+MAGIC = b'PCDQ'
+# next_chunk_id, chunk count
+MANIFEST_HEADER = struct.Struct('<qq')
+# chunk_id, record count, payload bytes
+MANIFEST_ENTRY = struct.Struct('<qqq')
+# Length prefix of every record in a chunk
+LENGTH = struct.Struct('<I')
+
+MANIFEST = 'manifest'
+
+
+def replace_file(path: str, data: bytes) -> None:
+    """
+    Durably replaces a file: writes a temporary file, fsyncs it and renames it into place. The rename itself is
+    durable once the directory is fsynced, see fsync_directory
+    :param path: the file to replace
+    :param data: its new contents
+    :return: None
+    """
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def fsync_directory(directory: str) -> None:
+    """
+    Fsyncs a directory, making the renames and deletions in it durable
+    :param directory: the directory
+    :return: None
+    """
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class PersistentCircularDeque:
+    """
+    Deque of byte strings too large to hold in memory, stored in a directory
+    The records nearest each end stay in two in-memory CircularDeques, head and tail. Whenever their payload exceeds
+    spill_threshold bytes, the inner records of the larger end are written out as one immutable chunk file, and the
+    deque of chunks between head and tail (middle) keeps only each chunk's id, record count and size. When an end runs
+    dry, the next chunk is read back through mmap into that end, so memory use stays near spill_threshold however long
+    the deque grows. Every file is written to a temporary name, fsynced and then renamed into place.
+    flush() persists the whole deque: the hot ends are written as chunks too and the manifest, the ordered list of
+    chunks, is replaced atomically. Reopening the directory after a crash restores the deque exactly as of the last
+    flush; records enqueued or dequeued since then are lost or reappear, respectively.
+    """
+
+    __slots__ = ['directory', 'spill_threshold', 'head', 'tail', 'middle', 'head_bytes', 'tail_bytes', 'middle_size',
+                 'next_chunk_id', 'retired']
+
+    def __init__(self, directory: str, spill_threshold: int = 1 << 20) -> None:
+        """
+        Opens the deque stored in a directory, creating it if needed
+        :param directory: where the manifest and chunk files live
+        :param spill_threshold: the most payload bytes held in memory before records are spilled to disk
+        :return: None
+        """
+        if spill_threshold < 1:
+            raise ValueError(f"spill_threshold must be at least 1, got {spill_threshold}")
+        self.directory: str = directory
+        self.spill_threshold: int = spill_threshold
+        self.head: CircularDeque = CircularDeque()
+        self.tail: CircularDeque = CircularDeque()
+        self.middle: CircularDeque = CircularDeque()
+        self.head_bytes: int = 0
+        self.tail_bytes: int = 0
+        self.middle_size: int = 0
+        self.next_chunk_id: int = 0
+        # Chunks read back into memory, still referenced by the manifest until the next flush
+        self.retired: List[int] = []
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    def _path(self, chunk_id: int) -> str:
+        """
+        :param chunk_id: chunk id
+        :return: the path of the chunk file
+        """
+        return os.path.join(self.directory, f'chunk-{chunk_id:012d}.dat')
+
+    def _recover(self) -> None:
+        """
+        Loads the manifest, if any, and deletes chunk and temporary files it does not reference
+        :return: None
+        """
+        path = os.path.join(self.directory, MANIFEST)
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                data = file.read()
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a PersistentCircularDeque manifest")
+            self.next_chunk_id, count = MANIFEST_HEADER.unpack_from(data, len(MAGIC))
+            offset = len(MAGIC) + MANIFEST_HEADER.size
+            for _ in range(count):
+                entry = MANIFEST_ENTRY.unpack_from(data, offset)
+                self.middle.enqueue(entry, front=False)
+                self.middle_size += entry[1]
+                offset += MANIFEST_ENTRY.size
+        live = {os.path.basename(self._path(entry[0])) for entry in self.middle}
+        for name in os.listdir(self.directory):
+            if name.endswith('.tmp') or (name.startswith('chunk-') and name not in live):
+                os.remove(os.path.join(self.directory, name))
+
+    def _write_chunk(self, records: List[bytes]) -> Tuple[int, int, int]:
+        """
+        Writes records to a new chunk file
+        :param records: the records, in deque order
+        :return: the chunk's manifest entry (id, record count, payload bytes)
+        """
+        chunk_id = self.next_chunk_id
+        self.next_chunk_id += 1
+        parts = []
+        nbytes = 0
+        for record in records:
+            parts.append(LENGTH.pack(len(record)))
+            parts.append(record)
+            nbytes += len(record)
+        replace_file(self._path(chunk_id), b''.join(parts))
+        return chunk_id, len(records), nbytes
+
+    def _read_chunk(self, chunk_id: int) -> List[bytes]:
+        """
+        Reads every record of a chunk file through a read-only memory map
+        :param chunk_id: chunk id
+        :return: the records, in deque order
+        """
+        records = []
+        with open(self._path(chunk_id), 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return records
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                offset = 0
+                end = len(view)
+                while offset < end:
+                    length = LENGTH.unpack_from(view, offset)[0]
+                    offset += LENGTH.size
+                    records.append(view[offset:offset + length])
+                    offset += length
+        return records
+
+    def __len__(self) -> int:
+        """
+        :return: the number of records, in memory and on disk
+        """
+        return self.head.size + self.middle_size + self.tail.size
+
+    def is_empty(self) -> bool:
+        """
+        :return: True if the deque holds no records
+        """
+        return len(self) == 0
+
+    def _spill(self) -> None:
+        """
+        Moves the inner records of the end holding more payload into a new chunk, until the hot ends hold at most
+        half of spill_threshold bytes or that end is empty
+        :return: None
+        """
+        from_tail = self.tail_bytes >= self.head_bytes
+        end = self.tail if from_tail else self.head
+        excess = self.head_bytes + self.tail_bytes - self.spill_threshold // 2
+        records = []
+        while excess > 0 and end.size:
+            # The inner end of tail is its front, and of head its back
+            record = end.dequeue(front=from_tail)
+            excess -= len(record)
+            records.append(record)
+        spilled = sum(map(len, records))
+        if from_tail:
+            self.tail_bytes -= spilled
+        else:
+            self.head_bytes -= spilled
+            records.reverse()
+        entry = self._write_chunk(records)
+        self.middle.enqueue(entry, front=not from_tail)
+        self.middle_size += entry[1]
+
+    def _load(self, front: bool) -> None:
+        """
+        Reads the chunk next to an empty hot end back into it
+        :param front: True to refill head from the first chunk, False to refill tail from the last
+        :return: None
+        """
+        entry = self.middle.dequeue(front)
+        self.middle_size -= entry[1]
+        if front:
+            self.head_bytes += entry[2]
+            self.head.extend(self._read_chunk(entry[0]))
+        else:
+            self.tail_bytes += entry[2]
+            self.tail.extend(self._read_chunk(entry[0]))
+        self.retired.append(entry[0])
+
+    def _end(self, front: bool) -> CircularDeque:
+        """
+        Finds the in-memory deque holding the record at one end, reading a chunk back if needed
+        :param front: True for the front record, False for the back record
+        :return: head or tail, or None if the deque is empty
+        """
+        near, far = (self.head, self.tail) if front else (self.tail, self.head)
+        if near.size:
+            return near
+        if self.middle.size:
+            self._load(front)
+            return near
+        return far if far.size else None
+
+    def enqueue(self, value: bytes, front: bool = True) -> None:
+        """
+        Adds a record to the front (or back) of the deque, spilling records to disk if memory use passes the threshold.
+
+        Args:
+            value (bytes): The record to add.
+            front (bool): If True, adds the record to the front of the deque; if False, adds it to the back.
+
+        Time Complexity:
+            O(1)* - Amortized constant time per byte, as each record is spilled at most once per pass through memory.
+
+        Space Complexity:
+            O(1)* - Amortized constant space.
+
+        Returns:
+            None
+        """
+        if front:
+            self.head.enqueue(bytes(value), True)
+            self.head_bytes += len(value)
+        else:
+            self.tail.enqueue(bytes(value), False)
+            self.tail_bytes += len(value)
+        if self.head_bytes + self.tail_bytes > self.spill_threshold:
+            self._spill()
+
+    def dequeue(self, front: bool = True) -> bytes:
+        """
+        Removes and returns the front (or back) record of the deque, reading the next chunk from disk if that end of
+        memory has run dry.
+
+        Args:
+            front (bool): If True, removes the front record; if False, removes the back record.
+
+        Time Complexity:
+            O(1)* - Amortized constant time per byte, as each chunk is read once.
+
+        Space Complexity:
+            O(1)* - Amortized constant space.
+
+        Returns:
+            bytes: The removed record, or None if the deque was empty.
+        """
+        end = self._end(front)
+        if end is None:
+            return None
+        value = end.dequeue(front)
+        if end is self.head:
+            self.head_bytes -= len(value)
+        else:
+            self.tail_bytes -= len(value)
+        return value
+
+    def front_element(self) -> bytes:
+        """
+        Retrieves the front record without removing it, reading the first chunk from disk if needed.
+
+        Time Complexity:
+            O(1)* - Amortized constant time.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            bytes: The front record, or None if the deque is empty.
+        """
+        end = self._end(True)
+        return None if end is None else end.front_element()
+
+    def back_element(self) -> bytes:
+        """
+        Retrieves the back record without removing it, reading the last chunk from disk if needed.
+
+        Time Complexity:
+            O(1)* - Amortized constant time.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            bytes: The back record, or None if the deque is empty.
+        """
+        end = self._end(False)
+        return None if end is None else end.back_element()
+
+    def memory_usage(self, deep: bool = False) -> dict:
+        """
+        Accounts for the memory held by the hot ends and the chunk index, see CircularDeque.memory_usage. Records
+        spilled to disk are reported separately and are not part of the total.
+
+        Args:
+            deep (bool): If True, also counts the records held in memory themselves.
+
+        Time Complexity:
+            O(c) - Linear time in the number of chunks, plus O(m) with deep, m being the records held in memory.
+
+        Space Complexity:
+            O(1) - Constant space, or O(m) with deep.
+
+        Returns:
+            dict: Bytes by kind: live, slack, overhead (including the chunk index), payload and total, plus
+            spilled_records and spilled_bytes, the records and payload bytes held in chunk files.
+        """
+        head = self.head.memory_usage(deep)
+        tail = self.tail.memory_usage(deep)
+        index = self.middle.memory_usage()['total']
+        if self.middle.size:
+            # Every manifest entry is a tuple of three ints
+            entry = self.middle.front_element()
+            index += self.middle.size * (sys.getsizeof(entry) + sum(map(sys.getsizeof, entry)))
+        overhead = sys.getsizeof(self) + head['overhead'] + tail['overhead'] + index
+        return _memory_report(head['live'] + tail['live'], head['slack'] + tail['slack'], overhead,
+                              head['payload'] + tail['payload'], spilled_records=self.middle_size,
+                              spilled_bytes=sum(entry[2] for entry in self.middle))
+
+    def flush(self) -> None:
+        """
+        Persists the whole deque, so that reopening the directory after a crash restores it as it is now.
+        The hot ends are written as chunks of their own (they stay in memory), the manifest is replaced atomically,
+        and only then are chunks from the previous flush that are no longer referenced deleted.
+
+        Time Complexity:
+            O(m) - Linear time in the records held in memory plus the number of chunks.
+
+        Space Complexity:
+            O(m) - Linear space in the records held in memory plus the number of chunks.
+
+        Returns:
+            None
+        """
+        entries = list(self.middle)
+        snapshots = []
+        if self.head.size:
+            snapshots.append(self._write_chunk(list(self.head)))
+            entries.insert(0, snapshots[-1])
+        if self.tail.size:
+            snapshots.append(self._write_chunk(list(self.tail)))
+            entries.append(snapshots[-1])
+
+        parts = [MAGIC, MANIFEST_HEADER.pack(self.next_chunk_id, len(entries))]
+        parts.extend(MANIFEST_ENTRY.pack(*entry) for entry in entries)
+        replace_file(os.path.join(self.directory, MANIFEST), b''.join(parts))
+        fsync_directory(self.directory)
+
+        for chunk_id in self.retired:
+            os.remove(self._path(chunk_id))
+        # The hot-end snapshots are only needed until the next flush, which writes fresh ones
+        self.retired = [entry[0] for entry in snapshots]
+
+    def close(self) -> None:
+        """
+        Flushes the deque; it may be reopened from its directory afterwards
+        :return: None
+        """
+        self.flush()
+
+    def __enter__(self) -> 'PersistentCircularDeque':
+        """
+        :return: this deque
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Flushes the deque
+        :return: None
+        """
+        self.close()
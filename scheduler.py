@@ -0,0 +1,238 @@
+"""
+Project 5: Deque
+scheduler.py
+Priority lanes of CircularDeques with O(1) highest-priority pops and weighted fair draining
+"""
+
+from typing import List, TypeVar
+
+from solution import CircularDeque, ResizePolicy
+
+T = TypeVar('T')
+
+
+class LaneScheduler:
+    """
+    A fixed number of FIFO lanes, each a CircularDeque, where lane 0 has the highest priority
+    Bit i of bitmap is set exactly when lane i is non-empty, so the highest-priority non-empty lane is the lowest set
+    bit, found with bitmap & -bitmap in O(1) for any practical number of lanes instead of by scanning the lanes.
+    pop drains by strict priority. pop_fair drains by smooth weighted round-robin: every pick adds each non-empty
+    lane's weight to its credit, takes from the lane with the most credit and charges it the total weight, so over any
+    stretch where the same lanes stay busy each gets picked in proportion to its weight, interleaved rather than in
+    bursts. Each lane grows and shrinks through the usual CircularDeque resize policy.
+    """
+
+    __slots__ = ['lanes', 'weights', 'credits', 'bitmap', 'size']
+
+    def __init__(self, lanes: int = 4, weights: List[int] = None, policy: ResizePolicy = None) -> None:
+        """
+        Creates a LaneScheduler with empty lanes
+        :param lanes: the number of lanes
+        :param weights: the share of pop_fair picks each lane gets while busy, defaulting to equal shares
+        :param policy: growth and shrink rules for every lane
+        :return: None
+        """
+        if lanes < 1:
+            raise ValueError(f"lanes must be at least 1, got {lanes}")
+        if weights is None:
+            weights = [1] * lanes
+        if len(weights) != lanes:
+            raise ValueError(f"expected {lanes} weights, got {len(weights)}")
+        if any(weight < 1 for weight in weights):
+            raise ValueError(f"weights must be at least 1, got {weights}")
+        self.lanes: List[CircularDeque] = [CircularDeque(policy=policy) for _ in range(lanes)]
+        self.weights: List[int] = list(weights)
+        self.credits: List[int] = [0] * lanes
+        self.bitmap: int = 0
+        self.size: int = 0
+
+    def __len__(self) -> int:
+        """
+        :return: the number of items across all lanes
+        """
+        return self.size
+
+    def is_empty(self) -> bool:
+        """
+        :return: True if every lane is empty
+        """
+        return self.size == 0
+
+    def push(self, item: T, lane: int = 0, front: bool = False) -> None:
+        """
+        Adds an item to the back (or front) of a lane.
+
+        Args:
+            item (T): The item to add.
+            lane (int): The lane, 0 being the highest priority.
+            front (bool): If True, adds the item to the front of the lane so it is the lane's next pop.
+
+        Time Complexity:
+            O(1)* - Amortized constant time.
+
+        Space Complexity:
+            O(1)* - Amortized constant space.
+
+        Returns:
+            None
+        """
+        if not 0 <= lane < len(self.lanes):
+            raise IndexError(f"lane {lane} out of range for {len(self.lanes)} lanes")
+        self.lanes[lane].enqueue(item, front)
+        self.bitmap |= 1 << lane
+        self.size += 1
+
+    def _take(self, lane: int) -> T:
+        """
+        Removes the front item of a non-empty lane, clearing its bit and credit if that empties it
+        :param lane: lane index
+        :return: the item
+        """
+        deque = self.lanes[lane]
+        item = deque.dequeue()
+        self.size -= 1
+        if deque.size == 0:
+            self.bitmap &= ~(1 << lane)
+            # An idle lane does not bank credit for when it is busy again
+            self.credits[lane] = 0
+        return item
+
+    def _take_many(self, lane: int, count: int) -> List[T]:
+        """
+        Removes up to count items from the front of a non-empty lane, clearing its bit and credit if that empties it
+        :param lane: lane index
+        :param count: the most items to remove
+        :return: the items
+        """
+        deque = self.lanes[lane]
+        items = deque.popmany(count)
+        self.size -= len(items)
+        if deque.size == 0:
+            self.bitmap &= ~(1 << lane)
+            self.credits[lane] = 0
+        return items
+
+    def peek(self) -> T:
+        """
+        Retrieves the item pop would return, without removing it.
+
+        Time Complexity:
+            O(1) - Constant time.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            T: The front item of the highest-priority non-empty lane, or None if every lane is empty.
+        """
+        if not self.bitmap:
+            return None
+        return self.lanes[(self.bitmap & -self.bitmap).bit_length() - 1].front_element()
+
+    def pop(self) -> T:
+        """
+        Removes and returns the front item of the highest-priority non-empty lane.
+
+        Time Complexity:
+            O(1)* - Amortized constant time, as the lane is found from the lowest set bit of the bitmap.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            T: The removed item, or None if every lane is empty.
+        """
+        bitmap = self.bitmap
+        if not bitmap:
+            return None
+        lane = (bitmap & -bitmap).bit_length() - 1
+        deque = self.lanes[lane]
+        item = deque.dequeue()
+        self.size -= 1
+        if deque.size == 0:
+            self.bitmap = bitmap ^ (1 << lane)
+            self.credits[lane] = 0
+        return item
+
+    def _pick_fair(self) -> int:
+        """
+        Makes one smooth weighted round-robin pick among the non-empty lanes, updating their credits
+        :return: the lane picked, which must then be popped
+        """
+        best = -1
+        total = 0
+        bits = self.bitmap
+        while bits:
+            low = bits & -bits
+            lane = low.bit_length() - 1
+            bits ^= low
+            self.credits[lane] += self.weights[lane]
+            total += self.weights[lane]
+            if best < 0 or self.credits[lane] > self.credits[best]:
+                best = lane
+        self.credits[best] -= total
+        return best
+
+    def pop_fair(self) -> T:
+        """
+        Removes and returns the front item of the lane picked by smooth weighted round-robin.
+
+        Time Complexity:
+            O(m) - Linear time in the number of non-empty lanes.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            T: The removed item, or None if every lane is empty.
+        """
+        if not self.bitmap:
+            return None
+        return self._take(self._pick_fair())
+
+    def pop_many(self, n: int, fair: bool = False) -> List[T]:
+        """
+        Removes and returns up to n items, taken from each lane with a single popmany.
+        By strict priority, the items are drained lane by lane from the highest priority. With fair, the lanes are
+        picked by the same round-robin as n calls to pop_fair, and each lane's share is returned in lane order.
+
+        Args:
+            n (int): The maximum number of items to remove.
+            fair (bool): If True, shares the items between lanes by weight; if False, by strict priority.
+
+        Time Complexity:
+            O(k)* - Amortized linear time in the number of items removed, plus O(k * m) integer work for the fair
+            picks, where m is the number of non-empty lanes.
+
+        Space Complexity:
+            O(k) - Linear space in the number of items removed.
+
+        Returns:
+            List[T]: The removed items, which is empty if every lane was empty.
+        """
+        items = []
+        n = min(n, self.size)
+        if fair:
+            # Make the picks first, tracking how many items each lane has left, then take each lane's share at once
+            counts = [0] * len(self.lanes)
+            bitmap = self.bitmap
+            for _ in range(n):
+                lane = self._pick_fair()
+                counts[lane] += 1
+                if counts[lane] == self.lanes[lane].size:
+                    self.bitmap &= ~(1 << lane)
+                    self.credits[lane] = 0
+            self.bitmap = bitmap
+            bits = bitmap
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                lane = low.bit_length() - 1
+                if counts[lane]:
+                    items.extend(self._take_many(lane, counts[lane]))
+            return items
+
+        while len(items) < n:
+            lane = (self.bitmap & -self.bitmap).bit_length() - 1
+            items.extend(self._take_many(lane, n - len(items)))
+        return items
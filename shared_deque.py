@@ -0,0 +1,265 @@
+"""
+Project 5: Deque
+shared_deque.py
+Fixed-capacity deque of byte records in shared memory, usable from several processes
+"""
+
+import multiprocessing
+import struct
+import sys
+from multiprocessing import shared_memory
+
+from solution import _memory_report
+
+# capacity, record_size, front, size
+HEADER = struct.Struct('<qqqq')
+# Length prefix of every slot
+LENGTH = struct.Struct('<I')
+
+
+class SharedCircularDeque:
+    """
+    Circular deque of byte strings whose header and slots live in one multiprocessing.shared_memory block
+    The block starts with the header (capacity, record_size, front, size) and is followed by capacity slots, each a
+    4-byte length prefix and record_size bytes of payload, so records of any length up to record_size share one fixed
+    slot size. Every operation holds a cross-process lock while it reads and writes the header, so any number of
+    processes may enqueue and dequeue at both ends.
+    The capacity is fixed: enqueue on a full deque returns False instead of growing. The process that creates the deque
+    owns the block and should unlink it once every process has closed it. Passing a deque to a child process as a
+    Process argument attaches the child to the same block and lock, as does attach(name, lock) with an inherited lock.
+    A multiprocessing.Lock may only be shared by inheritance, so to send a deque through a multiprocessing queue or
+    pickle it otherwise, create it with a lock that pickles, such as multiprocessing.Manager().Lock().
+    """
+
+    __slots__ = ['shm', 'lock', 'capacity', 'record_size', 'slot_size', 'buffer', 'owner']
+
+    def __init__(self, capacity: int = 1024, record_size: int = 256, lock=None) -> None:
+        """
+        Creates an empty SharedCircularDeque in a new shared memory block
+        :param capacity: number of slots
+        :param record_size: the most bytes a single record may hold
+        :param lock: a multiprocessing lock to guard the deque, or None to create one that is shared by inheritance only
+        :return: None
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        if record_size < 1:
+            raise ValueError(f"record_size must be at least 1, got {record_size}")
+        slot_size = LENGTH.size + record_size
+        shm = shared_memory.SharedMemory(create=True, size=HEADER.size + capacity * slot_size)
+        HEADER.pack_into(shm.buf, 0, capacity, record_size, 0, 0)
+        self._bind(shm, multiprocessing.Lock() if lock is None else lock, True)
+
+    def _bind(self, shm: shared_memory.SharedMemory, lock, owner: bool) -> None:
+        """
+        Points this deque at a shared memory block whose header is already written
+        :param shm: the shared memory block
+        :param lock: the lock guarding the block
+        :param owner: True if this process created the block
+        :return: None
+        """
+        self.shm = shm
+        self.lock = lock
+        self.owner: bool = owner
+        self.buffer: memoryview = shm.buf
+        self.capacity, self.record_size, _, _ = HEADER.unpack_from(shm.buf, 0)
+        self.slot_size: int = LENGTH.size + self.record_size
+
+    @classmethod
+    def attach(cls, name: str, lock) -> 'SharedCircularDeque':
+        """
+        Attaches to an existing SharedCircularDeque by the name of its shared memory block
+        :param name: the block's name, as given by the name property of the deque that created it
+        :param lock: the lock of the deque that created it
+        :return: a SharedCircularDeque sharing that block
+        """
+        deque = cls.__new__(cls)
+        deque._bind(shared_memory.SharedMemory(name=name), lock, False)
+        return deque
+
+    def __reduce__(self):
+        """
+        Pickles the deque as a reference to its block and lock, so an unpickled copy attaches to the same deque
+        :return: the attach call that rebuilds it
+        """
+        return self.attach, (self.shm.name, self.lock)
+
+    @property
+    def name(self) -> str:
+        """
+        :return: the name of the shared memory block
+        """
+        return self.shm.name
+
+    def __len__(self) -> int:
+        """
+        :return: the number of records, which may be stale as soon as it is returned
+        """
+        with self.lock:
+            return HEADER.unpack_from(self.buffer, 0)[3]
+
+    def is_empty(self) -> bool:
+        """
+        :return: True if the deque held no records when checked
+        """
+        return len(self) == 0
+
+    def _read(self, index: int) -> bytes:
+        """
+        :param index: slot index
+        :return: a copy of the record stored in the slot
+        """
+        offset = HEADER.size + index * self.slot_size
+        length = LENGTH.unpack_from(self.buffer, offset)[0]
+        start = offset + LENGTH.size
+        return bytes(self.buffer[start:start + length])
+
+    def enqueue(self, value: bytes, front: bool = True) -> bool:
+        """
+        Adds a record to the front (or back) of the deque.
+
+        Args:
+            value (bytes): The record, at most record_size bytes.
+            front (bool): If True, adds the record to the front of the deque; if False, adds it to the back.
+
+        Time Complexity:
+            O(m) - Linear time in the length of the record, as it is copied into shared memory.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            bool: True if the record was added, False if the deque was full.
+        """
+        length = len(value)
+        if length > self.record_size:
+            raise ValueError(f"record of {length} bytes does not fit in {self.record_size}-byte slots")
+        with self.lock:
+            capacity, _, first, size = HEADER.unpack_from(self.buffer, 0)
+            if size == capacity:
+                return False
+            if front:
+                first = (first - 1) % capacity
+                index = first
+            else:
+                index = (first + size) % capacity
+            offset = HEADER.size + index * self.slot_size
+            LENGTH.pack_into(self.buffer, offset, length)
+            start = offset + LENGTH.size
+            self.buffer[start:start + length] = value
+            HEADER.pack_into(self.buffer, 0, capacity, self.record_size, first, size + 1)
+            return True
+
+    def dequeue(self, front: bool = True) -> bytes:
+        """
+        Removes and returns the front (or back) record of the deque.
+
+        Args:
+            front (bool): If True, removes the front record; if False, removes the back record.
+
+        Time Complexity:
+            O(m) - Linear time in the length of the record, as it is copied out of shared memory.
+
+        Space Complexity:
+            O(m) - Linear space in the length of the record.
+
+        Returns:
+            bytes: The removed record, or None if the deque was empty.
+        """
+        with self.lock:
+            capacity, _, first, size = HEADER.unpack_from(self.buffer, 0)
+            if size == 0:
+                return None
+            if front:
+                value = self._read(first)
+                first = (first + 1) % capacity
+            else:
+                value = self._read((first + size - 1) % capacity)
+            HEADER.pack_into(self.buffer, 0, capacity, self.record_size, first, size - 1)
+            return value
+
+    def front_element(self) -> bytes:
+        """
+        Retrieves the front record without removing it.
+
+        Time Complexity:
+            O(m) - Linear time in the length of the record.
+
+        Space Complexity:
+            O(m) - Linear space in the length of the record.
+
+        Returns:
+            bytes: The front record, or None if the deque is empty.
+        """
+        with self.lock:
+            _, _, first, size = HEADER.unpack_from(self.buffer, 0)
+            return self._read(first) if size else None
+
+    def back_element(self) -> bytes:
+        """
+        Retrieves the back record without removing it.
+
+        Time Complexity:
+            O(m) - Linear time in the length of the record.
+
+        Space Complexity:
+            O(m) - Linear space in the length of the record.
+
+        Returns:
+            bytes: The back record, or None if the deque is empty.
+        """
+        with self.lock:
+            capacity, _, first, size = HEADER.unpack_from(self.buffer, 0)
+            return self._read((first + size - 1) % capacity) if size else None
+
+    def memory_usage(self, deep: bool = False) -> dict:
+        """
+        Accounts for the shared memory block and this process's handle on it. Records are stored in their slots, so
+        there is no separate payload.
+
+        Args:
+            deep (bool): Accepted for the same interface as the other backends; payload is always 0.
+
+        Time Complexity:
+            O(1) - Constant time.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            dict: Bytes by kind: live (slots holding records), slack (free slots), overhead (the block header and the
+            deque object), payload (0) and their total.
+        """
+        with self.lock:
+            size = HEADER.unpack_from(self.buffer, 0)[3]
+        return _memory_report(size * self.slot_size, (self.capacity - size) * self.slot_size,
+                              HEADER.size + sys.getsizeof(self), 0)
+
+    def close(self) -> None:
+        """
+        Detaches this process from the shared memory block; the deque must not be used afterwards
+        :return: None
+        """
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """
+        Frees the shared memory block once every process has closed it; only the creating process should call this
+        :return: None
+        """
+        self.shm.unlink()
+
+    def __enter__(self) -> 'SharedCircularDeque':
+        """
+        :return: this deque
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Closes the deque, and unlinks its block if this process created it
+        :return: None
+        """
+        self.close()
+        if self.owner:
+            self.unlink()
@@ -0,0 +1,319 @@
+"""
+Project 5: Deque
+sliding_window.py
+Running sum, mean, variance, min and max over count- or time-based sliding windows
+"""
+
+from math import fsum, sqrt
+from time import monotonic
+from typing import Callable, Iterable, Union
+
+from solution import CircularDeque
+
+Number = Union[int, float]
+
+
+class SlidingWindow:
+    """
+    Aggregates over the most recent samples of a stream, each in amortized O(1) per sample
+    A count-based window (size) keeps the last size samples in a CircularDeque bounded by maxlen, so each push
+    overwrites the oldest sample in place. A time-based window (duration) keeps every sample pushed less than duration
+    seconds ago, with a parallel deque of timestamps. A window may have both limits.
+    The sum is kept exactly, the mean and variance by Welford's algorithm extended to remove samples, and the min and
+    max by monotonic deques. Removing a sample undoes its update only up to rounding, so once as many samples have left
+    as the window holds, the sum, mean and variance are recomputed from the samples, which keeps the error bounded at
+    an amortized O(1) per sample. A window whose samples are all equal reports that value and a variance of exactly 0. These hold sequence numbers rather than values: sample number seq lives at index
+    seq - evicted of the window, where evicted counts every sample that has left it, so the monotonic deques never
+    copy a value and each sequence number is enqueued and dequeued at most once.
+    """
+
+    __slots__ = ['size', 'duration', 'clock', 'values', 'times', 'pushed', 'evicted', 'stale', 'total', 'average',
+                 'm2', 'minimums', 'maximums']
+
+    def __init__(self, size: int = None, duration: float = None, clock: Callable[[], float] = monotonic) -> None:
+        """
+        Creates an empty SlidingWindow
+        :param size: the most samples in the window, or None for no count limit
+        :param duration: the most seconds a sample stays in the window, or None for no time limit
+        :param clock: gives the current time for samples pushed without a timestamp
+        :return: None
+        """
+        if size is None and duration is None:
+            raise ValueError("a window needs a size, a duration or both")
+        if size is not None and size < 1:
+            raise ValueError(f"size must be at least 1, got {size}")
+        if duration is not None and duration <= 0:
+            raise ValueError(f"duration must be positive, got {duration}")
+        self.size: int = size
+        self.duration: float = duration
+        self.clock: Callable[[], float] = clock
+        self.values: CircularDeque = CircularDeque(maxlen=size) if size is not None else CircularDeque()
+        self.times: CircularDeque = CircularDeque() if duration is not None else None
+        self.pushed: int = 0
+        self.evicted: int = 0
+        # Samples evicted since the sum, mean and variance were last recomputed from the window
+        self.stale: int = 0
+        self.total: Number = 0
+        self.average: float = 0.0
+        self.m2: float = 0.0
+        # Sequence numbers of the samples that are still candidates for the min (values increasing front to back)
+        # or the max (values decreasing front to back)
+        self.minimums: CircularDeque = CircularDeque()
+        self.maximums: CircularDeque = CircularDeque()
+
+    def __len__(self) -> int:
+        """
+        :return: the number of samples in the window
+        """
+        return self.values.size
+
+    def _evicted(self, value: Number, count: int) -> None:
+        """
+        Updates the aggregates for the oldest sample leaving the window, after it has been removed from values
+        :param value: the sample
+        :param count: the number of samples the aggregates cover once it has left
+        :return: None
+        """
+        seq = self.evicted
+        self.evicted += 1
+        self.stale += 1
+        self.total -= value
+        if count == 0:
+            self.total = 0
+            self.average = 0.0
+            self.m2 = 0.0
+            self.stale = 0
+        else:
+            delta = value - self.average
+            self.average -= delta / count
+            self.m2 = max(0.0, self.m2 - delta * (value - self.average))
+        if self.minimums.front_element() == seq:
+            self.minimums.dequeue()
+        if self.maximums.front_element() == seq:
+            self.maximums.dequeue()
+
+    def _anchor(self) -> None:
+        """
+        Recomputes the sum, mean and variance from the samples in the window, dropping the rounding error that evicting
+        samples leaves behind. The mean takes one correction pass, so it is exact for a window of equal samples.
+        :return: None
+        """
+        values = self.values
+        count = values.size
+        self.stale = 0
+        total = sum(values)
+        if isinstance(total, float):
+            total = fsum(values)
+        average = total / count
+        average += fsum(value - average for value in values) / count
+        self.total = total
+        self.average = average
+        self.m2 = fsum((value - average) ** 2 for value in values)
+
+    def expire(self, now: float = None) -> None:
+        """
+        Evicts the samples of a time-based window that are duration seconds old or older.
+
+        Args:
+            now (float): The current time, defaulting to the window's clock.
+
+        Time Complexity:
+            O(1)* - Amortized constant time, as every sample is evicted once.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            None
+        """
+        if self.times is None:
+            return
+        cutoff = (self.clock() if now is None else now) - self.duration
+        times = self.times
+        while times.size and times.front_element() <= cutoff:
+            times.dequeue()
+            self._evicted(self.values.dequeue(), self.values.size)
+        if self.stale and self.stale >= self.values.size:
+            self._anchor()
+
+    def push(self, value: Number, timestamp: float = None) -> None:
+        """
+        Adds a sample to the window, evicting the oldest sample if the window is full and any that have expired.
+
+        Args:
+            value (Number): The sample.
+            timestamp (float): When the sample was taken, for a time-based window; defaults to the window's clock.
+            Timestamps must not decrease.
+
+        Time Complexity:
+            O(1)* - Amortized constant time, as every sample enters and leaves each monotonic deque at most once.
+
+        Space Complexity:
+            O(1)* - Amortized constant space.
+
+        Returns:
+            None
+        """
+        values = self.values
+        if self.times is not None:
+            if timestamp is None:
+                timestamp = self.clock()
+            elif self.times.size and timestamp < self.times.back_element():
+                raise ValueError(f"timestamp {timestamp} is earlier than the last one, {self.times.back_element()}")
+            self.expire(timestamp)
+            if values.size == self.size:
+                self.times.dequeue()
+            self.times.enqueue(timestamp, False)
+
+        if values.size == self.size:
+            # The bounded deque overwrites the oldest sample in place and hands it back
+            self._evicted(values.enqueue(value, False), values.size - 1)
+        else:
+            values.enqueue(value, False)
+
+        seq = self.pushed
+        self.pushed += 1
+        self.total += value
+        delta = value - self.average
+        self.average += delta / values.size
+        self.m2 += delta * (value - self.average)
+        if self.stale >= values.size:
+            self._anchor()
+
+        evicted = self.evicted
+        minimums = self.minimums
+        while minimums.size and values[minimums.back_element() - evicted] >= value:
+            minimums.dequeue(False)
+        minimums.enqueue(seq, False)
+        maximums = self.maximums
+        while maximums.size and values[maximums.back_element() - evicted] <= value:
+            maximums.dequeue(False)
+        maximums.enqueue(seq, False)
+
+    def push_many(self, samples: Iterable[Number], timestamps: Iterable[float] = None) -> None:
+        """
+        Adds samples to the window in order. For a count-based window with no time limit, samples that would be
+        evicted again within the same batch are skipped, so a batch longer than the window costs O(size).
+
+        Args:
+            samples (Iterable[Number]): The samples, oldest first.
+            timestamps (Iterable[float]): One timestamp per sample for a time-based window, or None to take each from
+            the window's clock.
+
+        Time Complexity:
+            O(k)* - Amortized linear time in the number of samples, or O(size) for a long batch on a count-based window.
+
+        Space Complexity:
+            O(k) - Linear space in the number of samples, to materialize the batch.
+
+        Returns:
+            None
+        """
+        if timestamps is not None:
+            for value, timestamp in zip(samples, timestamps):
+                self.push(value, timestamp)
+            return
+
+        samples = samples if isinstance(samples, (list, tuple)) else list(samples)
+        if self.times is None and len(samples) >= self.size:
+            skipped = len(samples) - self.size
+            self.clear()
+            self.pushed += skipped
+            self.evicted = self.pushed
+            samples = samples[skipped:]
+        push = self.push
+        for value in samples:
+            push(value)
+
+    def clear(self) -> None:
+        """
+        Evicts every sample, keeping the sequence numbering going
+        :return: None
+        """
+        self.values = CircularDeque(maxlen=self.size) if self.size is not None else CircularDeque()
+        if self.times is not None:
+            self.times = CircularDeque()
+        self.evicted = self.pushed
+        self.stale = 0
+        self.total = 0
+        self.average = 0.0
+        self.m2 = 0.0
+        self.minimums = CircularDeque()
+        self.maximums = CircularDeque()
+
+    def sum(self) -> Number:
+        """
+        Time Complexity:
+            O(1) - Constant time.
+
+        Returns:
+            Number: The sum of the samples in the window, 0 if it is empty.
+        """
+        return self.total
+
+    def mean(self) -> float:
+        """
+        Time Complexity:
+            O(1) - Constant time.
+
+        Returns:
+            float: The mean of the samples in the window, or None if it is empty.
+        """
+        if self.values.size == 0:
+            return None
+        low = self.min()
+        return float(low) if low == self.max() else self.average
+
+    def variance(self, ddof: int = 0) -> float:
+        """
+        Args:
+            ddof (int): Delta degrees of freedom: 0 for the population variance, 1 for the sample variance.
+
+        Time Complexity:
+            O(1) - Constant time.
+
+        Returns:
+            float: The variance of the samples in the window, or None if there are no more than ddof of them.
+        """
+        count = self.values.size - ddof
+        if count <= 0:
+            return None
+        return 0.0 if self.min() == self.max() else self.m2 / count
+
+    def stdev(self, ddof: int = 0) -> float:
+        """
+        Args:
+            ddof (int): Delta degrees of freedom: 0 for the population standard deviation, 1 for the sample one.
+
+        Time Complexity:
+            O(1) - Constant time.
+
+        Returns:
+            float: The standard deviation of the samples in the window, or None if there are no more than ddof of them.
+        """
+        variance = self.variance(ddof)
+        return None if variance is None else sqrt(variance)
+
+    def min(self) -> Number:
+        """
+        Time Complexity:
+            O(1) - Constant time.
+
+        Returns:
+            Number: The smallest sample in the window, or None if it is empty.
+        """
+        if self.minimums.size == 0:
+            return None
+        return self.values[self.minimums.front_element() - self.evicted]
+
+    def max(self) -> Number:
+        """
+        Time Complexity:
+            O(1) - Constant time.
+
+        Returns:
+            Number: The largest sample in the window, or None if it is empty.
+        """
+        if self.maximums.size == 0:
+            return None
+        return self.values[self.maximums.front_element() - self.evicted]
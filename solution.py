@@ -5,29 +5,143 @@ Authored by Gabriel Sotelo
 starter.py
 """
 
-import gc
-from typing import TypeVar, List
-from random import randint, shuffle
-from timeit import default_timer
-# COMMENT OUT THIS LINE (and `plot_speed`) if you don't want matplotlib
-#from matplotlib import pyplot as plt
+import struct
+import sys
+from array import array, typecodes
+from time import perf_counter_ns
+from typing import TypeVar, List, Iterable, Iterator, Tuple, Callable, Union
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only TypedCircularDeque uses it
+    np = None
+
+from metrics import DequeStats, StatsMixin
 
 T = TypeVar('T')
 CDLLNode = type('CDLLNode')
 
-class CircularDeque:
+# typecode, little-endian flag, capacity, size, maxlen (0 for unbounded)
+TYPED_HEADER = struct.Struct('<c?qqq')
+# Bytes per list slot or node field
+POINTER_SIZE = struct.calcsize('P')
+
+
+def _payload_bytes(items: Iterable[T]) -> int:
+    """
+    :param items: the items of a deque
+    :return: the sys.getsizeof total of the distinct objects among them, counting an object held twice once
+    """
+    seen = set()
+    total = 0
+    for item in items:
+        if id(item) not in seen:
+            seen.add(id(item))
+            total += sys.getsizeof(item)
+    return total
+
+
+def _memory_report(live: int, slack: int, overhead: int, payload: int, **extra: int) -> dict:
+    """
+    :param live: bytes of the slots holding live items
+    :param slack: bytes allocated for items but unused
+    :param overhead: bytes of the structure itself: object headers, node links and buffer headers
+    :param payload: bytes of the item objects themselves, 0 unless measured
+    :param extra: backend-specific entries
+    :return: the report, with their total
+    """
+    return dict(live=live, slack=slack, overhead=overhead, payload=payload,
+                total=live + slack + overhead + payload, **extra)
+
+
+class ResizePolicy:
+    """
+    Rules a CircularDeque follows when it grows and shrinks.
+    The default policy doubles when full and halves once the size drops to 1/4 of the capacity, never going below
+    a capacity of 4. Keeping shrink_threshold well below 1 / growth_factor leaves a gap between the two resize points,
+    so a size that hovers around a boundary does not alternate between grow and shrink.
+    """
+
+    __slots__ = ['growth_factor', 'shrink_threshold', 'min_capacity', 'shrink']
+
+    def __init__(self, growth_factor: float = 2, shrink_threshold: float = 0.25, min_capacity: int = 4,
+                 shrink: bool = True) -> None:
+        """
+        Creates a ResizePolicy
+        :param growth_factor: factor the capacity is multiplied by on grow and divided by on shrink, greater than 1
+        :param shrink_threshold: fraction of the capacity at or below which a dequeue shrinks, below 1 / growth_factor
+        :param min_capacity: smallest capacity a shrink may produce
+        :param shrink: False for a "never shrink" policy, where dequeue never gives memory back
+        :return: None
+        """
+        if growth_factor <= 1:
+            raise ValueError(f"growth_factor must be greater than 1, got {growth_factor}")
+        if not 0 <= shrink_threshold < 1 / growth_factor:
+            raise ValueError(f"shrink_threshold must be in [0, {1 / growth_factor}), got {shrink_threshold}")
+        if min_capacity < 1:
+            raise ValueError(f"min_capacity must be at least 1, got {min_capacity}")
+
+        self.growth_factor = growth_factor
+        self.shrink_threshold = shrink_threshold
+        self.min_capacity = min_capacity
+        self.shrink = shrink
+
+    def __repr__(self) -> str:
+        """
+        :return: a string representation of the ResizePolicy
+        """
+        return (f"ResizePolicy(growth_factor={self.growth_factor}, shrink_threshold={self.shrink_threshold}, "
+                f"min_capacity={self.min_capacity}, shrink={self.shrink})")
+
+    def grown(self, capacity: int) -> int:
+        """
+        :param capacity: the current capacity
+        :return: the capacity after one grow, always larger than the current one
+        """
+        return max(capacity + 1, int(capacity * self.growth_factor))
+
+    def shrunk(self, capacity: int) -> int:
+        """
+        :param capacity: the current capacity
+        :return: the capacity after one shrink, which may be below min_capacity (callers must check)
+        """
+        return int(capacity / self.growth_factor)
+
+    def shrink_size(self, capacity: int) -> int:
+        """
+        Computes the largest size at which a dequeue from a deque of the given capacity should shrink it.
+        This is computed once per resize so that dequeue only has to compare two integers.
+        :param capacity: the current capacity
+        :return: the size threshold, or -1 if a deque of this capacity should never shrink
+        """
+        new_capacity = self.shrunk(capacity)
+        if not self.shrink or new_capacity < self.min_capacity:
+            return -1
+        # The shrunk list must still have room to spare, just as after a grow
+        return min(int(capacity * self.shrink_threshold), new_capacity - 1)
+
+
+DEFAULT_RESIZE_POLICY = ResizePolicy()
+
+
+class CircularDeque(StatsMixin):
     """
     Representation of a Circular Deque using an underlying python list
     """
 
-    __slots__ = ['capacity', 'size', 'queue', 'front', 'back']
+    __slots__ = ['capacity', 'size', 'queue', 'front', 'back', 'policy', 'shrink_size', 'maxlen', 'on_evict',
+                 'stats']
 
-    def __init__(self, data: List[T] = None, front: int = 0, capacity: int = 4):
+    def __init__(self, data: List[T] = None, front: int = 0, capacity: int = 4, policy: ResizePolicy = None,
+                 maxlen: int = None, on_evict: Callable[[T], None] = None):
         """
         Initializes an instance of a CircularDeque
         :param data: starting data to add to the deque, for testing purposes
         :param front: where to begin the insertions, for testing purposes
         :param capacity: number of slots in the Deque
+        :param policy: growth and shrink rules, defaults to doubling and halving at 1/4 full
+        :param maxlen: if given, the deque is a bounded ring buffer of exactly this many slots that never resizes;
+        enqueueing to a full deque overwrites the item at the opposite end
+        :param on_evict: called with each item overwritten by an enqueue to a full bounded deque
         """
         if data is None and front != 0:
             # front will get set to 0 by front_enqueue if the initial data is empty
@@ -35,12 +149,27 @@ class CircularDeque:
         elif data is None:
             data = []
 
+        if maxlen is not None:
+            if maxlen < 1:
+                raise ValueError(f"maxlen must be at least 1, got {maxlen}")
+            if len(data) > maxlen:
+                raise ValueError(f"{len(data)} items do not fit in a deque with maxlen {maxlen}")
+            capacity = maxlen
+
         self.capacity: int = capacity
         self.size: int = len(data)
-        self.queue: List[T] = [None] * capacity
+        self.queue: List[T] = self._allocate(capacity)
         self.back: int = None if not data else self.size + front - 1
         self.front: int = front if data else None
 
+        self.policy: ResizePolicy = DEFAULT_RESIZE_POLICY if policy is None else policy
+        self.maxlen: int = maxlen
+        self.on_evict: Callable[[T], None] = on_evict
+        # Opt-in instrumentation, see enable_stats
+        self.stats: DequeStats = None
+        # A bounded deque never shrinks
+        self.shrink_size: int = self.policy.shrink_size(capacity) if maxlen is None else -1
+
         for index, value in enumerate(data):
             self.queue[index + front] = value
 
@@ -69,6 +198,36 @@ class CircularDeque:
 
     __repr__ = __str__
 
+    def __getstate__(self) -> tuple:
+        """
+        Pickles only the live items, unrolled so the front is first, rather than every slot of the underlying list
+        :return: the live items, capacity, policy (None for the default), maxlen and on_evict
+        """
+        items = self.queue[0:0]
+        for start, stop in self._spans():
+            items += self.queue[start:stop]
+        policy = None if self.policy is DEFAULT_RESIZE_POLICY else self.policy
+        return items, self.capacity, policy, self.maxlen, self.on_evict
+
+    def __setstate__(self, state: tuple) -> None:
+        """
+        Rebuilds an unpickled deque with its items unrolled from index 0
+        :param state: as returned by __getstate__
+        :return: None
+        """
+        items, capacity, policy, maxlen, on_evict = state
+        self.policy = DEFAULT_RESIZE_POLICY if policy is None else policy
+        self.maxlen = maxlen
+        self.on_evict = on_evict
+        self.stats = None
+        self.capacity = capacity
+        self.size = len(items)
+        self.queue = self._allocate(capacity)
+        self.queue[:self.size] = items
+        self.front = 0 if self.size else None
+        self.back = self.size - 1 if self.size else None
+        self.shrink_size = self.policy.shrink_size(capacity) if maxlen is None else -1
+
     # ============ Modifiy Functions Below ============#
 
     def __len__(self) -> int:
@@ -135,11 +294,132 @@ class CircularDeque:
             return self.queue[self.back]
         return None
 
+    def __getitem__(self, index: int) -> T:
+        """
+        Retrieves the item at a logical position, where 0 is the front element and -1 is the back element.
+
+        Args:
+            index (int): The position of the item, which may be negative to count from the back.
+
+        Time Complexity:
+            O(1) - Constant time, as the position is mapped directly to an index of the underlying list.
+
+        Space Complexity:
+            O(1) - Constant space, as no additional space is used.
+
+        Returns:
+            T: The item at the given position.
+        """
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("deque index out of range")
+        return self.queue[(self.front + index) % self.capacity]
+
+    def __iter__(self) -> Iterator[T]:
+        """
+        Iterates over the items from front to back, walking the underlying list in place.
+        Like iterating over a dict, enqueueing to, dequeuing from or resizing the deque during iteration raises a
+        RuntimeError on the next step.
+
+        Time Complexity:
+            O(n) - Linear time over a full iteration, O(1) per item.
+
+        Space Complexity:
+            O(1) - Constant space, as the items are not copied.
+
+        Returns:
+            Iterator[T]: An iterator over the items.
+        """
+        queue, size, front = self.queue, self.size, self.front
+        for start, stop in self._spans():
+            for i in range(start, stop):
+                if self.queue is not queue or self.size != size or self.front != front:
+                    raise RuntimeError("deque mutated during iteration")
+                yield queue[i]
+
+    def __reversed__(self) -> Iterator[T]:
+        """
+        Iterates over the items from back to front, walking the underlying list in place.
+        Like iterating over a dict, enqueueing to, dequeuing from or resizing the deque during iteration raises a
+        RuntimeError on the next step.
+
+        Time Complexity:
+            O(n) - Linear time over a full iteration, O(1) per item.
+
+        Space Complexity:
+            O(1) - Constant space, as the items are not copied.
+
+        Returns:
+            Iterator[T]: An iterator over the items in reverse order.
+        """
+        queue, size, front = self.queue, self.size, self.front
+        for start, stop in reversed(self._spans()):
+            for i in range(stop - 1, start - 1, -1):
+                if self.queue is not queue or self.size != size or self.front != front:
+                    raise RuntimeError("deque mutated during iteration")
+                yield queue[i]
+
+    def __contains__(self, value: T) -> bool:
+        """
+        Checks if a value is in the circular deque.
+
+        Args:
+            value (T): The value to look for.
+
+        Time Complexity:
+            O(n) - Linear time, as it may compare against every item.
+
+        Space Complexity:
+            O(1) - Constant space, as the items are not copied.
+
+        Returns:
+            bool: True if some item equals the value, False otherwise.
+        """
+        try:
+            self.index(value)
+        except ValueError:
+            return False
+        return True
+
+    def index(self, value: T, start: int = 0, stop: int = None) -> int:
+        """
+        Finds the logical position of the first item equal to a value, searching the positions in [start, stop).
+        The search runs over at most two ranges of the underlying list without copying them.
+
+        Args:
+            value (T): The value to look for.
+            start (int): The first position to search, which may be negative to count from the back.
+            stop (int): One past the last position to search, which may be negative; defaults to the size.
+
+        Time Complexity:
+            O(n) - Linear time, as it may compare against every item in the range.
+
+        Space Complexity:
+            O(1) - Constant space, as the items are not copied.
+
+        Returns:
+            int: The position of the first matching item, where 0 is the front element.
+        """
+        start, stop, _ = slice(start, stop).indices(self.size)
+        if start < stop:
+            begin = (self.front + start) % self.capacity
+            end = begin + stop - start
+            spans = [(begin, end)] if end <= self.capacity else [(begin, self.capacity), (0, end - self.capacity)]
+            for span_start, span_stop in spans:
+                try:
+                    found = self.queue.index(value, span_start, span_stop)
+                except ValueError:
+                    continue
+                return (found - self.front) % self.capacity
+        raise ValueError(f"{value!r} is not in deque")
+
     def grow(self) -> None:
         """
         Doubles the capacity of the circular deque by creating a new underlying Python list with double the capacity of
-        the old one, and copies the values over. The new list will be 'unrolled' such that the front element is at index
-        0 and the back element is at index size - 1.
+        the old one, and copies the values over with at most two slice copies. The new list will be 'unrolled' such that
+        the front element is at index 0 and the back element is at index size - 1. A custom ResizePolicy may use a
+        growth factor other than 2. A bounded deque (one with a maxlen) never grows.
 
         Time Complexity:
             O(n) - Linear time, as it needs to copy each element from the old list to the new one.
@@ -150,25 +430,17 @@ class CircularDeque:
         Returns:
             None
         """
-        # Create a new list of double capacity
-        new_capacity = self.capacity * 2
-        new_queue = [None] * new_capacity
-
-        # Copy the elements in an "unrolled" fashion
-        for i in range(self.size):
-            new_queue[i] = self.queue[(self.front + i) % self.capacity]
+        if self.maxlen is not None:
+            return
 
-        # Update the attributes
-        self.queue = new_queue
-        self.front = 0
-        self.back = self.size - 1  # -1 because it's 0-indexed
-        self.capacity = new_capacity
+        # Copy the elements into a list of double capacity in an "unrolled" fashion
+        self._resize(self.policy.grown(self.capacity))
 
     def shrink(self) -> None:
         """
-        Reduces the capacity of the circular deque by half, unless doing so would result in a capacity less than or
-        equal to 4. The new list will be 'unrolled' such that the front element is at index 0 and the back element is at
-        index size - 1.
+        Reduces the capacity of the circular deque by half, unless doing so would result in a capacity less than 4.
+        The new list will be 'unrolled' such that the front element is at index 0 and the back element is at index
+        size - 1. A custom ResizePolicy may use a different factor and minimum capacity. A bounded deque never shrinks.
 
         Time Complexity:
             O(n) - Linear time, as it needs to copy each element from the old list to the new one.
@@ -179,23 +451,16 @@ class CircularDeque:
         Returns:
             None
         """
-        new_capacity = self.capacity // 2
-        if new_capacity < 4:
+        new_capacity = self.policy.shrunk(self.capacity)
+        if new_capacity < self.policy.min_capacity or self.maxlen is not None:
             return
 
-        new_queue = [None] * new_capacity
-
-        for i in range(self.size):
-            new_queue[i] = self.queue[(self.front + i) % self.capacity]
-
-        self.queue = new_queue
-        self.front = 0
-        self.back = self.size - 1
-        self.capacity = new_capacity
+        self._resize(new_capacity)
 
-    def enqueue(self, value: T, front: bool = True) -> None:
+    def enqueue(self, value: T, front: bool = True) -> T:
         """
         Adds a value to either the front or back of the circular deque.
+        If the deque is bounded and full, the item at the opposite end is overwritten instead of growing.
 
         Args:
             value (T): The value to be added to the deque.
@@ -203,13 +468,16 @@ class CircularDeque:
 
         Time Complexity:
             O(1)* - Amortized constant time, as it sometimes needs to call the grow method which is O(n).
+            Always O(1) for a bounded deque.
 
         Space Complexity:
             O(1)* - Amortized constant space, as it sometimes needs to allocate new space in the grow method.
 
         Returns:
-            None
+            T: The item evicted from a full bounded deque, otherwise None.
         """
+        if self.size == self.maxlen:
+            return self._overwrite(value, front)
 
         if self.size == 0:  # Enqueuing to an empty deque
             self.front = 0
@@ -223,9 +491,113 @@ class CircularDeque:
             self.queue[self.back] = value
 
         self.size += 1
-        if self.size == self.capacity:
+        if self.stats is not None:
+            self.stats.record_enqueue(front, self.size)
+        if self.size == self.capacity and self.maxlen is None:
             self.grow()
 
+    def popmany(self, n: int, front: bool = True) -> List[T]:
+        """
+        Removes and returns up to n items from either the front or the back of the circular deque, in the order
+        repeated dequeue calls would return them. The items are copied out with at most two slices and the shrink
+        decision is made once at the end, shrinking straight to the final capacity in a single resize.
+
+        Args:
+            n (int): The maximum number of items to remove.
+            front (bool): If True, removes items from the front of the deque; if False, removes them from the back.
+
+        Time Complexity:
+            O(k)* - Amortized linear time in the number of items removed, with at most one O(n) shrink.
+
+        Space Complexity:
+            O(k) - Linear space in the number of items removed.
+
+        Returns:
+            List[T]: The removed items, which is empty if the deque was empty.
+        """
+        count = max(0, min(n, self.size))
+        if count == 0:
+            return self._take(0, 0, not front)
+
+        if front:
+            items = self._take(self.front, count, False)
+            self.front = (self.front + count) % self.capacity
+        else:
+            items = self._take((self.back - count + 1) % self.capacity, count, True)
+            self.back = (self.back - count) % self.capacity
+        self.size -= count
+        if self.stats is not None:
+            self.stats.record_dequeue(front, count)
+
+        if self.size <= self.shrink_size:
+            new_capacity = self.capacity
+            while self.size <= self.policy.shrink_size(new_capacity):
+                new_capacity = self.policy.shrunk(new_capacity)
+            self._resize(new_capacity)
+
+        return items
+
+    def _take(self, start: int, count: int, reverse: bool) -> List[T]:
+        """
+        Copies count items out of the underlying list, starting at index start and wrapping around its end.
+
+        Args:
+            start (int): The index of the first item.
+            count (int): The number of items, at most the capacity.
+            reverse (bool): If True, the items are returned last to first.
+
+        Time Complexity:
+            O(k) - Linear time in the number of items, done as at most two slices.
+
+        Space Complexity:
+            O(k) - Linear space in the number of items.
+
+        Returns:
+            List[T]: The items.
+        """
+        end = start + count
+        if end <= self.capacity:
+            items = self.queue[start:end]
+        else:
+            items = self.queue[start:] + self.queue[:end - self.capacity]
+        return items[::-1] if reverse else items
+
+    def _overwrite(self, value: T, front: bool) -> T:
+        """
+        Adds a value to one end of a full bounded deque by evicting the item at the opposite end.
+
+        Args:
+            value (T): The value to be added to the deque.
+            front (bool): If True, adds the value to the front and evicts the back item; if False, adds it to the back
+            and evicts the front item.
+
+        Time Complexity:
+            O(1) - Constant time, as it only moves the front and back indices.
+
+        Space Complexity:
+            O(1) - Constant space, as the evicted item's slot is reused.
+
+        Returns:
+            T: The evicted item.
+        """
+        if front:
+            evicted = self.queue[self.back]
+            self.back = (self.back - 1) % self.capacity
+            self.front = (self.front - 1) % self.capacity
+            self.queue[self.front] = value
+        else:
+            evicted = self.queue[self.front]
+            self.front = (self.front + 1) % self.capacity
+            self.back = (self.back + 1) % self.capacity
+            self.queue[self.back] = value
+
+        if self.stats is not None:
+            self.stats.record_enqueue(front, self.size)
+            self.stats.evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(evicted)
+        return evicted
+
     def dequeue(self, front: bool = True) -> T:
         """
         Removes and returns an item from either the front or the back of the circular deque.
@@ -256,194 +628,1323 @@ class CircularDeque:
 
         # Decrement the size
         self.size -= 1
+        if self.stats is not None:
+            self.stats.record_dequeue(front)
 
-        # Check if we need to shrink the underlying list
-        if self.size <= (self.capacity // 4) and (self.capacity // 2) >= 4:
+        # Check if we need to shrink the underlying list (threshold precomputed from the policy on every resize)
+        if self.size <= self.shrink_size:
             self.shrink()
 
         return removed_value
 
-class CDLLNode:
-    """
-    Node for the CDLL
-    """
+    def _resize(self, new_capacity: int) -> None:
+        """
+        Moves the live items into a new underlying list of the given capacity, 'unrolled' such that the front element
+        is at index 0 and the back element is at index size - 1. The live items occupy at most two contiguous runs of
+        the old list (the head run up to the end of the list, and the tail run that wrapped around to index 0), so the
+        copy is done with at most two slice assignments rather than one modulo and index per element.
+
+        Args:
+            new_capacity (int): The capacity of the new underlying list, which must be greater than size.
 
-    __slots__ = ['val', 'next', 'prev']
+        Time Complexity:
+            O(n) - Linear time, as it needs to copy each element from the old list to the new one.
 
-    def __init__(self, val: T, next: CDLLNode = None, prev: CDLLNode = None) -> None:
-        """
-        Creates a CDLL node
-        :param val: value stored by the next
-        :param next: the next node in the list
-        :param prev: the previous node in the list
-        :return: None
-        """
-        self.val = val
-        self.next = next
-        self.prev = prev
+        Space Complexity:
+            O(n) - Linear space, as it creates a new list of the requested capacity.
 
-    def __eq__(self, other: CDLLNode) -> bool:
+        Returns:
+            None
         """
-        Compares two CDLLNodes by value
-        :param other: The other node
-        :return: true if comparison is true, else false
+        if self.stats is not None:
+            started = perf_counter_ns()
+        grew = new_capacity > self.capacity
+        self._adopt(self._copy(new_capacity), new_capacity)
+        if self.stats is not None:
+            self.stats.record_resize(grew, perf_counter_ns() - started)
+
+    def _copy(self, new_capacity: int) -> List[T]:
         """
-        return self.val == other.val
-
-    def __str__(self) -> str:
+        Copies the live items, unrolled, into a new underlying list without installing it
+        :param new_capacity: the capacity of the new list, greater than size
+        :return: the new list
         """
-        Returns a string representation of the node
-        :return: string
+        new_queue = self._allocate(new_capacity)
+        copied = 0
+        for start, stop in self._spans():
+            new_queue[copied:copied + stop - start] = self.queue[start:stop]
+            copied += stop - start
+        return new_queue
+
+    def _adopt(self, new_queue: List[T], new_capacity: int) -> None:
         """
-        return "<= (" + str(self.val) + ") =>"
-
-    __repr__ = __str__
+        Installs a list made by _copy as the underlying list; the deque must not have changed in between
+        :param new_queue: the new list
+        :param new_capacity: its capacity
+        :return: None
+        """
+        self.queue = new_queue
+        self.front = 0
+        self.back = self.size - 1
+        self.capacity = new_capacity
+        self.shrink_size = self.policy.shrink_size(new_capacity)
 
+    def _allocate(self, capacity: int) -> List[T]:
+        """
+        Creates an empty underlying list with the given number of slots.
 
-class CDLL:
-    """
-    A (C)ircular (D)oubly (L)inked (L)ist
-    """
+        Args:
+            capacity (int): The number of slots.
 
-    __slots__ = ['head', 'size']
+        Time Complexity:
+            O(n) - Linear time in the capacity.
 
-    def __init__(self) -> None:
-        """
-        Creates a CDLL
-        :return: None
-        """
-        self.size = 0
-        self.head = None
+        Space Complexity:
+            O(n) - Linear space in the capacity.
 
-    def __len__(self) -> int:
-        """
-        :return: the size of the CDLL
+        Returns:
+            List[T]: A list of capacity None values.
         """
-        return self.size
+        return [None] * capacity
 
-    def __eq__(self, other: 'CDLL') -> bool:
-        """
-        Compares two CDLLs by value
-        :param other: the other CDLL
-        :return: true if comparison is true, else false
+    def _sequence(self, iterable: Iterable[T]) -> List[T]:
         """
-        n1: CDLLNode = self.head
-        n2: CDLLNode = other.head
-        for _ in range(self.size):
-            if n1 != n2:
-                return False
-            n1, n2 = n1.next, n2.next
-        return True
+        Materializes an iterable into a sequence that can be slice-assigned into the underlying list.
 
-    def __str__(self) -> str:
-        """
-        :return: a string representation of the CDLL
-        """
-        n1: CDLLNode = self.head
-        joinable: List[str] = []
-        while n1 is not self.head:
-            joinable.append(str(n1))
-            n1 = n1.next
-        return ''.join(joinable)
+        Args:
+            iterable (Iterable[T]): The values to materialize.
 
-    __repr__ = __str__
+        Time Complexity:
+            O(k) - Linear time in the number of values, or O(1) if it already is a list or tuple.
 
-    # ============ Modifiy Functions Below ============#
+        Space Complexity:
+            O(k) - Linear space in the number of values, or O(1) if it already is a list or tuple.
 
-    def insert(self, val: T, front: bool = True) -> None:
+        Returns:
+            List[T]: The values as a list or tuple.
         """
-        Inserts a new node with the given value into the circular doubly linked list (CDLL).
-
-        Args:
-            val (T): The value to be inserted into the CDLL.
-            front (bool, optional): A flag that indicates whether to insert the node at the front (True) or back (False)
-            of the CDLL. Defaults to True.
+        return iterable if isinstance(iterable, (list, tuple)) else list(iterable)
 
-        The new node is inserted at the front of the CDLL if 'front' is True, and at the back if 'front' is False.
-        If the CDLL is empty, the new node will be the only node in the CDLL and its next and prev pointers will point
-        to itself, maintaining the circular property of the CDLL.
+    def _spans(self) -> List[Tuple[int, int]]:
+        """
+        Returns the (start, stop) index ranges of the underlying list that hold the live items, in front to back order.
+        There are no ranges for an empty deque, one when the items are contiguous, and two when they wrap around.
 
         Time Complexity:
-            O(1) - Constant time, as it performs a fixed number of operations regardless of the size of the CDLL.
+            O(1) - Constant time, as it only does arithmetic on the front index and size.
 
         Space Complexity:
-            O(1) - Constant space, as it only creates one new node and does not use any additional space that grows with
-            the input.
+            O(1) - Constant space, as it returns at most two ranges.
 
         Returns:
-            None
+            List[Tuple[int, int]]: The half-open index ranges of the live items.
         """
-        new_node = CDLLNode(val)
+        if self.size == 0:
+            return []
+        end = self.front + self.size
+        if end <= self.capacity:
+            return [(self.front, end)]
+        return [(self.front, self.capacity), (0, end - self.capacity)]
 
-        if not self.head:
+    def reserve(self, n: int) -> None:
+        """
+        Grows the circular deque, if needed, so that it can hold n items without calling grow. The capacity is grown by
+        the policy's growth factor until it exceeds n and the items are copied over once, so callers can pay the resize
+        cost up front instead of on the enqueue that happens to fill the deque. Later dequeues may still shrink the
+        deque unless the policy never shrinks. A bounded deque is never resized.
+
+        Args:
+            n (int): The number of items the deque should be able to hold.
+
+        Time Complexity:
+            O(n) - Linear time, as it may need to copy each element to a new list.
+
+        Space Complexity:
+            O(n) - Linear space, as it may create a new, larger list.
+
+        Returns:
+            None
+        """
+        if self.maxlen is not None:
+            return
+
+        new_capacity = self.capacity
+        while new_capacity <= n:
+            new_capacity = self.policy.grown(new_capacity)
+        if new_capacity != self.capacity:
+            self._resize(new_capacity)
+
+    def shrink_to_fit(self) -> None:
+        """
+        Shrinks the capacity of the circular deque as many times as possible in a single resize, stopping before the
+        capacity would drop below the policy's minimum or would no longer exceed the size. This applies even under a
+        "never shrink" policy, since it is an explicit request. A bounded deque is never resized.
+
+        Time Complexity:
+            O(n) - Linear time, as it may need to copy each element to a new list.
+
+        Space Complexity:
+            O(n) - Linear space, as it may create a new, smaller list.
+
+        Returns:
+            None
+        """
+        if self.maxlen is not None:
+            return
+
+        new_capacity = self.capacity
+        while self.policy.shrunk(new_capacity) >= self.policy.min_capacity and \
+                self.policy.shrunk(new_capacity) > self.size:
+            new_capacity = self.policy.shrunk(new_capacity)
+        if new_capacity != self.capacity:
+            self._resize(new_capacity)
+
+    def extend(self, iterable: Iterable[T], front: bool = False) -> None:
+        """
+        Adds every value of an iterable to either the back or the front of the circular deque, in iteration order.
+        Equivalent to calling enqueue on each value, but the underlying list is resized at most once (sized up front
+        using len() when the iterable supports it) and each wrapped segment is written with a single slice assignment.
+        A bounded deque enqueues the values one at a time so that every overwritten item is evicted in order.
+
+        Args:
+            iterable (Iterable[T]): The values to be added to the deque.
+            front (bool): If True, adds the values to the front of the deque (so the last value ends up as the front
+            element); if False, adds them to the back.
+
+        Time Complexity:
+            O(k)* - Amortized linear time in the number of values added, with at most one O(n) resize.
+
+        Space Complexity:
+            O(k)* - Amortized linear space in the number of values added.
+
+        Returns:
+            None
+        """
+        if self.maxlen is not None:
+            for value in iterable:
+                self.enqueue(value, front)
+            return
+
+        values = self._sequence(iterable)
+        count = len(values)
+        if count == 0:
+            return
+
+        # Reserve once so the deque is never full after the bulk write, just as it is after enqueue
+        needed = self.size + count
+        self.reserve(needed)
+
+        if front:
+            # The last value enqueued to the front becomes the front element
+            values = values[::-1]
+            if self.size == 0:
+                start = 0
+                self.back = count - 1
+            else:
+                start = (self.front - count) % self.capacity
+            self.front = start
+        else:
+            if self.size == 0:
+                start = 0
+                self.front = 0
+            else:
+                start = (self.back + 1) % self.capacity
+            self.back = (start + count - 1) % self.capacity
+
+        self._place(start, values)
+        self.size = needed
+        if self.stats is not None:
+            self.stats.record_enqueue(front, needed, count)
+
+    def _place(self, start: int, values: List[T]) -> None:
+        """
+        Writes values into the underlying list, starting at index start and wrapping around its end.
+
+        Args:
+            start (int): The index of the first value.
+            values (List[T]): The values, at most the capacity of them, in a sequence the list accepts in a slice
+            assignment.
+
+        Time Complexity:
+            O(k) - Linear time in the number of values, done as at most two slice assignments.
+
+        Space Complexity:
+            O(1) - Constant space beyond the slices of values.
+
+        Returns:
+            None
+        """
+        # Up to the end of the list, then the part that wraps around to index 0
+        count = len(values)
+        head = min(count, self.capacity - start)
+        self.queue[start:start + head] = values[:head]
+        if head < count:
+            self.queue[:count - head] = values[head:]
+
+    def extendleft(self, iterable: Iterable[T]) -> None:
+        """
+        Adds every value of an iterable to the front of the circular deque, in iteration order, so the values end up
+        in reverse order. Equivalent to extend(iterable, front=True).
+
+        Args:
+            iterable (Iterable[T]): The values to be added to the front of the deque.
+
+        Time Complexity:
+            O(k)* - Amortized linear time in the number of values added, with at most one O(n) resize.
+
+        Space Complexity:
+            O(k)* - Amortized linear space in the number of values added.
+
+        Returns:
+            None
+        """
+        self.extend(iterable, front=True)
+
+    def rotate(self, k: int = 1) -> None:
+        """
+        Rotates the circular deque k steps to the right, so the back k items move to the front (to the left, for a
+        negative k), like collections.deque.rotate. A full deque has no free slots, so the items stay in place and
+        only the front and back indices move. Otherwise the shorter of the two runs, the back k items or the front
+        n - k, is copied across to the other end with at most two slices each way. The capacity never changes, so
+        rotating never triggers a grow or shrink.
+
+        Args:
+            k (int): The number of steps to rotate right, or left if negative.
+
+        Time Complexity:
+            O(min(k, n - k)) - Linear time in the shorter run, or O(1) when the deque is full.
+
+        Space Complexity:
+            O(min(k, n - k)) - Linear space in the shorter run, or O(1) when the deque is full.
+
+        Returns:
+            None
+        """
+        if self.size <= 1:
+            return
+        k %= self.size
+        if k == 0:
+            return
+
+        if self.size == self.capacity:
+            self.front = (self.front - k) % self.capacity
+            self.back = (self.back - k) % self.capacity
+        elif k <= self.size - k:
+            # Copy with the base _take, since a subclass's may return a view of slots about to be overwritten
+            items = CircularDeque._take(self, (self.back - k + 1) % self.capacity, k, False)
+            self.front = (self.front - k) % self.capacity
+            self.back = (self.back - k) % self.capacity
+            self._place(self.front, items)
+        else:
+            count = self.size - k
+            items = CircularDeque._take(self, self.front, count, False)
+            self._place((self.back + 1) % self.capacity, items)
+            self.front = (self.front + count) % self.capacity
+            self.back = (self.back + count) % self.capacity
+
+    def reverse(self) -> None:
+        """
+        Reverses the order of the items of the circular deque in place, keeping the same front and back indices.
+
+        Time Complexity:
+            O(n) - Linear time, done as at most two slices out and two slice assignments back.
+
+        Space Complexity:
+            O(n) - Linear space for the reversed copy.
+
+        Returns:
+            None
+        """
+        if self.size > 1:
+            self._place(self.front, CircularDeque._take(self, self.front, self.size, True))
+
+    def _slot_bytes(self) -> int:
+        """
+        :return: the bytes taken by one slot of the underlying list
+        """
+        return POINTER_SIZE
+
+    def _payload(self) -> int:
+        """
+        :return: the bytes of the item objects referenced by the live slots
+        """
+        return _payload_bytes(self)
+
+    def memory_usage(self, deep: bool = False) -> dict:
+        """
+        Accounts for the memory held by the circular deque, which sys.getsizeof does not, since it leaves out the
+        underlying list.
+
+        Args:
+            deep (bool): If True, also counts the item objects themselves (each distinct object once).
+
+        Time Complexity:
+            O(1) - Constant time, or O(n) with deep.
+
+        Space Complexity:
+            O(1) - Constant space, or O(n) with deep to recognize shared items.
+
+        Returns:
+            dict: Bytes by kind: live (slots holding items), slack (unused slots left by grow), overhead (the deque
+            object and the list header), payload (the items, 0 unless deep) and their total.
+        """
+        slot = self._slot_bytes()
+        overhead = sys.getsizeof(self) + sys.getsizeof(self.queue) - self.capacity * slot
+        return _memory_report(self.size * slot, (self.capacity - self.size) * slot, overhead,
+                              self._payload() if deep else 0)
+
+
+class TypedCircularDeque(CircularDeque):
+    """
+    Representation of a Circular Deque of numbers stored unboxed in an underlying array.array
+    Each slot takes the item size of the typecode (8 bytes for 'd' or 'q') instead of a pointer to a boxed object, and
+    the aggregates over the live window run over the raw buffer (through NumPy when it is installed).
+    """
+
+    __slots__ = ['typecode']
+
+    TYPECODES = {float: 'd', int: 'q', bool: 'b'}
+
+    def __init__(self, data: List[T] = None, dtype: Union[str, type] = 'd', front: int = 0, capacity: int = 4,
+                 policy: ResizePolicy = None, maxlen: int = None, on_evict: Callable[[T], None] = None):
+        """
+        Initializes an instance of a TypedCircularDeque
+        :param data: starting data to add to the deque, for testing purposes
+        :param dtype: an array module typecode such as 'd' or 'q', the Python type float or int, or a NumPy dtype
+        :param front: where to begin the insertions, for testing purposes
+        :param capacity: number of slots in the Deque
+        :param policy: growth and shrink rules, defaults to doubling and halving at 1/4 full
+        :param maxlen: if given, the deque is a bounded ring buffer that never resizes
+        :param on_evict: called with each item overwritten by an enqueue to a full bounded deque
+        """
+        self.typecode: str = self._typecode(dtype)
+        super().__init__(data, front, capacity, policy, maxlen, on_evict)
+
+    @classmethod
+    def _typecode(cls, dtype: Union[str, type]) -> str:
+        """
+        Resolves a dtype to an array module typecode
+        :param dtype: an array module typecode, the Python type float or int, or a NumPy dtype
+        :return: the typecode
+        """
+        if dtype in cls.TYPECODES:
+            return cls.TYPECODES[dtype]
+        if isinstance(dtype, str) and len(dtype) == 1 and dtype in typecodes and dtype not in 'uw':
+            return dtype
+        if np is not None:
+            try:
+                code = np.dtype(dtype).char
+            except TypeError:
+                code = None
+            if code is not None and code in typecodes and code not in 'uw':
+                return code
+        raise ValueError(f"unsupported dtype {dtype!r}, expected one of {typecodes.replace('u', '').replace('w', '')}")
+
+    def _allocate(self, capacity: int) -> array:
+        """
+        Creates a zero-filled underlying array with the given number of slots.
+
+        Args:
+            capacity (int): The number of slots.
+
+        Time Complexity:
+            O(n) - Linear time in the capacity.
+
+        Space Complexity:
+            O(n) - Linear space in the capacity.
+
+        Returns:
+            array: An array of capacity zeros.
+        """
+        return array(self.typecode, [0]) * capacity
+
+    def _sequence(self, iterable: Iterable[T]) -> array:
+        """
+        Materializes an iterable into an array of this deque's typecode, so it can be slice-assigned.
+
+        Args:
+            iterable (Iterable[T]): The values to materialize.
+
+        Time Complexity:
+            O(k) - Linear time in the number of values, or O(1) if it already is an array of this typecode.
+
+        Space Complexity:
+            O(k) - Linear space in the number of values, or O(1) if it already is an array of this typecode.
+
+        Returns:
+            array: The values as an array.
+        """
+        if isinstance(iterable, array) and iterable.typecode == self.typecode:
+            return iterable
+        return array(self.typecode, iterable)
+
+    def __setstate__(self, state: tuple) -> None:
+        """
+        Rebuilds an unpickled deque, taking the typecode from the pickled array of items
+        :param state: as returned by __getstate__
+        :return: None
+        """
+        self.typecode = state[0].typecode
+        super().__setstate__(state)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the deque as a fixed header followed by the raw bytes of the live items, front first.
+
+        Time Complexity:
+            O(n) - Linear time, but as a single copy of at most two contiguous buffers rather than per-item work.
+
+        Space Complexity:
+            O(n) - Linear space in the number of items.
+
+        Returns:
+            bytes: The serialized deque, which from_bytes restores (policy and on_evict are not included).
+        """
+        header = TYPED_HEADER.pack(self.typecode.encode(), sys.byteorder == 'little', self.capacity, self.size,
+                                   self.maxlen or 0)
+        view = memoryview(self.queue)
+        return b''.join([header] + [view[start:stop] for start, stop in self._spans()])
+
+    @classmethod
+    def from_bytes(cls, data: bytes, policy: ResizePolicy = None,
+                   on_evict: Callable[[T], None] = None) -> 'TypedCircularDeque':
+        """
+        Restores a deque serialized by to_bytes, byte-swapping the items if it was written on a machine of the other
+        byte order.
+
+        Args:
+            data (bytes): The serialized deque.
+            policy (ResizePolicy): Growth and shrink rules for the restored deque.
+            on_evict (Callable[[T], None]): Called with each item overwritten by an enqueue to a full bounded deque.
+
+        Time Complexity:
+            O(n) - Linear time, as a buffer copy.
+
+        Space Complexity:
+            O(n) - Linear space in the capacity.
+
+        Returns:
+            TypedCircularDeque: The restored deque, its items unrolled from index 0.
+        """
+        typecode, little, capacity, size, maxlen = TYPED_HEADER.unpack_from(data, 0)
+        items = array(typecode.decode())
+        items.frombytes(memoryview(data)[TYPED_HEADER.size:])
+        if len(items) != size:
+            raise ValueError(f"expected {size} items, found {len(items)}")
+        if little != (sys.byteorder == 'little'):
+            items.byteswap()
+        deque = cls.__new__(cls)
+        deque.__setstate__((items, capacity, policy, maxlen or None, on_evict))
+        return deque
+
+    def _slot_bytes(self) -> int:
+        """
+        :return: the bytes taken by one slot of the underlying array, which holds the number itself
+        """
+        return self.queue.itemsize
+
+    def _payload(self) -> int:
+        """
+        :return: 0, as the numbers are stored in the slots rather than as separate objects
+        """
+        return 0
+
+    def _windows(self) -> list:
+        """
+        Returns zero-copy views of the live items, one per contiguous span of the underlying array.
+        The views are NumPy arrays when NumPy is installed, and memoryviews otherwise.
+
+        Time Complexity:
+            O(1) - Constant time, as no items are copied.
+
+        Space Complexity:
+            O(1) - Constant space, as there are at most two views.
+
+        Returns:
+            list: The views, in front to back order.
+        """
+        if np is not None:
+            buffer = np.frombuffer(self.queue, dtype=self.typecode)
+        else:
+            buffer = memoryview(self.queue)
+        return [buffer[start:stop] for start, stop in self._spans()]
+
+    def _take(self, start: int, count: int, reverse: bool) -> memoryview:
+        """
+        Returns count items of the underlying array, starting at index start and wrapping around its end.
+        Contiguous items are returned as a zero-copy view of the array, which stays valid until the slots are reused by
+        a later enqueue; wrapped items are first copied into a new array.
+
+        Args:
+            start (int): The index of the first item.
+            count (int): The number of items, at most the capacity.
+            reverse (bool): If True, the items are returned last to first.
+
+        Time Complexity:
+            O(1) - Constant time for contiguous items, O(k) when they wrap around.
+
+        Space Complexity:
+            O(1) - Constant space for contiguous items, O(k) when they wrap around.
+
+        Returns:
+            memoryview: A view of the items.
+        """
+        end = start + count
+        if end <= self.capacity:
+            items = memoryview(self.queue)[start:end]
+        else:
+            items = memoryview(self.queue[start:] + self.queue[:end - self.capacity])
+        return items[::-1] if reverse else items
+
+    def to_numpy(self) -> 'np.ndarray':
+        """
+        Copies the live items, front to back, into a new NumPy array.
+
+        Time Complexity:
+            O(n) - Linear time, done as at most two vectorized copies.
+
+        Space Complexity:
+            O(n) - Linear space for the returned array.
+
+        Returns:
+            np.ndarray: The live items.
+        """
+        if np is None:
+            raise ImportError("TypedCircularDeque.to_numpy requires numpy")
+        windows = self._windows()
+        if not windows:
+            return np.empty(0, dtype=self.typecode)
+        return np.concatenate(windows)
+
+    def sum(self) -> Union[int, float]:
+        """
+        Sums the live items.
+
+        Time Complexity:
+            O(n) - Linear time, run over the raw buffer without unrolling it.
+
+        Space Complexity:
+            O(1) - Constant space, as the buffer is not copied.
+
+        Returns:
+            Union[int, float]: The sum, 0 for an empty deque.
+        """
+        total = 0
+        for window in self._windows():
+            total += window.sum() if np is not None else sum(window)
+        return total.item() if hasattr(total, 'item') else total
+
+    def mean(self) -> float:
+        """
+        Averages the live items.
+
+        Time Complexity:
+            O(n) - Linear time, run over the raw buffer without unrolling it.
+
+        Space Complexity:
+            O(1) - Constant space, as the buffer is not copied.
+
+        Returns:
+            float: The mean, or None if the deque is empty.
+        """
+        if self.size == 0:
+            return None
+        return self.sum() / self.size
+
+    def min(self) -> Union[int, float]:
+        """
+        Finds the smallest live item.
+
+        Time Complexity:
+            O(n) - Linear time, run over the raw buffer without unrolling it.
+
+        Space Complexity:
+            O(1) - Constant space, as the buffer is not copied.
+
+        Returns:
+            Union[int, float]: The smallest item, or None if the deque is empty.
+        """
+        if self.size == 0:
+            return None
+        if np is not None:
+            return min(window.min() for window in self._windows()).item()
+        return min(min(window) for window in self._windows())
+
+    def max(self) -> Union[int, float]:
+        """
+        Finds the largest live item.
+
+        Time Complexity:
+            O(n) - Linear time, run over the raw buffer without unrolling it.
+
+        Space Complexity:
+            O(1) - Constant space, as the buffer is not copied.
+
+        Returns:
+            Union[int, float]: The largest item, or None if the deque is empty.
+        """
+        if self.size == 0:
+            return None
+        if np is not None:
+            return max(window.max() for window in self._windows()).item()
+        return max(max(window) for window in self._windows())
+
+
+class CDLLNode:
+    """
+    Node for the CDLL
+    """
+
+    __slots__ = ['val', 'next', 'prev', 'gen']
+
+    def __init__(self, val: T, next: CDLLNode = None, prev: CDLLNode = None) -> None:
+        """
+        Creates a CDLL node
+        :param val: value stored by the next
+        :param next: the next node in the list
+        :param prev: the previous node in the list
+        :return: None
+        """
+        self.val = val
+        self.next = next
+        self.prev = prev
+        # Bumped whenever the node is removed, so handles taken before then go stale
+        self.gen = 0
+
+    def __eq__(self, other: CDLLNode) -> bool:
+        """
+        Compares two CDLLNodes by value
+        :param other: The other node
+        :return: true if comparison is true, else false
+        """
+        return self.val == other.val
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the node
+        :return: string
+        """
+        return "<= (" + str(self.val) + ") =>"
+
+    __repr__ = __str__
+
+
+class CDLLHandle:
+    """
+    Handle on a node of a CDLL, as returned by CDLL.insert(handle=True), insert_after and insert_before
+    The handle records the node's generation when it was taken. Removing the node bumps its generation, so once the
+    node is removed (and perhaps recycled by the node pool for another value) the handle is stale and every CDLL method
+    taking it raises ValueError instead of touching whatever the node now holds. A handle must only be passed to the
+    CDLL currently holding its node, which after a splice or split_at is the CDLL the node moved to.
+    """
+
+    __slots__ = ['node', 'gen']
+
+    def __init__(self, node: CDLLNode) -> None:
+        """
+        Creates a handle on a node in its current generation
+        :param node: a node in a CDLL
+        :return: None
+        """
+        self.node: CDLLNode = node
+        self.gen: int = node.gen
+
+    @property
+    def valid(self) -> bool:
+        """
+        :return: True if the node has not been removed since the handle was taken
+        """
+        return self.node.gen == self.gen
+
+    @property
+    def val(self) -> T:
+        """
+        :return: the value of the node
+        """
+        if self.node.gen != self.gen:
+            raise ValueError("stale handle: its node has been removed")
+        return self.node.val
+
+    def __str__(self) -> str:
+        """
+        :return: a string representation of the handle
+        """
+        return f"CDLLHandle({self.node.val!r})" if self.valid else "CDLLHandle(<stale>)"
+
+    __repr__ = __str__
+
+
+class CDLL(StatsMixin):
+    """
+    A (C)ircular (D)oubly (L)inked (L)ist
+    """
+
+    __slots__ = ['head', 'size', 'free', 'free_count', 'pool_size', 'pool_hits', 'pool_misses', 'stats']
+
+    def __init__(self, pool_size: int = 0) -> None:
+        """
+        Creates a CDLL
+        :param pool_size: how many removed nodes to keep for reuse by later inserts, 0 to disable the node pool
+        :return: None
+        """
+        self.size = 0
+        self.head = None
+        # Removed nodes kept for reuse, chained through their next pointers
+        self.free = None
+        self.free_count = 0
+        self.pool_size = pool_size
+        self.pool_hits = 0
+        self.pool_misses = 0
+        # Opt-in instrumentation, see enable_stats
+        self.stats = None
+
+    def __len__(self) -> int:
+        """
+        :return: the size of the CDLL
+        """
+        return self.size
+
+    def __iter__(self) -> Iterator[T]:
+        """
+        :return: an iterator over the values from head to tail
+        """
+        node = self.head
+        for _ in range(self.size):
+            yield node.val
+            node = node.next
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickles the values as a flat list, since pickling the nodes themselves recurses once per node
+        :return: the class, its constructor arguments and the values from head to tail
+        """
+        return self.__class__, (self.pool_size,), list(self)
+
+    def __setstate__(self, values: List[T]) -> None:
+        """
+        Relinks the values of an unpickled CDLL
+        :param values: the values from head to tail
+        :return: None
+        """
+        for value in values:
+            self.insert(value, False)
+
+    def __eq__(self, other: 'CDLL') -> bool:
+        """
+        Compares two CDLLs by value
+        :param other: the other CDLL
+        :return: true if comparison is true, else false
+        """
+        n1: CDLLNode = self.head
+        n2: CDLLNode = other.head
+        for _ in range(self.size):
+            if n1 != n2:
+                return False
+            n1, n2 = n1.next, n2.next
+        return True
+
+    def __str__(self) -> str:
+        """
+        :return: a string representation of the CDLL
+        """
+        n1: CDLLNode = self.head
+        joinable: List[str] = []
+        while n1 is not self.head:
+            joinable.append(str(n1))
+            n1 = n1.next
+        return ''.join(joinable)
+
+    __repr__ = __str__
+
+    # ============ Modifiy Functions Below ============#
+
+    def insert(self, val: T, front: bool = True, handle: bool = False) -> CDLLHandle:
+        """
+        Inserts a new node with the given value into the circular doubly linked list (CDLL).
+
+        Args:
+            val (T): The value to be inserted into the CDLL.
+            front (bool, optional): A flag that indicates whether to insert the node at the front (True) or back (False)
+            of the CDLL. Defaults to True.
+            handle (bool, optional): If True, returns a handle on the new node for remove_node, insert_after,
+            insert_before and move_to_front. Defaults to False.
+
+        The new node is inserted at the front of the CDLL if 'front' is True, and at the back if 'front' is False.
+        If the CDLL is empty, the new node will be the only node in the CDLL and its next and prev pointers will point
+        to itself, maintaining the circular property of the CDLL.
+        The node is taken from the node pool when one is available (a pool hit), and allocated otherwise (a miss).
+
+        Time Complexity:
+            O(1) - Constant time, as it performs a fixed number of operations regardless of the size of the CDLL.
+
+        Space Complexity:
+            O(1) - Constant space, as it only creates one new node and does not use any additional space that grows with
+            the input.
+
+        Returns:
+            CDLLHandle: A handle on the new node if handle is True, otherwise None.
+        """
+        # CDLLCD.enqueue inlines a copy of this body to save the call; change the two together
+        new_node = self._acquire(val)
+        head = self.head
+        if head is None:
             new_node.next = new_node
             new_node.prev = new_node
             self.head = new_node
         else:
+            # Both ends link the node in before head; only the front moves head onto it
+            tail = head.prev
+            new_node.next = head
+            new_node.prev = tail
+            tail.next = new_node
+            head.prev = new_node
             if front:
-                new_node.next = self.head
-                new_node.prev = self.head.prev
-                self.head.prev.next = new_node
-                self.head.prev = new_node
                 self.head = new_node
-            else:
-                new_node.next = self.head
-                new_node.prev = self.head.prev
-                self.head.prev.next = new_node
-                self.head.prev = new_node
 
         self.size += 1
+        if self.stats is not None:
+            self.stats.record_enqueue(front, self.size)
+        if handle:
+            return CDLLHandle(new_node)
+        return None
+
+    def remove(self, front: bool = True) -> T:
+        """
+        Removes a node from the circular doubly linked list (CDLL) and returns its value.
+
+        Args:
+            front (bool, optional): A flag that indicates whether to remove the node from the front (True) or back
+            (False) of the CDLL. Defaults to True.
+
+        The node is removed from the front of the CDLL if 'front' is True, and from the back if 'front' is False.
+        If the CDLL is empty, the method does nothing.
+        If the CDLL has only one node, removing it will set the head to None.
+        The removed node's generation is bumped, so handles on it go stale, and the node is cleared and kept in the node
+        pool if the pool is not full.
+
+        Time Complexity:
+            O(1) - Constant time, as it performs a fixed number of operations regardless of the size of the CDLL.
+
+        Space Complexity:
+            O(1) - Constant space, as it does not use any additional space that grows with the input.
+
+        Returns:
+            T: The value of the removed node, or None if the CDLL was empty.
+        """
+        # CDLLCD.dequeue inlines a copy of this body to save the call; change the two together
+        head = self.head
+        if head is None:
+            return None
+
+        node = head if front else head.prev
+        val = node.val
+        if self.size == 1:
+            self.head = None
+        else:
+            after = node.next
+            before = node.prev
+            before.next = after
+            after.prev = before
+            if front:
+                self.head = after
+
+        self.size -= 1
+        if self.stats is not None:
+            self.stats.record_dequeue(front)
+        self._release(node)
+        return val
+
+    def rotate(self, k: int = 1) -> None:
+        """
+        Rotates the CDLL k steps to the right, so the last k nodes come first (to the left, for a negative k).
+        Only the head pointer moves, walking whichever way round the circle is shorter; no node is relinked or
+        allocated.
+
+        Args:
+            k (int): The number of steps to rotate right, or left if negative.
+
+        Time Complexity:
+            O(min(k, n - k)) - Linear time in the shorter walk.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            None
+        """
+        if self.size <= 1:
+            return
+        k %= self.size
+        node = self.head
+        if k <= self.size - k:
+            for _ in range(k):
+                node = node.prev
+        else:
+            for _ in range(self.size - k):
+                node = node.next
+        self.head = node
+
+    def _acquire(self, val: T) -> CDLLNode:
+        """
+        Takes a node from the node pool (a hit), or allocates one (a miss)
+        :param val: the value for the node
+        :return: the unlinked node
+        """
+        node = self.free
+        if node is not None:
+            self.free = node.next
+            self.free_count -= 1
+            self.pool_hits += 1
+            node.val = val
+        else:
+            self.pool_misses += 1
+            node = CDLLNode(val)
+        return node
+
+    def _release(self, node: CDLLNode) -> None:
+        """
+        Retires a node that has been unlinked: bumps its generation, so handles on it go stale, and pools it if there
+        is room
+        :param node: the node
+        :return: None
+        """
+        node.gen += 1
+        if self.free_count < self.pool_size:
+            node.val = None
+            node.prev = None
+            node.next = self.free
+            self.free = node
+            self.free_count += 1
+
+    def _node(self, handle: CDLLHandle) -> CDLLNode:
+        """
+        :param handle: a handle on a node of this CDLL
+        :return: the node, if the handle is not stale
+        """
+        node = handle.node
+        if node.gen != handle.gen:
+            raise ValueError("stale handle: its node has been removed")
+        return node
+
+    def remove_node(self, handle: CDLLHandle) -> T:
+        """
+        Removes the node a handle refers to, wherever it is in the CDLL, and returns its value.
+
+        Args:
+            handle (CDLLHandle): A handle on a node of this CDLL.
+
+        The node's generation is bumped, so this and every other handle on it go stale, and the node goes to the node
+        pool like any removed node. A stale handle raises ValueError and leaves the CDLL untouched.
+        Removals from the middle are not counted by stats, which only track the ends.
+
+        Time Complexity:
+            O(1) - Constant time, as the node is unlinked from its neighbours directly.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            T: The value of the removed node.
+        """
+        node = self._node(handle)
+        if self.size == 1:
+            self.head = None
+        else:
+            after = node.next
+            before = node.prev
+            before.next = after
+            after.prev = before
+            if node is self.head:
+                self.head = after
+        self.size -= 1
+        val = node.val
+        self._release(node)
+        return val
+
+    def insert_after(self, handle: CDLLHandle, val: T) -> CDLLHandle:
+        """
+        Inserts a new node with the given value right after the node a handle refers to.
+
+        Args:
+            handle (CDLLHandle): A handle on a node of this CDLL.
+            val (T): The value to be inserted.
+
+        A stale handle raises ValueError and leaves the CDLL untouched. Inserting after the back node makes the new
+        node the back.
+
+        Time Complexity:
+            O(1) - Constant time.
+
+        Space Complexity:
+            O(1) - Constant space, as it creates one node (or reuses a pooled one).
+
+        Returns:
+            CDLLHandle: A handle on the new node.
+        """
+        node = self._node(handle)
+        new_node = self._acquire(val)
+        after = node.next
+        new_node.prev = node
+        new_node.next = after
+        node.next = new_node
+        after.prev = new_node
+        self.size += 1
+        return CDLLHandle(new_node)
 
-    def remove(self, front: bool = True) -> None:
+    def insert_before(self, handle: CDLLHandle, val: T) -> CDLLHandle:
         """
-        Removes a node from the circular doubly linked list (CDLL).
+        Inserts a new node with the given value right before the node a handle refers to.
 
         Args:
-            front (bool, optional): A flag that indicates whether to remove the node from the front (True) or back
-            (False) of the CDLL. Defaults to True.
+            handle (CDLLHandle): A handle on a node of this CDLL.
+            val (T): The value to be inserted.
 
-        The node is removed from the front of the CDLL if 'front' is True, and from the back if 'front' is False.
-        If the CDLL is empty, the method does nothing.
-        If the CDLL has only one node, removing it will set the head to None.
+        A stale handle raises ValueError and leaves the CDLL untouched. Inserting before the front node makes the new
+        node the front.
 
         Time Complexity:
-            O(1) - Constant time, as it performs a fixed number of operations regardless of the size of the CDLL.
+            O(1) - Constant time.
 
         Space Complexity:
-            O(1) - Constant space, as it does not use any additional space that grows with the input.
+            O(1) - Constant space, as it creates one node (or reuses a pooled one).
+
+        Returns:
+            CDLLHandle: A handle on the new node.
+        """
+        node = self._node(handle)
+        new_node = self._acquire(val)
+        before = node.prev
+        new_node.prev = before
+        new_node.next = node
+        before.next = new_node
+        node.prev = new_node
+        if node is self.head:
+            self.head = new_node
+        self.size += 1
+        return CDLLHandle(new_node)
+
+    def move_to_front(self, handle: CDLLHandle) -> None:
+        """
+        Moves the node a handle refers to to the front of the CDLL, as a recency list does on every access.
+
+        Args:
+            handle (CDLLHandle): A handle on a node of this CDLL.
+
+        The node itself is relinked, so the handle stays valid. A stale handle raises ValueError and leaves the CDLL
+        untouched.
+
+        Time Complexity:
+            O(1) - Constant time.
+
+        Space Complexity:
+            O(1) - Constant space.
 
         Returns:
             None
         """
-        if not self.head:
+        node = self._node(handle)
+        head = self.head
+        if node is head:
+            return
+        if node is head.prev:
+            # The back node is already just before head, so moving it is a rotation by one
+            self.head = node
             return
+        before = node.prev
+        after = node.next
+        before.next = after
+        after.prev = before
+        tail = head.prev
+        node.prev = tail
+        node.next = head
+        tail.next = node
+        head.prev = node
+        self.head = node
+
+    def splice(self, other: 'CDLL', front: bool = True) -> None:
+        """
+        Moves every node of another CDLL into this one, in order, at the front (or back). The two circles are joined by
+        relinking their heads and tails, so no node is copied or allocated, and other is left empty.
 
-        if self.size == 1:
-            self.head = None
+        Args:
+            other (CDLL): The CDLL to empty into this one; its node pool stays with it.
+            front (bool, optional): If True, other's nodes go before this CDLL's; if False, after them.
+
+        Time Complexity:
+            O(1) - Constant time, whatever the sizes of the two CDLLs.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            None
+        """
+        if other is self:
+            raise ValueError("cannot splice a CDLL into itself")
+        other_head = other.head
+        if other_head is None:
+            return
+        count = other.size
+        head = self.head
+        if head is None:
+            self.head = other_head
         else:
+            tail = head.prev
+            other_tail = other_head.prev
+            tail.next = other_head
+            other_head.prev = tail
+            other_tail.next = head
+            head.prev = other_tail
             if front:
-                self.head.prev.next = self.head.next
-                self.head.next.prev = self.head.prev
-                self.head = self.head.next
-            else:
-                self.head.prev.prev.next = self.head
-                self.head.prev = self.head.prev.prev
+                self.head = other_head
+        self.size += count
+        other.head = None
+        other.size = 0
+        if self.stats is not None:
+            self.stats.record_enqueue(front, self.size, count)
+        if other.stats is not None:
+            other.stats.record_dequeue(front, count)
+
+    def split_at(self, node: Union[CDLLNode, CDLLHandle]) -> 'CDLL':
+        """
+        Cuts the CDLL in two before a node: this CDLL keeps the nodes from the head up to the one before node, and a new
+        CDLL takes node and every node after it. Nodes are relinked, not copied.
 
-        self.size -= 1
+        Args:
+            node (Union[CDLLNode, CDLLHandle]): A node of this CDLL, or a handle on one, which becomes the head of the
+            new one.
+
+        Both halves are counted at once, walking from node forwards and backwards until one walk reaches the head, so
+        only the shorter half is walked. A stale handle, a removed node (whose neighbours no longer point back at it)
+        and a node from another list, detected within n steps, all raise ValueError and leave the CDLL untouched.
+
+        Time Complexity:
+            O(min(k, n - k)) - Linear time in the shorter half, where k is the number of nodes split off.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            CDLL: The nodes from node to the back, with the same pool_size and an empty node pool.
+        """
+        if isinstance(node, CDLLHandle):
+            node = self._node(node)
+        head = self.head
+        if head is None or node.prev is None or node.prev.next is not node or node.next.prev is not node:
+            raise ValueError("node is not in this CDLL")
+        if node is head:
+            split = self.size
+        else:
+            split = None
+            forward = node.next
+            backward = node.prev
+            for steps in range(1, self.size):
+                if forward is head:
+                    split = steps
+                    break
+                if backward is head:
+                    split = self.size - steps
+                    break
+                forward = forward.next
+                backward = backward.prev
+            if split is None:
+                raise ValueError("node is not in this CDLL")
+
+        rest = CDLL(self.pool_size)
+        tail = head.prev
+        if node is not head:
+            before = node.prev
+            before.next = head
+            head.prev = before
+            node.prev = tail
+            tail.next = node
+        else:
+            self.head = None
+        rest.head = node
+        rest.size = split
+        self.size -= split
+        if self.stats is not None:
+            self.stats.record_dequeue(False, split)
+        return rest
+
+    def memory_usage(self, deep: bool = False) -> dict:
+        """
+        Accounts for the memory held by the CDLL, which sys.getsizeof does not, since it leaves out every node.
+
+        Args:
+            deep (bool): If True, also counts the values themselves (each distinct object once).
+
+        Time Complexity:
+            O(1) - Constant time, or O(n) with deep.
+
+        Space Complexity:
+            O(1) - Constant space, or O(n) with deep to recognize shared values.
+
+        Returns:
+            dict: Bytes by kind: live (the value field of each node), slack (nodes kept in the node pool), overhead
+            (the CDLL object and the rest of each node), payload (the values, 0 unless deep) and their total, plus
+            per_node, the bytes of one node.
+        """
+        node = sys.getsizeof(CDLLNode(None))
+        overhead = sys.getsizeof(self) + self.size * (node - POINTER_SIZE)
+        return _memory_report(self.size * POINTER_SIZE, self.free_count * node, overhead,
+                              _payload_bytes(self) if deep else 0, per_node=node)
+
+    def pool_stats(self) -> dict:
+        """
+        Reports how well the node pool is working.
+
+        Time Complexity:
+            O(1) - Constant time, as it only reads counters.
+
+        Space Complexity:
+            O(1) - Constant space, as the dictionary has a fixed number of keys.
 
+        Returns:
+            dict: The pool capacity, the number of nodes currently pooled, and the insert hit and miss counts. With the
+            pool disabled every insert is a miss, so misses always count node allocations.
+        """
+        return {'capacity': self.pool_size, 'pooled': self.free_count,
+                'hits': self.pool_hits, 'misses': self.pool_misses}
 
-class CDLLCD:
+
+class CDLLCD(StatsMixin):
     """
     (C)ircular (D)oubly (L)inked (L)ist (C)ircular (D)equeue
-    This is essentially just an interface for the above
+    This is essentially just an interface for the above. enqueue and dequeue link and unlink nodes themselves rather
+    than calling insert and remove, while node pooling stays in the CDLL's _acquire and _release
     """
 
-    def __init__(self) -> None:
+    __slots__ = ['CDLL']
+
+    def __init__(self, pool_size: int = 0) -> None:
         """
         Initializes the CDLLCD to an empty CDLL
+        :param pool_size: how many removed nodes the CDLL keeps for reuse, 0 to disable the node pool
+        :return: None
+        """
+        self.CDLL: CDLL = CDLL(pool_size)
+
+    def __iter__(self) -> Iterator[T]:
+        """
+        :return: an iterator over the items from front to back
+        """
+        return iter(self.CDLL)
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickles the items as a flat list, see CDLL.__reduce__
+        :return: the class, its constructor arguments and the items from front to back
+        """
+        return self.__class__, (self.CDLL.pool_size,), list(self.CDLL)
+
+    def __setstate__(self, items: List[T]) -> None:
+        """
+        Relinks the items of an unpickled CDLLCD
+        :param items: the items from front to back
         :return: None
         """
-        self.CDLL: CDLL = CDLL()
+        self.CDLL.__setstate__(items)
 
     def __eq__(self, other: 'CDLLCD') -> bool:
         """
@@ -507,10 +2008,8 @@ class CDLLCD:
         Returns:
             T: The first element of the CDLLCD, if it exists. Otherwise, None.
         """
-        if self.CDLL.head:
-            return self.CDLL.head.val
-        else:
-            return None
+        head = self.CDLL.head
+        return head.val if head is not None else None
 
     def back_element(self) -> T:
         """
@@ -525,12 +2024,10 @@ class CDLLCD:
         Returns:
             T: The last element of the CDLLCD, if it exists. Otherwise, None.
         """
-        if self.CDLL.head:
-            return self.CDLL.head.prev.val 
-        else:
-            return None
+        head = self.CDLL.head
+        return head.prev.val if head is not None else None
 
-    def enqueue(self, val: T, front: bool = True) -> None:
+    def enqueue(self, val: T, front: bool = True, handle: bool = False) -> CDLLHandle:
         """
         Adds a value to the CDLLCD.
 
@@ -538,19 +2035,42 @@ class CDLLCD:
             val (T): The value to be added to the CDLLCD.
             front (bool, optional): Indicates whether to add the value to the front (True) or back (False) of the
             CDLLCD. Defaults to True.
+            handle (bool, optional): If True, returns a handle on the value for cancel. Defaults to False.
 
-        This method utilizes the insert function of the CDLL class to add the value.
+        This method links the node into the CDLL itself, the same way as the insert function of the CDLL class, taking
+        the node from the CDLL's node pool.
 
         Time Complexity:
-            O(1) - Constant time, as the insert function of the CDLL class has a time complexity of O(1).
+            O(1) - Constant time, as it performs a fixed number of operations regardless of the size of the CDLLCD.
 
         Space Complexity:
-            O(1) - Constant space, as the insert function of the CDLL class has a space complexity of O(1).
+            O(1) - Constant space, as it only creates one new node.
 
         Returns:
-            None
+            CDLLHandle: A handle on the value if handle is True, otherwise None.
         """
-        self.CDLL.insert(val, front)
+        # An inlined copy of CDLL.insert, which saves a call per enqueue; change the two together
+        cdll = self.CDLL
+        node = cdll._acquire(val)
+        head = cdll.head
+        if head is None:
+            node.next = node
+            node.prev = node
+            cdll.head = node
+        else:
+            tail = head.prev
+            node.next = head
+            node.prev = tail
+            tail.next = node
+            head.prev = node
+            if front:
+                cdll.head = node
+        cdll.size += 1
+        if cdll.stats is not None:
+            cdll.stats.record_enqueue(front, cdll.size)
+        if handle:
+            return CDLLHandle(node)
+        return None
 
     def dequeue(self, front: bool = True) -> T:
         """
@@ -560,11 +2080,11 @@ class CDLLCD:
             front (bool, optional): Indicates whether to remove the value from the front (True) or back (False) of the
             CDLLCD. Defaults to True.
 
-        This method utilizes the remove function of the CDLL class to remove the value.
+        This method unlinks the node from the CDLL itself, the same way as the remove function of the CDLL class, and
+        returns the node to the CDLL's node pool.
 
         Time Complexity:
-            O(1) - Constant time, as both the front_element, back_element and remove functions of the CDLL class have a
-            time complexity of O(1).
+            O(1) - Constant time, as it performs a fixed number of operations regardless of the size of the CDLLCD.
 
         Space Complexity:
             O(1) - Constant space, as it does not use any additional space that grows with the input.
@@ -572,185 +2092,364 @@ class CDLLCD:
         Returns:
             T: The value removed from the CDLLCD, if it is not empty. Otherwise, None.
         """
-        if self.is_empty():
+        # An inlined copy of CDLL.remove, which saves a call per dequeue; change the two together
+        cdll = self.CDLL
+        head = cdll.head
+        if head is None:
             return None
-        val = self.front_element() if front else self.back_element()
-        self.CDLL.remove(front)
+        node = head if front else head.prev
+        val = node.val
+        if cdll.size == 1:
+            cdll.head = None
+        else:
+            after = node.next
+            before = node.prev
+            before.next = after
+            after.prev = before
+            if front:
+                cdll.head = after
+        cdll.size -= 1
+        if cdll.stats is not None:
+            cdll.stats.record_dequeue(front)
+        cdll._release(node)
         return val
 
+    def cancel(self, handle: CDLLHandle) -> T:
+        """
+        Removes a value from wherever it is in the CDLLCD, given the handle enqueue returned for it.
+
+        Args:
+            handle (CDLLHandle): The handle, which raises ValueError if the value has already been dequeued or
+            cancelled.
+
+        Time Complexity:
+            O(1) - Constant time, as CDLL.remove_node unlinks the node directly instead of searching for it.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            T: The removed value.
+        """
+        return self.CDLL.remove_node(handle)
+
+    def rotate(self, k: int = 1) -> None:
+        """
+        Rotates the CDLLCD k steps to the right, so the back k items move to the front (to the left, for a negative
+        k), by walking the head pointer of the CDLL rather than dequeuing and enqueuing nodes.
+
+        Args:
+            k (int): The number of steps to rotate right, or left if negative.
+
+        Time Complexity:
+            O(min(k, n - k)) - Linear time in the shorter walk around the CDLL.
+
+        Space Complexity:
+            O(1) - Constant space, as no node is allocated.
+
+        Returns:
+            None
+        """
+        self.CDLL.rotate(k)
+
+    def splice(self, other: 'CDLLCD', front: bool = True) -> None:
+        """
+        Moves every item of another CDLLCD into this one, in order, at the front (or back), leaving other empty.
+
+        Args:
+            other (CDLLCD): The queue to drain into this one.
+            front (bool, optional): If True, other's items go before this CDLLCD's; if False, after them.
+
+        Time Complexity:
+            O(1) - Constant time, as the nodes are relinked by CDLL.splice rather than dequeued and enqueued.
+
+        Space Complexity:
+            O(1) - Constant space.
+
+        Returns:
+            None
+        """
+        self.CDLL.splice(other.CDLL, front)
+
+    def memory_usage(self, deep: bool = False) -> dict:
+        """
+        Accounts for the memory held by the CDLLCD and its CDLL, see CDLL.memory_usage.
+
+        Args:
+            deep (bool): If True, also counts the items themselves (each distinct object once).
+
+        Time Complexity:
+            O(1) - Constant time, or O(n) with deep.
+
+        Space Complexity:
+            O(1) - Constant space, or O(n) with deep to recognize shared items.
+
+        Returns:
+            dict: Bytes by kind: live, slack, overhead, payload and total, plus per_node.
+        """
+        usage = self.CDLL.memory_usage(deep)
+        overhead = usage['overhead'] + sys.getsizeof(self)
+        return _memory_report(usage['live'], usage['slack'], overhead, usage['payload'], per_node=usage['per_node'])
+
+    @property
+    def stats(self) -> DequeStats:
+        """
+        :return: the stats kept by the underlying CDLL, or None if they are disabled
+        """
+        return self.CDLL.stats
+
+    @stats.setter
+    def stats(self, stats: DequeStats) -> None:
+        """
+        Keeps stats on the underlying CDLL, whose insert and remove record them
+        :param stats: the stats, or None to disable them
+        :return: None
+        """
+        self.CDLL.stats = stats
+
 
-def plot_speed():
+class UnrolledCDLLCD(StatsMixin):
     """
-    Compares performance of the CDLLCD and the standard array based deque
+    Unrolled (C)ircular (D)oubly (L)inked (L)ist (C)ircular (D)equeue
+    Each CDLL node holds a fixed-size block of items rather than a single item, in the same way as CPython's
+    collections.deque, so node overhead is paid once per block and there is never a whole-structure resize.
+    The front block is filled leftwards from index left and the back block rightwards up to index right.
     """
 
-    # First we'll test sequences of basic operations
+    __slots__ = ['blocks', 'block_size', 'left', 'right', 'size', 'stats']
+
+    def __init__(self, block_size: int = 64) -> None:
+        """
+        Initializes the UnrolledCDLLCD to a single empty block
+        :param block_size: number of items held by each block, at least 2
+        :return: None
+        """
+        if block_size < 2:
+            raise ValueError(f"block_size must be at least 2, got {block_size}")
+        self.block_size: int = block_size
+        self.blocks: CDLL = CDLL()
+        self.blocks.insert([None] * block_size)
+        self.size: int = 0
+        # Start in the middle of the block so either end can grow without allocating
+        self.left: int = block_size // 2
+        self.right: int = self.left - 1
+        # Opt-in instrumentation, see enable_stats
+        self.stats: DequeStats = None
+
+    def __iter__(self) -> Iterator[T]:
+        """
+        :return: an iterator over the items from front to back
+        """
+        block = self.blocks.head
+        index = self.left
+        for _ in range(self.size):
+            if index == self.block_size:
+                block = block.next
+                index = 0
+            yield block.val[index]
+            index += 1
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickles the items as a flat list, without the empty slots of the end blocks
+        :return: the class, its constructor arguments and the items from front to back
+        """
+        return self.__class__, (self.block_size,), list(self)
+
+    def __setstate__(self, items: List[T]) -> None:
+        """
+        Refills the blocks of an unpickled UnrolledCDLLCD
+        :param items: the items from front to back
+        :return: None
+        """
+        for item in items:
+            self.enqueue(item, False)
+
+    def __eq__(self, other: 'UnrolledCDLLCD') -> bool:
+        """
+        Compares two UnrolledCDLLCDs by value
+        :param other: the other UnrolledCDLLCD
+        :return: true if equal, else false
+        """
+        return self.size == other.size and all(a == b for a, b in zip(self, other))
+
+    def __str__(self) -> str:
+        """
+        :return: string representation of the UnrolledCDLLCD
+        """
+        return "UnrolledCDLLCD <" + ", ".join(str(val) for val in self) + ">"
+
+    __repr__ = __str__
+
+    def __len__(self) -> int:
+        """
+        Returns the number of items in the UnrolledCDLLCD.
+
+        Time Complexity:
+            O(1) - Constant time, as it directly returns the size attribute.
+
+        Space Complexity:
+            O(1) - Constant space, as no additional space is used.
+
+        Returns:
+            int: The number of items in the UnrolledCDLLCD.
+        """
+        return self.size
+
+    def is_empty(self) -> bool:
+        """
+        Checks if the UnrolledCDLLCD is empty.
+
+        Time Complexity:
+            O(1) - Constant time, as it directly compares the size attribute to 0.
+
+        Space Complexity:
+            O(1) - Constant space, as no additional space is used.
+
+        Returns:
+            bool: True if the UnrolledCDLLCD is empty, False otherwise.
+        """
+        return self.size == 0
+
+    def front_element(self) -> T:
+        """
+        Retrieves the first element in the UnrolledCDLLCD.
+
+        Time Complexity:
+            O(1) - Constant time, as it directly indexes the front block.
+
+        Space Complexity:
+            O(1) - Constant space, as no additional space is used.
+
+        Returns:
+            T: The first element, or None if the UnrolledCDLLCD is empty.
+        """
+        if self.size == 0:
+            return None
+        return self.blocks.head.val[self.left]
+
+    def back_element(self) -> T:
+        """
+        Retrieves the last element in the UnrolledCDLLCD.
+
+        Time Complexity:
+            O(1) - Constant time, as it directly indexes the back block.
+
+        Space Complexity:
+            O(1) - Constant space, as no additional space is used.
 
-    sizes = [100*i for i in range(0, 200, 5)]
+        Returns:
+            T: The last element, or None if the UnrolledCDLLCD is empty.
+        """
+        if self.size == 0:
+            return None
+        return self.blocks.head.prev.val[self.right]
 
-    # (1) Grow large
-    grow_avgs_array = []
-    grow_avgs_CDLL = []
-
-    for size in sizes:
-        grow_avgs_array.append(0)
-        grow_avgs_CDLL.append(0)
-        data = list(range(size))
-        for trial in range(3):
-
-            gc.collect()  # What happens if you remove this? Hint: memory fragmention
-            cd_array = CircularDeque()
-            cd_DLL = CDLLCD()
+    def enqueue(self, val: T, front: bool = True) -> None:
+        """
+        Adds a value to the front or back of the UnrolledCDLLCD, adding a new block when the end block is full.
 
-            # randomize data
-            shuffle(data)
-
-            start = default_timer()
-            for item in data:
-                cd_array.enqueue(item, item % 2)
-            grow_avgs_array[-1] += (default_timer() - start)/3
-
-            start = default_timer()
-            for item in data:
-                cd_DLL.enqueue(item, item % 2)
-            grow_avgs_CDLL[-1] += (default_timer() - start)/3
-
-    plt.plot(sizes, grow_avgs_array, color='blue', label='Array')
-    plt.plot(sizes, grow_avgs_CDLL, color='red', label='CDLL')
-    plt.title("Enqueue and Grow")
-    plt.legend(loc='best')
-    plt.show()
-
-    # (2) Grow Large then Shrink to zero
-
-    shrink_avgs_array = []
-    shrink_avgs_CDLL = []
+        Args:
+            val (T): The value to be added.
+            front (bool, optional): Indicates whether to add the value to the front (True) or back (False).
+            Defaults to True.
 
-    for size in sizes:
-        shrink_avgs_array.append(0)
-        shrink_avgs_CDLL.append(0)
-        data = list(range(size))
+        Time Complexity:
+            O(1) - Constant time, as at most one block is allocated.
 
-        for trial in range(3):
+        Space Complexity:
+            O(1) - Constant space, as at most one fixed-size block is allocated.
 
-            gc.collect()
-            cd_array = CircularDeque()
-            cd_DLL = CDLLCD()
+        Returns:
+            None
+        """
+        if front:
+            if self.left == 0:
+                self.blocks.insert([None] * self.block_size)
+                self.left = self.block_size
+            self.left -= 1
+            self.blocks.head.val[self.left] = val
+        else:
+            if self.right == self.block_size - 1:
+                self.blocks.insert([None] * self.block_size, front=False)
+                self.right = -1
+            self.right += 1
+            self.blocks.head.prev.val[self.right] = val
+        self.size += 1
+        if self.stats is not None:
+            self.stats.record_enqueue(front, self.size)
 
-            # randomize data
-            shuffle(data)
+    def dequeue(self, front: bool = True) -> T:
+        """
+        Removes and returns a value from the front or back of the UnrolledCDLLCD, releasing the end block once it has
+        been emptied. The slot is cleared so the block does not keep the value alive.
 
-            start = default_timer()
-            for item in data:
-                cd_array.enqueue(item, item % 2)
-            for item in data:
-                cd_array.dequeue(not item % 2)
-            shrink_avgs_array[-1] += (default_timer() - start)/3
+        Args:
+            front (bool, optional): Indicates whether to remove the value from the front (True) or back (False).
+            Defaults to True.
 
-            start = default_timer()
-            for item in data:
-                cd_DLL.enqueue(item, item % 2)
-            for item in data:
-                cd_DLL.dequeue(not item % 2)
-            shrink_avgs_CDLL[-1] += (default_timer() - start)/3
+        Time Complexity:
+            O(1) - Constant time, as at most one block is released.
 
-    plt.plot(sizes, shrink_avgs_array, color='blue', label='Array')
-    plt.plot(sizes, shrink_avgs_CDLL, color='red', label='CDLL')
-    plt.title("Enqueue, Grow, Dequeue, Shrink")
-    plt.legend(loc='best')
-    plt.show()
+        Space Complexity:
+            O(1) - Constant space, as it does not use any additional space that grows with the input.
 
-    # (3) Test with random operations
+        Returns:
+            T: The value removed, if the UnrolledCDLLCD is not empty. Otherwise, None.
+        """
+        if self.size == 0:
+            return None
 
-    random_avgs_array = []
-    random_avgs_CDLL = []
+        self.size -= 1
+        if self.stats is not None:
+            self.stats.record_dequeue(front)
+        if front:
+            block = self.blocks.head.val
+            val = block[self.left]
+            block[self.left] = None
+            self.left += 1
+            if self.size == 0:
+                # Recenter the last block rather than releasing it
+                self.left = self.block_size // 2
+                self.right = self.left - 1
+            elif self.left == self.block_size:
+                self.blocks.remove()
+                self.left = 0
+        else:
+            block = self.blocks.head.prev.val
+            val = block[self.right]
+            block[self.right] = None
+            self.right -= 1
+            if self.size == 0:
+                self.left = self.block_size // 2
+                self.right = self.left - 1
+            elif self.right == -1:
+                self.blocks.remove(front=False)
+                self.right = self.block_size - 1
+        return val
 
-    for size in sizes:
-        random_avgs_array.append(0)
-        random_avgs_CDLL.append(0)
-        data = list(range(size))
+    def memory_usage(self, deep: bool = False) -> dict:
+        """
+        Accounts for the memory held by the UnrolledCDLLCD, its blocks and the CDLL linking them.
 
-        for trial in range(3):
+        Args:
+            deep (bool): If True, also counts the items themselves (each distinct object once).
 
-            gc.collect()
-            cd_array = CircularDeque()
-            cd_DLL = CDLLCD()
+        Time Complexity:
+            O(b) - Linear time in the number of blocks, or O(n) with deep.
 
-            shuffle(data)
+        Space Complexity:
+            O(1) - Constant space, or O(n) with deep to recognize shared items.
 
-            start = default_timer()
-            for item in data:
-                if randint(0, 3) <= 2:
-                    cd_array.enqueue(item, item % 2)
-                else:
-                    cd_array.dequeue(item % 2)
-            random_avgs_array[-1] += (default_timer() - start)/3
-
-            start = default_timer()
-            for item in data:
-                if randint(0, 3) <= 2:
-                    cd_DLL.enqueue(item, item % 2)
-                else:
-                    cd_DLL.dequeue(item % 2)
-            random_avgs_CDLL[-1] += (default_timer() - start)/3
-
-    plt.plot(sizes, random_avgs_array, color='blue', label='Array')
-    plt.plot(sizes, random_avgs_CDLL, color='red', label='CDLL')
-    plt.title("Operations in Random Order")
-    plt.legend(loc='best')
-    plt.show()
-
-    def max_len_subarray(data, bound, structure):
-        """
-        returns the length of the largest subarray of `data` with sum less or eq to than `bound`
-        :param data: list of integers to operate on
-        :param bound: largest allowable sum
-        :param structure: either a CircularDeque or a CDLLCD
-        :return: the length
-        """
-        index, max_len, subarray_sum = 0, 0, 0
-        while index < len(data):
-
-            while subarray_sum <= bound and index < len(data):
-                structure.enqueue(data[index])
-                subarray_sum += data[index]
-                index += 1
-            max_len = max(max_len, subarray_sum)
-
-            while subarray_sum > bound:
-                subarray_sum -= structure.dequeue(False)
+        Returns:
+            dict: Bytes by kind: live (slots holding items), slack (unused slots of the end blocks), overhead (the
+            deque object, the list headers of the blocks and the CDLL linking them), payload (the items, 0 unless
+            deep) and their total, plus per_node, the bytes of one block and its node.
+        """
+        blocks = self.blocks.size
+        block = sys.getsizeof(self.blocks.head.val)
+        links = self.blocks.memory_usage()
+        overhead = sys.getsizeof(self) + links['total'] + blocks * (block - self.block_size * POINTER_SIZE)
+        return _memory_report(self.size * POINTER_SIZE, (blocks * self.block_size - self.size) * POINTER_SIZE,
+                              overhead, _payload_bytes(self) if deep else 0, per_node=block + links['per_node'])
 
-        return max_len
-
-    # (4) A common application
-
-    application_avgs_array = []
-    application_avgs_CDLL = []
-
-    data = [randint(0, 1) for i in range(5000)]
-    window_lengths = list(range(0, 200, 5))
-
-    for length in window_lengths:
-        application_avgs_array.append(0)
-        application_avgs_CDLL.append(0)
-
-        for trial in range(3):
-
-            gc.collect()
-            cd_array = CircularDeque()
-            cd_DLL = CDLLCD()
-
-            start = default_timer()
-            max_len_subarray(data, length, cd_array)
-            application_avgs_array[-1] += (default_timer() - start)/3
-
-            start = default_timer()
-            max_len_subarray(data, length, cd_DLL)
-            application_avgs_CDLL[-1] += (default_timer() - start)/3
-
-    plt.plot(window_lengths, application_avgs_array,
-             color='blue', label='Array')
-    plt.plot(window_lengths, application_avgs_CDLL, color='red', label='CDLL')
-    plt.title("Sliding Window Application")
-    plt.legend(loc='best')
-    plt.show()
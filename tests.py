@@ -7,7 +7,28 @@ tests.py
 import string
 import random
 import unittest
-from solution import CircularDeque, CDLL, CDLLCD
+import asyncio
+import multiprocessing
+import os
+import pickle
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from solution import (CircularDeque, CDLL, CDLLCD, CDLLHandle, CDLLNode, ResizePolicy, TypedCircularDeque,
+                      UnrolledCDLLCD, np)
+import benchmarks
+import concurrent_deque
+from concurrent_deque import ConcurrentCircularDeque, SPSCCircularDeque, Empty, Full
+from async_deque import AsyncCircularDeque
+from shared_deque import SharedCircularDeque
+from persistent_deque import PersistentCircularDeque
+from durable_deque import DurableDeque
+from sliding_window import SlidingWindow
+from scheduler import LaneScheduler
+from metrics import LatencyHistogram
+from collections import deque
 from xml.dom import minidom
 from typing import TypeVar, List, Tuple
 
@@ -466,6 +487,470 @@ class CircularDequeTests(unittest.TestCase):
         self.assertEqual(0, cd.size)
         self.assertEqual(4, cd.capacity)
 
+    def test_extend(self):
+        """
+        Tests bulk extend/extendleft against the equivalent sequence of enqueues
+        """
+        # Test 1: extend an empty deque, capacity is reserved in one step
+        cd = CircularDeque()
+        cd.extend(range(50))
+        self.assertEqual(50, cd.size)
+        self.assertEqual(64, cd.capacity)
+        self.assertEqual(list(range(50)) + [None] * 14, cd.queue)
+        self.assertEqual(0, cd.front_element())
+        self.assertEqual(49, cd.back_element())
+
+        # Test 2: extendleft reverses the values, like repeated front enqueues
+        cd = CircularDeque()
+        cd.extendleft(iter(range(3)))
+        self.assertEqual(4, cd.capacity)
+        self.assertEqual(2, cd.front_element())
+        self.assertEqual(0, cd.back_element())
+
+        # Test 3: wrap-around writes on both ends without growing
+        cd = CircularDeque(data=['Start'], front=6, capacity=8)
+        cd.extend(['b1', 'b2', 'b3'])
+        cd.extendleft(['f1', 'f2', 'f3'])
+        self.assertEqual(8, cd.capacity)
+        self.assertEqual(['b2', 'b3', None, 'f3', 'f2', 'f1', 'Start', 'b1'], cd.queue)
+        self.assertEqual(3, cd.front)
+        self.assertEqual(1, cd.back)
+
+        # Test 4: random mix matches per-item enqueue
+        expected = CircularDeque()
+        cd = CircularDeque()
+        for trial in range(20):
+            values = [random.randint(0, 100) for _ in range(random.randint(0, 40))]
+            to_front = random.choice([True, False])
+            for value in values:
+                expected.enqueue(value, to_front)
+            cd.extend(values, front=to_front)
+            self.assertEqual(expected.size, cd.size)
+            self.assertEqual(expected.capacity, cd.capacity)
+            self.assertEqual(expected.front_element(), cd.front_element())
+            self.assertEqual(expected.back_element(), cd.back_element())
+        while not expected.is_empty():
+            self.assertEqual(expected.dequeue(), cd.dequeue())
+        self.assertTrue(cd.is_empty())
+
+    def test_reserve_shrink_to_fit(self):
+        """
+        Tests that reserve and shrink_to_fit resize once and keep the deque unrolled
+        """
+        # Test 1: reserve on a wrapped deque unrolls it into the larger list
+        cd = CircularDeque([1, 2])
+        cd.enqueue(0)
+        cd.reserve(20)
+        self.assertEqual(32, cd.capacity)
+        self.assertEqual([0, 1, 2] + [None] * 29, cd.queue)
+        self.assertEqual(0, cd.front)
+        self.assertEqual(2, cd.back)
+
+        # Test 2: reserving what already fits is a no-op
+        queue = cd.queue
+        cd.reserve(31)
+        self.assertIs(queue, cd.queue)
+
+        # Test 3: 32 items need a capacity strictly greater than 32
+        for value in range(3, 32):
+            cd.enqueue(value, front=False)
+        self.assertEqual(64, cd.capacity)
+
+        # Test 4: shrink_to_fit halves as far as the size allows
+        for _ in range(27):
+            cd.dequeue()
+        cd.shrink_to_fit()
+        self.assertEqual(8, cd.capacity)
+        self.assertEqual([27, 28, 29, 30, 31, None, None, None], cd.queue)
+
+        # Test 5: never below the minimum capacity of 4
+        cd = CircularDeque(capacity=64)
+        cd.shrink_to_fit()
+        self.assertEqual(4, cd.capacity)
+
+    def test_resize_policy(self):
+        """
+        Tests custom growth factors, shrink thresholds, minimum capacities and never shrinking
+        """
+        # Test 1: invalid policies are rejected
+        with self.assertRaises(ValueError):
+            ResizePolicy(growth_factor=1)
+        with self.assertRaises(ValueError):
+            ResizePolicy(growth_factor=4, shrink_threshold=0.25)
+        with self.assertRaises(ValueError):
+            ResizePolicy(min_capacity=0)
+
+        # Test 2: growth factor of 1.5
+        cd = CircularDeque(policy=ResizePolicy(growth_factor=1.5, shrink_threshold=0.25))
+        capacities = []
+        for element in range(20):
+            cd.enqueue(element, front=False)
+            if cd.capacity not in capacities:
+                capacities.append(cd.capacity)
+        self.assertEqual([4, 6, 9, 13, 19, 28], capacities)
+        self.assertEqual(list(range(20)), [cd.dequeue() for _ in range(20)])
+
+        # Test 3: lower shrink threshold and higher minimum capacity
+        cd = CircularDeque(list(range(15)), capacity=16,
+                           policy=ResizePolicy(shrink_threshold=0.125, min_capacity=8))
+        for item in range(15):
+            cd.dequeue(False)
+            if cd.size > 2:
+                self.assertEqual(16, cd.capacity)
+            else:
+                self.assertEqual(8, cd.capacity)
+
+        # Test 4: never shrink keeps the grown capacity
+        cd = CircularDeque(policy=ResizePolicy(shrink=False))
+        cd.extend(range(100))
+        for item in range(100):
+            self.assertEqual(item, cd.dequeue())
+        self.assertEqual(128, cd.capacity)
+
+        # Test 5: an explicit shrink_to_fit still applies under never shrink
+        cd.shrink_to_fit()
+        self.assertEqual(4, cd.capacity)
+
+    def test_bounded(self):
+        """
+        Tests the bounded (maxlen) ring buffer mode
+        """
+        # Test 1: invalid bounds
+        with self.assertRaises(ValueError):
+            CircularDeque(maxlen=0)
+        with self.assertRaises(ValueError):
+            CircularDeque([1, 2, 3], maxlen=2)
+
+        # Test 2: fills every slot without growing, then overwrites the front on back enqueues
+        evicted = []
+        cd = CircularDeque(maxlen=5, on_evict=evicted.append)
+        self.assertEqual(5, cd.capacity)
+        for element in range(5):
+            self.assertIsNone(cd.enqueue(element, front=False))
+        queue = cd.queue
+        self.assertEqual(5, len(cd))
+        self.assertEqual(0, cd.enqueue(5, front=False))
+        self.assertEqual(1, cd.enqueue(6, front=False))
+        self.assertIs(queue, cd.queue)
+        self.assertEqual([5, 6, 2, 3, 4], cd.queue)
+        self.assertEqual(2, cd.front_element())
+        self.assertEqual(6, cd.back_element())
+        self.assertEqual([0, 1], evicted)
+
+        # Test 3: front enqueues overwrite the back
+        self.assertEqual(6, cd.enqueue('a'))
+        self.assertEqual('a', cd.front_element())
+        self.assertEqual(5, cd.back_element())
+        self.assertEqual(5, len(cd))
+
+        # Test 4: dequeue never shrinks, and extend keeps the newest values
+        for _ in range(4):
+            cd.dequeue()
+        self.assertEqual(5, cd.capacity)
+        cd.extend(range(10, 20))
+        self.assertEqual([15, 16, 17, 18, 19], [cd.dequeue() for _ in range(5)])
+        self.assertIs(queue, cd.queue)
+
+        # Test 5: maxlen of one
+        cd = CircularDeque(maxlen=1)
+        cd.enqueue(1)
+        self.assertEqual(1, cd.enqueue(2, front=False))
+        self.assertEqual(2, cd.front_element())
+        self.assertEqual(2, cd.back_element())
+
+    def test_popmany(self):
+        """
+        Tests batched dequeue from both ends, including wrap-around and a single shrink
+        """
+        # Test 1: empty deque and non-positive counts
+        cd = CircularDeque()
+        self.assertEqual([], cd.popmany(5))
+        cd.extend(range(3))
+        self.assertEqual([], cd.popmany(0))
+        self.assertEqual([], cd.popmany(-1, front=False))
+
+        # Test 2: wrapped items from both ends, in dequeue order
+        cd = CircularDeque(capacity=8)
+        cd.extend([3, 4, 5, 6])
+        cd.extendleft([2, 1, 0])
+        self.assertEqual([0, 1], cd.popmany(2))
+        self.assertEqual([6, 5, 4, 3], cd.popmany(4, front=False))
+        self.assertEqual([2], cd.popmany(10))
+        self.assertTrue(cd.is_empty())
+
+        # Test 3: matches repeated dequeue, shrinking once to the final capacity
+        cd = CircularDeque()
+        expected = CircularDeque()
+        cd.extend(range(1000))
+        expected.extend(range(1000))
+        batch = cd.popmany(990)
+        self.assertEqual([expected.dequeue() for _ in range(990)], batch)
+        self.assertEqual(expected.capacity, cd.capacity)
+        self.assertEqual(list(range(990, 1000)), cd.popmany(20, front=True))
+
+        # Test 4: bounded deques never shrink
+        cd = CircularDeque(maxlen=64)
+        cd.extend(range(64))
+        self.assertEqual(list(range(63, 0, -1)), cd.popmany(63, front=False))
+        self.assertEqual(64, cd.capacity)
+        self.assertEqual(0, cd.front_element())
+
+    def test_indexing(self):
+        """
+        Tests logical indexing on a wrapped deque
+        """
+        cd = CircularDeque(capacity=8)
+        cd.extend([3, 4, 5])
+        cd.extendleft([2, 1, 0])
+        for i in range(6):
+            self.assertEqual(i, cd[i])
+            self.assertEqual(5 - i, cd[-1 - i])
+        for bad in (6, -7, 100):
+            with self.assertRaises(IndexError):
+                cd[bad]
+        with self.assertRaises(IndexError):
+            CircularDeque()[0]
+
+    def test_iteration(self):
+        """
+        Tests forward and reverse iteration and detection of mutation during iteration
+        """
+        # Test 1: empty and wrapped deques
+        self.assertEqual([], list(CircularDeque()))
+        self.assertEqual([], list(reversed(CircularDeque())))
+        cd = CircularDeque(capacity=8)
+        cd.extend([3, 4, 5])
+        cd.extendleft([2, 1, 0])
+        self.assertEqual([0, 1, 2, 3, 4, 5], list(cd))
+        self.assertEqual([5, 4, 3, 2, 1, 0], list(reversed(cd)))
+
+        # Test 2: mutation raises on the next step
+        for mutate in (lambda: cd.enqueue(9), lambda: cd.enqueue(9, front=False),
+                       lambda: cd.dequeue(), lambda: cd.grow()):
+            iterator = iter(cd)
+            next(iterator)
+            mutate()
+            with self.assertRaises(RuntimeError):
+                next(iterator)
+        iterator = reversed(cd)
+        next(iterator)
+        cd.dequeue(False)
+        with self.assertRaises(RuntimeError):
+            next(iterator)
+
+    def test_contains_index(self):
+        """
+        Tests membership and index with optional ranges
+        """
+        cd = CircularDeque(capacity=8)
+        cd.extend(['c', 'a', 'd'])
+        cd.extendleft(['b', 'a'])
+        # logical order: a, b, c, a, d with the front two wrapped around the end of the list
+        self.assertIn('d', cd)
+        self.assertNotIn('z', cd)
+        self.assertEqual(0, cd.index('a'))
+        self.assertEqual(3, cd.index('a', 1))
+        self.assertEqual(3, cd.index('a', -2))
+        self.assertEqual(4, cd.index('d', 2, 5))
+        with self.assertRaises(ValueError):
+            cd.index('d', 0, 4)
+        with self.assertRaises(ValueError):
+            cd.index('a', 1, 3)
+        with self.assertRaises(ValueError):
+            cd.index('z')
+        # stale slots left behind by dequeue are not searched
+        cd.dequeue(False)
+        self.assertNotIn('d', cd)
+
+
+    def test_pickle(self):
+        """
+        Tests that pickling keeps the live items, unrolled, and the capacity, policy and maxlen
+        """
+        cd = CircularDeque(capacity=8, policy=ResizePolicy(growth_factor=3))
+        cd.extend([3, 4, 5])
+        cd.extendleft([2, 1])
+        cd.dequeue(False)
+        copy = pickle.loads(pickle.dumps(cd))
+        self.assertEqual([1, 2, 3, 4], list(copy))
+        self.assertEqual([1, 2, 3, 4, None, None, None, None], copy.queue)
+        self.assertEqual((0, 3, 8), (copy.front, copy.back, copy.capacity))
+        self.assertEqual(3, copy.policy.growth_factor)
+        self.assertNotIn(5, pickle.loads(pickle.dumps(cd)).queue)
+
+        copy = pickle.loads(pickle.dumps(CircularDeque()))
+        self.assertTrue(copy.is_empty())
+        copy.enqueue(1)
+        self.assertEqual([1], list(copy))
+
+        bounded = CircularDeque(maxlen=3)
+        bounded.extend([1, 2, 3, 4])
+        copy = pickle.loads(pickle.dumps(bounded))
+        self.assertEqual(4, copy.enqueue(5))
+        self.assertEqual([5, 2, 3], list(copy))
+        self.assertEqual(-1, copy.shrink_size)
+
+    def test_rotate_reverse(self):
+        """
+        Tests rotate and reverse against collections.deque, on wrapped, full and typed deques
+        """
+        cd = CircularDeque(capacity=8)
+        cd.extend([3, 4, 5, 6])
+        cd.extendleft([2, 1])
+        # physical layout: 3, 4, 5, 6, _, _, 1(F), 2 with the back at index 3
+        cd.rotate(2)
+        self.assertEqual([5, 6, 1, 2, 3, 4], list(cd))
+        self.assertEqual((4, 1, 8), (cd.front, cd.back, cd.capacity))
+        cd.rotate(-5)
+        self.assertEqual([4, 5, 6, 1, 2, 3], list(cd))
+        self.assertEqual(8, cd.capacity)
+        cd.reverse()
+        self.assertEqual([3, 2, 1, 6, 5, 4], list(cd))
+
+        bounded = CircularDeque(maxlen=5)
+        bounded.extend(range(7))
+        queue = bounded.queue
+        bounded.rotate(-2)
+        self.assertEqual([4, 5, 6, 2, 3], list(bounded))
+        self.assertIs(queue, bounded.queue)
+
+        for cd in (CircularDeque(), TypedCircularDeque(dtype=int), CircularDeque(maxlen=10)):
+            expected = deque()
+            for val in range(60):
+                if random.random() < 0.3 and expected:
+                    self.assertEqual(expected.popleft(), cd.dequeue())
+                elif random.random() < 0.5:
+                    cd.enqueue(val)
+                    expected.appendleft(val)
+                    if len(expected) > 10 and cd.maxlen:
+                        expected.pop()
+                else:
+                    k = random.randint(-15, 15)
+                    cd.rotate(k)
+                    expected.rotate(k)
+                    if random.random() < 0.3:
+                        cd.reverse()
+                        expected.reverse()
+                self.assertEqual(list(expected), list(cd))
+
+        empty = CircularDeque()
+        empty.rotate(3)
+        empty.reverse()
+        self.assertTrue(empty.is_empty())
+
+
+class TypedCircularDequeTests(unittest.TestCase):
+    def test_enqueue_dequeue(self):
+        """
+        Tests that the typed deque behaves like the list-backed one
+        """
+        # Test 1: dtype resolution
+        self.assertEqual('d', TypedCircularDeque().typecode)
+        self.assertEqual('q', TypedCircularDeque(dtype=int).typecode)
+        self.assertEqual('i', TypedCircularDeque(dtype='i').typecode)
+        with self.assertRaises(ValueError):
+            TypedCircularDeque(dtype='bB')
+        with self.assertRaises(ValueError):
+            TypedCircularDeque(dtype=str)
+
+        # Test 2: same growth, shrink and ordering as CircularDeque
+        cd = TypedCircularDeque(dtype=int)
+        expected = CircularDeque()
+        for val in range(500):
+            cd.enqueue(val, front=bool(val % 2))
+            expected.enqueue(val, front=bool(val % 2))
+        self.assertEqual(expected.capacity, cd.capacity)
+        self.assertEqual(499, cd.front_element())
+        self.assertEqual(498, cd.back_element())
+        for val in range(499, -1, -1):
+            self.assertEqual(expected.dequeue(bool(val % 2)), cd.dequeue(bool(val % 2)))
+        self.assertEqual(4, cd.capacity)
+        self.assertIsNone(cd.dequeue())
+
+        # Test 3: bulk extend converts to the array type
+        cd = TypedCircularDeque(dtype=float)
+        cd.extend([1, 2, 3])
+        cd.extendleft(range(3))
+        self.assertEqual([2.0, 1.0, 0.0, 1.0, 2.0, 3.0], [cd.dequeue() for _ in range(6)])
+
+        # Test 4: non-numeric values are rejected
+        with self.assertRaises(TypeError):
+            cd.enqueue('a')
+
+    def test_popmany(self):
+        """
+        Tests that batched dequeue returns views of the typed buffer
+        """
+        cd = TypedCircularDeque(dtype=int, capacity=16)
+        cd.extend(range(10))
+        batch = cd.popmany(3)
+        self.assertIsInstance(batch, memoryview)
+        self.assertEqual([0, 1, 2], batch.tolist())
+        self.assertEqual([9, 8], cd.popmany(2, front=False).tolist())
+
+        # Wrapped items are copied, so later enqueues cannot change them
+        cd.extendleft([-4, -3, -2, -1])
+        batch = cd.popmany(5)
+        self.assertEqual([-1, -2, -3, -4, 3], batch.tolist())
+        cd.extendleft([7, 7, 7, 7, 7])
+        self.assertEqual([-1, -2, -3, -4, 3], batch.tolist())
+        self.assertEqual([7, 6, 5, 4, 7, 7, 7, 7, 7], cd.popmany(100, front=False).tolist())
+
+    def test_aggregates(self):
+        """
+        Tests sum, mean, min and max over a wrapped live window
+        """
+        # Test 1: empty deque
+        cd = TypedCircularDeque(dtype=int, capacity=8)
+        self.assertEqual(0, cd.sum())
+        self.assertIsNone(cd.mean())
+        self.assertIsNone(cd.min())
+        self.assertIsNone(cd.max())
+
+        # Test 2: wrapped window, stale slots are ignored
+        cd.extend([100, 5, 6, 7])
+        cd.dequeue()
+        cd.extendleft([-3, 4])
+        self.assertEqual(2, len(cd._spans()))
+        self.assertEqual(19, cd.sum())
+        self.assertEqual(19 / 5, cd.mean())
+        self.assertEqual(-3, cd.min())
+        self.assertEqual(7, cd.max())
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_to_numpy(self):
+        """
+        Tests the NumPy export of the live window
+        """
+        cd = TypedCircularDeque(dtype=float, capacity=8)
+        cd.extend([1.5, 2.5])
+        cd.extendleft([0.5])
+        self.assertEqual([0.5, 1.5, 2.5], cd.to_numpy().tolist())
+        self.assertEqual(np.float64, cd.to_numpy().dtype)
+
+
+    def test_serialization(self):
+        """
+        Tests pickling and the to_bytes/from_bytes round trip of a wrapped deque
+        """
+        cd = TypedCircularDeque(dtype=int, capacity=8)
+        cd.extend([3, 4, 5])
+        cd.extendleft([2, 1])
+        for copy in (pickle.loads(pickle.dumps(cd)), TypedCircularDeque.from_bytes(cd.to_bytes())):
+            self.assertEqual('q', copy.typecode)
+            self.assertEqual([1, 2, 3, 4, 5], list(copy))
+            self.assertEqual(8, copy.capacity)
+            self.assertEqual(15, copy.sum())
+
+        bounded = TypedCircularDeque(dtype=float, maxlen=2)
+        self.assertTrue(TypedCircularDeque.from_bytes(bounded.to_bytes()).is_empty())
+        bounded.extend([0.5, 1.5, 2.5])
+        copy = TypedCircularDeque.from_bytes(bounded.to_bytes())
+        self.assertEqual(2, copy.maxlen)
+        self.assertEqual([1.5, 2.5], list(copy))
+        with self.assertRaises(ValueError):
+            TypedCircularDeque.from_bytes(bounded.to_bytes()[:-1])
+
 
 class CDLLTests(unittest.TestCase):
     def check_cdll(self, expected: List[T], cdll: CDLL):
@@ -570,15 +1055,15 @@ class CDLLTests(unittest.TestCase):
         """
         # (1) remove from an empty list
         cdll = CDLL()
-        cdll.remove()
+        self.assertIsNone(cdll.remove())
         self.check_cdll([], cdll)
 
-        # (2) remove a single node from a list until it's empty
+        # (2) remove a single node from a list until it's empty, getting its value back
         cdll = CDLL()
         cdll.insert(1)
-        cdll.remove()
+        self.assertEqual(1, cdll.remove())
         self.check_cdll([], cdll)
-        cdll.remove()  # should be a no-op
+        self.assertIsNone(cdll.remove())  # should be a no-op
         self.check_cdll([], cdll)
 
         # (3) insert then remove multiple nodes from the front
@@ -624,6 +1109,213 @@ class CDLLTests(unittest.TestCase):
 
         self.check_cdll(expected_list, cdll)
 
+    def test_node_pool(self):
+        """
+        Tests that removed nodes are recycled by later inserts, up to the pool size
+        """
+        # (1) pool disabled: every insert allocates
+        cdll = CDLL()
+        for i in range(10):
+            cdll.insert(i)
+        for i in range(10):
+            cdll.remove()
+        cdll.insert(0)
+        self.assertEqual({'capacity': 0, 'pooled': 0, 'hits': 0, 'misses': 11}, cdll.pool_stats())
+
+        # (2) removed nodes are cleared and reused, most recently removed first
+        cdll = CDLL(pool_size=4)
+        for i in range(6):
+            cdll.insert(i, front=False)
+        back, last_pooled = cdll.head.prev, cdll.head.next.next
+        for _ in range(6):
+            cdll.remove(front=False)
+        self.check_cdll([], cdll)
+        self.assertEqual(4, cdll.pool_stats()['pooled'])
+        self.assertIsNone(back.val)
+        cdll.insert('a')
+        cdll.insert('b', front=False)
+        self.assertIs(last_pooled, cdll.head)
+        self.check_cdll(['a', 'b'], cdll)
+        self.assertEqual({'capacity': 4, 'pooled': 2, 'hits': 2, 'misses': 6}, cdll.pool_stats())
+
+        # (3) random mix behaves exactly like an unpooled list
+        cdll = CDLL(pool_size=8)
+        expected_list = []
+        for val in range(500):
+            if expected_list and random.random() < 0.45:
+                if random.choice([True, False]):
+                    cdll.remove()
+                    del expected_list[0]
+                else:
+                    cdll.remove(front=False)
+                    del expected_list[-1]
+            else:
+                if random.choice([True, False]):
+                    cdll.insert(val)
+                    expected_list.insert(0, val)
+                else:
+                    cdll.insert(val, front=False)
+                    expected_list.append(val)
+            self.assertLessEqual(cdll.pool_stats()['pooled'], 8)
+        self.check_cdll(expected_list, cdll)
+        self.assertGreater(cdll.pool_hits, 0)
+
+
+    def test_pickle(self):
+        """
+        Tests pickling lists far longer than the recursion limit
+        """
+        cdll = CDLL(pool_size=4)
+        for val in range(sys.getrecursionlimit() * 2):
+            cdll.insert(val, front=False)
+        copy = pickle.loads(pickle.dumps(cdll))
+        self.assertEqual(4, copy.pool_size)
+        self.assertEqual(list(cdll), list(copy))
+        self.check_cdll(list(cdll), copy)
+
+        cd = CDLLCD()
+        for val in range(10):
+            cd.enqueue(val)
+        self.assertEqual(cd, pickle.loads(pickle.dumps(cd)))
+        self.assertTrue(pickle.loads(pickle.dumps(CDLLCD())).is_empty())
+
+    def test_splice_split(self):
+        """
+        Tests joining and cutting lists by relinking their nodes
+        """
+        a, b = CDLL(), CDLL()
+        for val in range(4):
+            a.insert(val, front=False)
+        for val in range(4, 7):
+            b.insert(val, front=False)
+        nodes = [a.head, b.head]
+        a.splice(b, front=False)
+        self.check_cdll(list(range(7)), a)
+        self.check_cdll([], b)
+        self.assertIs(nodes[0], a.head)
+
+        # Splicing at the front puts the other list first, in its own order
+        c = CDLL()
+        for val in (-2, -1):
+            c.insert(val, front=False)
+        a.splice(c)
+        self.check_cdll(list(range(-2, 7)), a)
+        a.splice(CDLL())
+        b.splice(a, front=False)
+        self.check_cdll(list(range(-2, 7)), b)
+        self.check_cdll([], a)
+        with self.assertRaises(ValueError):
+            b.splice(b)
+
+        # Cut at every position, from both halves, then put the halves back together
+        for index in range(9):
+            node = b.head
+            for _ in range(index):
+                node = node.next
+            rest = b.split_at(node)
+            self.check_cdll(list(range(-2, index - 2)), b)
+            self.check_cdll(list(range(index - 2, 7)), rest)
+            b.splice(rest, front=False)
+            self.check_cdll(list(range(-2, 7)), b)
+
+        self.assertIs(nodes[1], b.head.next.next.next.next.next.next)
+        with self.assertRaises(ValueError):
+            b.split_at(CDLLNode(0))
+        with self.assertRaises(ValueError):
+            CDLL().split_at(CDLLNode(0))
+
+        # A removed node still points into the list without the pool, and a stale handle fails the same way
+        c = CDLL(pool_size=0)
+        handles = [c.insert(val, front=False, handle=True) for val in range(6)]
+        removed = handles[2].node
+        c.remove_node(handles[2])
+        for stale in (removed, handles[2]):
+            with self.assertRaises(ValueError):
+                c.split_at(stale)
+        self.check_cdll([0, 1, 3, 4, 5], c)
+        rest = c.split_at(handles[3])
+        self.check_cdll([0, 1], c)
+        self.check_cdll([3, 4, 5], rest)
+
+    def test_handles(self):
+        """
+        Tests removing and inserting around nodes by handle, and that stale handles fail without side effects
+        """
+        cdll = CDLL(pool_size=3)
+        handles = [cdll.insert(val, front=False, handle=True) for val in range(5)]
+        self.assertIsNone(cdll.insert(5, front=False))
+        self.assertEqual([0, 1, 2, 3, 4], [handle.val for handle in handles])
+
+        # Middle, front, then back
+        self.assertEqual(2, cdll.remove_node(handles[2]))
+        self.check_cdll([0, 1, 3, 4, 5], cdll)
+        self.assertEqual(0, cdll.remove_node(handles[0]))
+        self.check_cdll([1, 3, 4, 5], cdll)
+        back = CDLLHandle(cdll.head.prev)
+        self.assertEqual(5, cdll.remove_node(back))
+        self.check_cdll([1, 3, 4], cdll)
+
+        # Removed nodes went to the pool; reusing one must not revive the old handles
+        self.assertFalse(handles[0].valid)
+        recycled = cdll.insert(9, handle=True)
+        self.assertIs(recycled.node, back.node)
+        self.check_cdll([9, 1, 3, 4], cdll)
+        for stale in (handles[0], handles[2], back):
+            for call in (cdll.remove_node, cdll.move_to_front, lambda h: cdll.insert_after(h, 7),
+                         lambda h: cdll.insert_before(h, 7), lambda h: h.val):
+                with self.assertRaises(ValueError):
+                    call(stale)
+        self.check_cdll([9, 1, 3, 4], cdll)
+        self.assertEqual("CDLLHandle(<stale>)", str(back))
+
+        # Removing from an end by value also invalidates the handle
+        cdll.remove()
+        self.assertFalse(recycled.valid)
+
+        after = cdll.insert_after(handles[4], 5)
+        self.check_cdll([1, 3, 4, 5], cdll)
+        cdll.insert_before(handles[1], 0)
+        self.check_cdll([0, 1, 3, 4, 5], cdll)
+        cdll.insert_after(handles[1], 2)
+        cdll.insert_before(after, 4.5)
+        self.check_cdll([0, 1, 2, 3, 4, 4.5, 5], cdll)
+
+        cdll.move_to_front(handles[3])
+        self.check_cdll([3, 0, 1, 2, 4, 4.5, 5], cdll)
+        cdll.move_to_front(handles[3])
+        self.check_cdll([3, 0, 1, 2, 4, 4.5, 5], cdll)
+        cdll.move_to_front(after)
+        self.check_cdll([5, 3, 0, 1, 2, 4, 4.5], cdll)
+        self.assertTrue(after.valid)
+
+        single = CDLL()
+        only = single.insert('x', handle=True)
+        single.move_to_front(only)
+        self.assertEqual('x', single.remove_node(only))
+        self.check_cdll([], single)
+
+    def test_lru(self):
+        """
+        Tests the CDLL as the recency list of a small LRU cache
+        """
+        capacity = 3
+        recency = CDLL()
+        entries = {}
+
+        def access(key):
+            if key in entries:
+                recency.move_to_front(entries[key])
+                return True
+            if len(recency) == capacity:
+                del entries[recency.remove(front=False)]
+            entries[key] = recency.insert(key, handle=True)
+            return False
+
+        hits = [access(key) for key in 'abcabdaeb']
+        self.assertEqual([False, False, False, True, True, False, True, False, False], hits)
+        self.assertEqual(['b', 'e', 'a'], list(recency))
+        self.assertEqual(set('abe'), set(entries))
+
 
 class CDLLCDTests(unittest.TestCase):
     def setUp(self):
@@ -693,6 +1385,60 @@ class CDLLCDTests(unittest.TestCase):
         self.assertEqual(1, self.cdllcd.dequeue(front=False))
         self.assertIsNone(self.cdllcd.dequeue())
 
+        # Slotted, so no per-instance dict
+        self.assertFalse(hasattr(self.cdllcd, '__dict__'))
+
+    def test_pool_stats_handles(self):
+        """
+        Tests that enqueue and dequeue, which link nodes themselves, keep the CDLL's pool, stats and handles in step
+        """
+        cd = CDLLCD(pool_size=2)
+        stats = cd.enable_stats()
+        handles = [cd.enqueue(val, front=False, handle=True) for val in range(3)]
+        self.assertEqual(0, cd.dequeue())
+        self.assertEqual(2, cd.dequeue(front=False))
+        self.assertFalse(handles[0].valid)
+        self.assertTrue(handles[1].valid)
+        self.assertEqual({'capacity': 2, 'pooled': 2, 'hits': 0, 'misses': 3}, cd.CDLL.pool_stats())
+        cd.enqueue(3)
+        self.assertEqual(1, cd.CDLL.pool_stats()['hits'])
+        self.assertEqual([3, 1], list(cd))
+        self.assertEqual((1, 3, 1, 1), (stats.enqueued_front, stats.enqueued_back, stats.dequeued_front,
+                                        stats.dequeued_back))
+
+    def test_cancel(self):
+        """
+        Tests cancelling queued values by handle
+        """
+        jobs = {val: self.cdllcd.enqueue(val, front=False, handle=True) for val in range(6)}
+        self.assertEqual(3, self.cdllcd.cancel(jobs[3]))
+        self.assertEqual(0, self.cdllcd.dequeue())
+        with self.assertRaises(ValueError):
+            self.cdllcd.cancel(jobs[0])
+        with self.assertRaises(ValueError):
+            self.cdllcd.cancel(jobs[3])
+        self.assertEqual(5, self.cdllcd.cancel(jobs[5]))
+        self.assertEqual([1, 2, 4], list(self.cdllcd))
+        self.assertEqual(4, self.cdllcd.back_element())
+
+    def test_splice(self):
+        """
+        Tests moving a whole queue into another
+        """
+        for val in range(3):
+            self.cdllcd.enqueue(val, front=False)
+        other = CDLLCD()
+        for val in range(3, 6):
+            other.enqueue(val, front=False)
+        self.cdllcd.splice(other, front=False)
+        self.assertEqual(list(range(6)), list(self.cdllcd))
+        self.assertTrue(other.is_empty())
+        other.enqueue(-1)
+        self.cdllcd.splice(other)
+        self.assertEqual(list(range(-1, 6)), list(self.cdllcd))
+        self.assertEqual(5, self.cdllcd.back_element())
+        self.assertEqual(7, len(self.cdllcd))
+
     def test_application_comprehensive(self):
         """
         Tests the application: note that this test doesn't verify underlying structure, only behavior.
@@ -751,5 +1497,1017 @@ class CDLLCDTests(unittest.TestCase):
         self.assertEqual(10, cd.back_element())
 
 
+    def test_rotate(self):
+        """
+        Tests that rotate walks the head without touching the nodes
+        """
+        cd = CDLLCD()
+        cd.rotate(1)
+        self.assertTrue(cd.is_empty())
+        for val in range(6):
+            cd.enqueue(val, front=False)
+        nodes = []
+        node = cd.CDLL.head
+        for _ in range(6):
+            nodes.append(node)
+            node = node.next
+
+        expected = deque(range(6))
+        for k in (1, 4, -2, 13, -7, 0, 6):
+            cd.rotate(k)
+            expected.rotate(k)
+            self.assertEqual(list(expected), list(cd))
+            self.assertEqual(expected[0], cd.front_element())
+            self.assertEqual(expected[-1], cd.back_element())
+        node = cd.CDLL.head
+        for _ in range(6):
+            self.assertTrue(any(node is other for other in nodes))
+            node = node.next
+
+
+class UnrolledCDLLCDTests(unittest.TestCase):
+    def test_basic(self):
+        """
+        Tests the deque API on an empty and single item UnrolledCDLLCD
+        """
+        with self.assertRaises(ValueError):
+            UnrolledCDLLCD(block_size=1)
+        cd = UnrolledCDLLCD(block_size=4)
+        self.assertTrue(cd.is_empty())
+        self.assertIsNone(cd.front_element())
+        self.assertIsNone(cd.back_element())
+        self.assertIsNone(cd.dequeue())
+        self.assertIsNone(cd.dequeue(False))
+        cd.enqueue(1, front=False)
+        self.assertEqual(1, len(cd))
+        self.assertEqual(1, cd.front_element())
+        self.assertEqual(1, cd.back_element())
+        self.assertEqual(1, cd.dequeue(False))
+        self.assertTrue(cd.is_empty())
+        self.assertEqual(1, len(cd.blocks))
+
+    def test_application_comprehensive(self):
+        """
+        Tests random operations against a list, across many block boundaries
+        """
+        for block_size in (2, 3, 64):
+            cd = UnrolledCDLLCD(block_size)
+            expected = []
+            for val in range(2000):
+                if expected and random.random() < 0.4:
+                    if random.choice([True, False]):
+                        self.assertEqual(expected[0], cd.dequeue())
+                        del expected[0]
+                    else:
+                        self.assertEqual(expected[-1], cd.dequeue(False))
+                        del expected[-1]
+                elif random.choice([True, False]):
+                    cd.enqueue(val)
+                    expected.insert(0, val)
+                else:
+                    cd.enqueue(val, front=False)
+                    expected.append(val)
+                self.assertEqual(len(expected), len(cd))
+                if expected:
+                    self.assertEqual(expected[0], cd.front_element())
+                    self.assertEqual(expected[-1], cd.back_element())
+            self.assertEqual(expected, list(cd))
+
+            # blocks are released as they empty, down to a single block
+            while not cd.is_empty():
+                cd.dequeue(random.choice([True, False]))
+            self.assertEqual(1, len(cd.blocks))
+            self.assertEqual([None] * block_size, cd.blocks.head.val)
+
+
+    def test_pickle(self):
+        """
+        Tests that pickling keeps the block size and the items, across block boundaries
+        """
+        cd = UnrolledCDLLCD(block_size=3)
+        for val in range(10):
+            cd.enqueue(val, front=val % 2 == 0)
+        copy = pickle.loads(pickle.dumps(cd))
+        self.assertEqual(3, copy.block_size)
+        self.assertEqual(list(cd), list(copy))
+
+
+class ConcurrentCircularDequeTests(unittest.TestCase):
+    def test_nonblocking(self):
+        """
+        Tests put/get at both ends without waiting
+        """
+        cd = ConcurrentCircularDeque(maxlen=3)
+        self.assertTrue(cd.is_empty())
+        with self.assertRaises(Empty):
+            cd.get_nowait()
+        with self.assertRaises(Empty):
+            cd.get(timeout=0.01)
+        cd.put(2)
+        cd.put(3)
+        cd.put_nowait(1, front=True)
+        self.assertEqual(3, len(cd))
+        with self.assertRaises(Full):
+            cd.put_nowait(4)
+        with self.assertRaises(Full):
+            cd.put(4, timeout=0.01)
+        self.assertEqual(3, cd.get(front=False))
+        self.assertEqual([1, 2], cd.get_many(10))
+        with self.assertRaises(ValueError):
+            ConcurrentCircularDeque(maxlen=0)
+
+    def test_blocking(self):
+        """
+        Tests that blocked getters and putters are woken by the other side
+        """
+        cd = ConcurrentCircularDeque(maxlen=2)
+        received = []
+        consumer = threading.Thread(target=lambda: received.extend([cd.get(), cd.get_many(5, timeout=5)]))
+        consumer.start()
+        cd.put('a', timeout=5)
+        consumer.join(0.05)
+        cd.put('b', timeout=5)
+        consumer.join(5)
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(['a', ['b']], received)
+
+        cd.put(1)
+        cd.put(2)
+        producer = threading.Thread(target=cd.put, args=(3,), kwargs={'timeout': 5})
+        producer.start()
+        self.assertEqual(1, cd.get(timeout=5))
+        producer.join(5)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual([2, 3], cd.get_many(3))
+
+    def test_many_threads(self):
+        """
+        Tests that every item is delivered exactly once across several producers and consumers
+        """
+        cd = ConcurrentCircularDeque(maxlen=16)
+        results = [[] for _ in range(3)]
+
+        def consume(out):
+            while len(out) < 1000:
+                out.extend(cd.get_many(min(7, 1000 - len(out)), timeout=5))
+
+        threads = [threading.Thread(target=lambda p=p: [cd.put((p, i), timeout=5) for i in range(750)])
+                   for p in range(4)]
+        threads += [threading.Thread(target=consume, args=(out,)) for out in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        delivered = [item for out in results for item in out]
+        self.assertEqual(sorted((p, i) for p in range(4) for i in range(750)), sorted(delivered))
+        # each producer's items arrive in order at any single consumer
+        for out in results:
+            for p in range(4):
+                mine = [i for q, i in out if q == p]
+                self.assertEqual(sorted(mine), mine)
+
+    def test_unlocked_grow(self):
+        """
+        Tests that an unbounded deque copies its items with the lock released when it grows, and falls back to growing
+        under the lock when other threads keep changing it during the copy
+        """
+        cd = ConcurrentCircularDeque()
+        copies = []
+
+        class Watched(CircularDeque):
+            __slots__ = []
+
+            def _copy(self, new_capacity):
+                copies.append(cd.lock.locked())
+                return super()._copy(new_capacity)
+
+        cd.deque = Watched()
+        for item in range(20):
+            cd.put(item)
+        self.assertTrue(copies)
+        self.assertEqual([False] * len(copies), copies)
+        self.assertEqual(list(range(20)), cd.get_many(20))
+
+        # Every unlocked copy is invalidated by a change, as if another thread got in, so put grows under the lock
+        class Contended(CircularDeque):
+            __slots__ = []
+
+            def _copy(self, new_capacity):
+                copies.append(cd.lock.locked())
+                if not cd.lock.locked():
+                    cd.version += 1
+                return super()._copy(new_capacity)
+
+        copies.clear()
+        cd.deque = Contended()
+        for item in range(4):
+            cd.put(item, front=True)
+        self.assertEqual([False] * concurrent_deque.GROW_ATTEMPTS + [True], copies)
+        self.assertEqual([3, 2, 1, 0], cd.get_many(4))
+
+
+class SPSCCircularDequeTests(unittest.TestCase):
+    def test_ring(self):
+        """
+        Tests wraparound, full and empty behavior on a single thread
+        """
+        for capacity in (0, 3, 12):
+            with self.assertRaises(ValueError):
+                SPSCCircularDeque(capacity)
+        ring = SPSCCircularDeque(4)
+        self.assertTrue(ring.is_empty())
+        self.assertIsNone(ring.dequeue())
+        self.assertIsNone(ring.front_element())
+        for round_trip in range(3):
+            for i in range(4):
+                self.assertTrue(ring.enqueue((round_trip, i)))
+            self.assertFalse(ring.enqueue('overflow'))
+            self.assertEqual(4, len(ring))
+            self.assertEqual((round_trip, 0), ring.front_element())
+            self.assertEqual([(round_trip, i) for i in range(4)], [ring.dequeue() for _ in range(4)])
+            self.assertIsNone(ring.dequeue())
+        self.assertEqual([None] * 4, ring.queue)
+
+    def test_handoff(self):
+        """
+        Tests that one producer thread and one consumer thread exchange every item in order
+        """
+        ring = SPSCCircularDeque(8)
+        received = []
+
+        def consume():
+            while len(received) < 5000:
+                item = ring.dequeue()
+                if item is None:
+                    time.sleep(0)
+                else:
+                    received.append(item)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for item in range(5000):
+            while not ring.enqueue(item):
+                time.sleep(0)
+        consumer.join(10)
+        self.assertEqual(list(range(5000)), received)
+
+
+class AsyncCircularDequeTests(unittest.IsolatedAsyncioTestCase):
+    async def test_nowait(self):
+        """
+        Tests the non-waiting operations at both ends
+        """
+        cd = AsyncCircularDeque(maxlen=2)
+        with self.assertRaises(asyncio.QueueEmpty):
+            cd.get_nowait()
+        cd.put_nowait(2)
+        cd.put_nowait(1, front=True)
+        self.assertTrue(cd.is_full())
+        with self.assertRaises(asyncio.QueueFull):
+            cd.put_nowait(3)
+        self.assertEqual(2, cd.get_nowait(front=False))
+        self.assertEqual(1, await cd.get())
+        self.assertTrue(cd.is_empty())
+
+    async def test_fifo_waiters(self):
+        """
+        Tests that waiting getters and putters are served in arrival order
+        """
+        cd = AsyncCircularDeque(maxlen=1)
+        order = []
+
+        async def getter(name):
+            order.append((name, await cd.get()))
+
+        tasks = [asyncio.create_task(getter(name)) for name in 'abc']
+        await asyncio.sleep(0)
+        for item in range(3):
+            await cd.put(item)
+        await asyncio.gather(*tasks)
+        self.assertEqual([('a', 0), ('b', 1), ('c', 2)], order)
+
+        # backpressure: the second put waits until the first item is taken
+        await cd.put('first')
+        blocked = asyncio.create_task(cd.put('second'))
+        await asyncio.sleep(0)
+        self.assertFalse(blocked.done())
+        self.assertEqual('first', await cd.get())
+        await blocked
+        self.assertEqual('second', cd.get_nowait())
+
+    async def test_get_many(self):
+        """
+        Tests batched gets with and without a timeout, and cancellation
+        """
+        cd = AsyncCircularDeque()
+        for item in range(5):
+            cd.put_nowait(item)
+        self.assertEqual([0, 1, 2], await cd.get_many(3))
+        self.assertEqual([4, 3], await cd.get_many(5, timeout=0.01, front=False))
+        self.assertEqual([], await cd.get_many(5, timeout=0))
+
+        # waits until enough items have arrived
+        batch = asyncio.create_task(cd.get_many(3, timeout=5))
+        for item in range(4):
+            await asyncio.sleep(0)
+            await cd.put(item)
+        self.assertEqual([0, 1, 2], await batch)
+        self.assertEqual(1, len(cd))
+
+        # a cancelled batch puts its items back in order
+        batch = asyncio.create_task(cd.get_many(3))
+        await asyncio.sleep(0)
+        await cd.put(4)
+        await asyncio.sleep(0)
+        batch.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await batch
+        self.assertEqual([3, 4], [cd.get_nowait(), cd.get_nowait()])
+        self.assertEqual(0, len(cd.getters))
+
+    async def test_cancel_restores(self):
+        """
+        Tests that a cancelled batch wakes a getter for every item it puts back, and may overfill a bounded deque
+        """
+        cd = AsyncCircularDeque()
+        for item in range(2):
+            cd.put_nowait(item)
+        batch = asyncio.create_task(cd.get_many(5))
+        await asyncio.sleep(0)
+        getters = [asyncio.create_task(cd.get()) for _ in range(2)]
+        await asyncio.sleep(0)
+        batch.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await batch
+        self.assertEqual([0, 1], await asyncio.wait_for(asyncio.gather(*getters), 1))
+        self.assertEqual(0, len(cd))
+
+        # items put back are never dropped, and puts wait until the deque is below maxlen again
+        cd = AsyncCircularDeque(maxlen=2)
+        for item in range(2):
+            cd.put_nowait(item)
+        batch = asyncio.create_task(cd.get_many(5))
+        await asyncio.sleep(0)
+        for item in (2, 3):
+            await cd.put(item)
+        batch.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await batch
+        self.assertEqual(4, len(cd))
+        self.assertTrue(cd.is_full())
+        self.assertRaises(asyncio.QueueFull, cd.put_nowait, 4)
+        put = asyncio.create_task(cd.put(4))
+        self.assertEqual([0, 1], [await cd.get(), await cd.get()])
+        await asyncio.sleep(0)
+        self.assertFalse(put.done())
+        self.assertEqual(2, await cd.get())
+        await asyncio.wait_for(put, 1)
+        self.assertEqual([3, 4], await cd.get_many(2))
+
+    async def test_timeout_keeps_order(self):
+        """
+        Tests that a getter timing out does not wake the getters queued behind it out of order
+        """
+        cd = AsyncCircularDeque()
+        order = []
+
+        async def getter(name):
+            order.append((name, await cd.get()))
+
+        batch = asyncio.create_task(cd.get_many(1, timeout=0.01))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(getter(name)) for name in 'bc']
+        self.assertEqual([], await batch)
+        await asyncio.sleep(0)
+        for item in (1, 2):
+            await cd.put(item)
+        await asyncio.gather(*tasks)
+        self.assertEqual([('b', 1), ('c', 2)], order)
+
+
+class SharedCircularDequeTests(unittest.TestCase):
+    def test_enqueue_dequeue(self):
+        """
+        Tests both ends, wraparound, a full deque and oversized records in a single process
+        """
+        with SharedCircularDeque(capacity=4, record_size=8) as shared:
+            self.assertTrue(shared.is_empty())
+            self.assertIsNone(shared.dequeue())
+            self.assertIsNone(shared.front_element())
+            self.assertRaises(ValueError, shared.enqueue, b'123456789')
+
+            self.assertTrue(shared.enqueue(b'b', front=False))
+            self.assertTrue(shared.enqueue(b'a', front=True))
+            self.assertTrue(shared.enqueue(b'', front=False))
+            self.assertTrue(shared.enqueue(b'12345678', front=False))
+            self.assertFalse(shared.enqueue(b'x'))
+            self.assertEqual(4, len(shared))
+            self.assertEqual(b'a', shared.front_element())
+            self.assertEqual(b'12345678', shared.back_element())
+
+            self.assertEqual(b'12345678', shared.dequeue(front=False))
+            self.assertEqual(b'a', shared.dequeue())
+            self.assertTrue(shared.enqueue(b'c', front=False))
+            self.assertTrue(shared.enqueue(b'z', front=True))
+            self.assertEqual([b'z', b'b', b'', b'c'], [shared.dequeue() for _ in range(4)])
+            self.assertIsNone(shared.back_element())
+
+        self.assertRaises(ValueError, SharedCircularDeque, 0)
+        self.assertRaises(ValueError, SharedCircularDeque, 4, 0)
+
+    def test_processes(self):
+        """
+        Tests records sent by several producer processes, and attaching by name
+        """
+        with SharedCircularDeque(capacity=16, record_size=16) as shared:
+            workers = [multiprocessing.Process(target=benchmarks._shared_producer, args=(shared, 50, bytes([i])))
+                       for i in range(3)]
+            for worker in workers:
+                worker.start()
+            received = []
+            while len(received) < 150:
+                record = shared.dequeue()
+                if record is None:
+                    time.sleep(0)
+                else:
+                    received.append(record)
+            for worker in workers:
+                worker.join()
+                self.assertEqual(0, worker.exitcode)
+            self.assertEqual([50, 50, 50], [received.count(bytes([i])) for i in range(3)])
+
+            other = SharedCircularDeque.attach(shared.name, shared.lock)
+            other.enqueue(b'shared', front=True)
+            self.assertEqual(b'shared', shared.dequeue())
+            other.close()
+
+    def test_pickle(self):
+        """
+        Tests that the default lock only travels by inheritance, and that a manager lock travels through a queue
+        """
+        with SharedCircularDeque(capacity=4, record_size=8) as shared:
+            with self.assertRaises(RuntimeError):
+                pickle.dumps(shared)
+
+        with multiprocessing.Manager() as manager:
+            with SharedCircularDeque(capacity=4, record_size=8, lock=manager.Lock()) as shared:
+                channel = multiprocessing.Queue()
+                channel.put(shared)
+                other = channel.get(timeout=5)
+                self.assertEqual(shared.name, other.name)
+                self.assertTrue(other.enqueue(b'queued'))
+                self.assertEqual(b'queued', shared.dequeue())
+                other.close()
+                channel.close()
+                channel.join_thread()
+
+
+class PersistentCircularDequeTests(unittest.TestCase):
+    def test_spill(self):
+        """
+        Tests that the middle spills to disk and comes back in order from both ends
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            deque = PersistentCircularDeque(directory, spill_threshold=100)
+            self.assertIsNone(deque.dequeue())
+            for i in range(100):
+                deque.enqueue(b'%03d' % i, front=False)
+                self.assertLessEqual(deque.head_bytes + deque.tail_bytes, 100)
+            for i in range(1, 21):
+                deque.enqueue(b'-%02d' % i)
+            self.assertEqual(120, len(deque))
+            self.assertLess(deque.head.size + deque.tail.size, 40)
+            self.assertGreater(deque.middle.size, 1)
+            self.assertEqual(b'-20', deque.front_element())
+            self.assertEqual(b'099', deque.back_element())
+
+            usage = deque.memory_usage(deep=True)
+            self.assertEqual(120 - deque.head.size - deque.tail.size, usage['spilled_records'])
+            self.assertEqual(3 * usage['spilled_records'], usage['spilled_bytes'])
+            self.assertEqual(usage['live'] + usage['slack'] + usage['overhead'] + usage['payload'], usage['total'])
+            self.assertEqual((deque.head.size + deque.tail.size) * sys.getsizeof(b'abc'), usage['payload'])
+
+            expected = [b'-%02d' % i for i in range(20, 0, -1)] + [b'%03d' % i for i in range(100)]
+            self.assertEqual(expected[:50], [deque.dequeue() for _ in range(50)])
+            self.assertEqual(expected[:49:-1], [deque.dequeue(front=False) for _ in range(70)])
+            self.assertTrue(deque.is_empty())
+            self.assertIsNone(deque.dequeue(front=False))
+            self.assertRaises(ValueError, PersistentCircularDeque, directory, 0)
+
+    def test_reopen(self):
+        """
+        Tests reopening after a clean close and after a crash, which loses everything since the last flush
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            with PersistentCircularDeque(directory, spill_threshold=64) as deque:
+                for i in range(50):
+                    deque.enqueue(bytes([i]) * 4, front=False)
+                deque.dequeue()
+                deque.dequeue(front=False)
+
+            deque = PersistentCircularDeque(directory, spill_threshold=64)
+            self.assertEqual(48, len(deque))
+            self.assertEqual(bytes([1]) * 4, deque.dequeue())
+            deque.flush()
+            # A crash: none of these operations are flushed
+            deque.dequeue()
+            for i in range(100):
+                deque.enqueue(b'lost', front=False)
+
+            deque = PersistentCircularDeque(directory, spill_threshold=64)
+            chunks = [name for name in os.listdir(directory) if name.startswith('chunk-')]
+            self.assertEqual(deque.middle.size, len(chunks))
+            self.assertEqual([bytes([i]) * 4 for i in range(2, 49)], [deque.dequeue() for _ in range(len(deque))])
+
+
+class DurableDequeTests(unittest.TestCase):
+    def test_replay(self):
+        """
+        Tests that reopening replays the log onto both backends, with snapshots in between
+        """
+        for factory in (CircularDeque, CDLLCD):
+            with tempfile.TemporaryDirectory() as directory:
+                with DurableDeque(directory, factory, fsync='never', snapshot_every=7) as deque:
+                    for i in range(20):
+                        deque.enqueue(i, front=i % 2 == 0)
+                    self.assertEqual(18, deque.dequeue())
+                    self.assertEqual(19, deque.dequeue(front=False))
+                    with deque.batch():
+                        deque.enqueue('a')
+                        deque.enqueue(('b', 1.5), front=False)
+                    expected = list(deque)
+
+                with DurableDeque(directory, factory) as deque:
+                    self.assertIsInstance(deque.deque, factory)
+                    self.assertEqual(expected, list(deque))
+                    usage = deque.memory_usage()
+                    inner = deque.deque.memory_usage()
+                    self.assertEqual(inner['live'], usage['live'])
+                    self.assertGreater(usage['total'], inner['total'])
+                    self.assertEqual('a', deque.front_element())
+                    self.assertEqual(('b', 1.5), deque.back_element())
+                    self.assertEqual(20, len(deque))
+                logs = [name for name in os.listdir(directory) if name.startswith('wal-')]
+                self.assertEqual(1, len(logs))
+
+        # The snapshot interval carries on across a restart rather than starting again from zero
+        with tempfile.TemporaryDirectory() as directory:
+            with DurableDeque(directory, fsync='never', snapshot_every=5) as deque:
+                for i in range(3):
+                    deque.enqueue(i)
+            with DurableDeque(directory, fsync='never', snapshot_every=5) as deque:
+                self.assertEqual(3, deque.logged)
+                self.assertEqual(0, deque.generation)
+                deque.enqueue(3)
+                deque.dequeue()
+                self.assertEqual(1, deque.generation)
+                self.assertEqual(0, deque.logged)
+
+    def test_torn_tail(self):
+        """
+        Tests that a record cut short by a crash is dropped and truncated away, as is one that fails its CRC
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            deque = DurableDeque(directory, fsync='always')
+            for i in range(5):
+                deque.enqueue(i, front=False)
+            deque.log.write(b'\x10\x00\x00\x00\x00\x00')
+            deque.log.close()
+            path = deque.log.name
+
+            deque = DurableDeque(directory, fsync='always')
+            self.assertEqual([0, 1, 2, 3, 4], list(deque))
+            size = os.path.getsize(path)
+            deque.enqueue(5, front=False)
+            deque.log.close()
+
+            with open(path, 'r+b') as file:
+                file.seek(-1, os.SEEK_END)
+                file.write(b'\xff')
+            deque = DurableDeque(directory, fsync='always')
+            self.assertEqual([0, 1, 2, 3, 4], list(deque))
+            self.assertEqual(size, os.path.getsize(path))
+            deque.close()
+            with DurableDeque(os.path.join(directory, 'empty')) as empty:
+                self.assertIsNone(empty.dequeue())
+
+        self.assertRaises(ValueError, DurableDeque, directory, fsync='sometimes')
+
+
+class SlidingWindowTests(unittest.TestCase):
+    def check_window(self, samples: List[float], window: SlidingWindow):
+        """
+        Asserts that every aggregate of the window matches a recomputation over the samples
+        """
+        self.assertEqual(len(samples), len(window))
+        if not samples:
+            self.assertEqual(0, window.sum())
+            self.assertIsNone(window.mean())
+            self.assertIsNone(window.min())
+            self.assertIsNone(window.max())
+            self.assertIsNone(window.variance())
+            return
+        self.assertAlmostEqual(sum(samples), window.sum())
+        self.assertAlmostEqual(statistics.fmean(samples), window.mean())
+        self.assertAlmostEqual(statistics.pvariance(samples), window.variance())
+        if len(samples) > 1:
+            self.assertAlmostEqual(statistics.stdev(samples), window.stdev(ddof=1))
+        else:
+            self.assertIsNone(window.variance(ddof=1))
+        self.assertEqual(min(samples), window.min())
+        self.assertEqual(max(samples), window.max())
+
+    def test_count_window(self):
+        """
+        Tests a count-based window against recomputation, one sample at a time and in batches
+        """
+        for size in (1, 2, 7):
+            window = SlidingWindow(size)
+            self.check_window([], window)
+            samples = []
+            for _ in range(100):
+                value = random.choice([random.randint(-5, 5), random.uniform(-100, 100)])
+                window.push(value)
+                samples.append(value)
+                self.check_window(samples[-size:], window)
+
+            window.push_many([3, 1, 2])
+            samples += [3, 1, 2]
+            self.check_window(samples[-size:], window)
+            batch = [random.randint(0, 50) for _ in range(20)]
+            window.push_many(iter(batch))
+            samples += batch
+            self.check_window(samples[-size:], window)
+            self.assertEqual(len(samples), window.pushed)
+            window.push(-1)
+            self.check_window((samples + [-1])[-size:], window)
+
+        with self.assertRaises(ValueError):
+            SlidingWindow()
+        with self.assertRaises(ValueError):
+            SlidingWindow(0)
+
+    def test_time_window(self):
+        """
+        Tests a time-based window, alone and combined with a count limit, with a fake clock
+        """
+        now = [0.0]
+        window = SlidingWindow(duration=10, clock=lambda: now[0])
+        for second in range(30):
+            now[0] = second
+            window.push(second % 7)
+            self.check_window([t % 7 for t in range(max(0, second - 9), second + 1)], window)
+        now[0] = 35
+        window.expire()
+        self.check_window([t % 7 for t in range(26, 30)], window)
+        window.expire(100)
+        self.check_window([], window)
+        with self.assertRaises(ValueError):
+            window.push(1, timestamp=50)
+            window.push(1, timestamp=49)
+
+        window = SlidingWindow(size=3, duration=5)
+        window.push_many([5, 4, 3, 2], [0, 1, 2, 3])
+        self.check_window([4, 3, 2], window)
+        window.push(9, 7)
+        self.check_window([2, 9], window)
+
+    def test_long_stream(self):
+        """
+        Tests that the aggregates stay accurate over long streams of large or offset samples
+        """
+        window = SlidingWindow(7)
+        for i in range(200000):
+            window.push(1e6 if i % 3 else -1e6)
+        window.push_many([5.0] * 7)
+        self.assertEqual(5.0, window.mean())
+        self.assertEqual(0.0, window.variance())
+        self.assertEqual(0.0, window.stdev(ddof=1))
+        self.assertEqual(35.0, window.sum())
+
+        for size, duration in ((100, None), (None, 100)):
+            window = SlidingWindow(size, duration)
+            samples = [1e9 + random.random() for _ in range(100000)]
+            window.push_many(samples, None if duration is None else range(len(samples)))
+            samples = samples[-100:]
+            self.assertAlmostEqual(sum(samples), window.sum(), delta=1e-3)
+            self.assertAlmostEqual(statistics.fmean(samples), window.mean(), delta=1e-6)
+            self.assertAlmostEqual(statistics.pvariance(samples), window.variance(), delta=1e-6)
+
+
+class LaneSchedulerTests(unittest.TestCase):
+    def test_priority(self):
+        """
+        Tests strict priority pops, one at a time and in batches across lanes
+        """
+        scheduler = LaneScheduler(3)
+        self.assertIsNone(scheduler.pop())
+        self.assertIsNone(scheduler.peek())
+        self.assertEqual([], scheduler.pop_many(5))
+        for item in range(20):
+            scheduler.push(('low', item), lane=2)
+        scheduler.push(('high', 0), lane=0)
+        scheduler.push(('mid', 0), lane=1)
+        scheduler.push(('high', -1), lane=0, front=True)
+        self.assertEqual(0b111, scheduler.bitmap)
+        self.assertEqual(23, len(scheduler))
+        self.assertGreater(scheduler.lanes[2].capacity, 20)
+
+        self.assertEqual(('high', -1), scheduler.peek())
+        self.assertEqual(('high', -1), scheduler.pop())
+        self.assertEqual(('high', 0), scheduler.pop())
+        self.assertEqual(0b110, scheduler.bitmap)
+        self.assertEqual([('mid', 0)] + [('low', item) for item in range(4)], scheduler.pop_many(5))
+        self.assertEqual(0b100, scheduler.bitmap)
+        self.assertEqual([('low', item) for item in range(4, 20)], scheduler.pop_many(100))
+        self.assertTrue(scheduler.is_empty())
+        self.assertEqual(0, scheduler.bitmap)
+
+        with self.assertRaises(IndexError):
+            scheduler.push(1, lane=3)
+        with self.assertRaises(IndexError):
+            scheduler.push(1, lane=-1)
+        with self.assertRaises(ValueError):
+            LaneScheduler(2, weights=[1])
+        with self.assertRaises(ValueError):
+            LaneScheduler(2, weights=[1, 0])
+
+    def test_fair(self):
+        """
+        Tests smooth weighted round-robin, one at a time and in batches
+        """
+        scheduler = LaneScheduler(3, weights=[3, 1, 2])
+        for item in range(12):
+            scheduler.push(item, lane=0)
+            scheduler.push(item, lane=1)
+        # lane 2 is idle, so lanes 0 and 1 share the picks 3:1
+        for _ in range(8):
+            scheduler.pop_fair()
+        self.assertEqual(6, 12 - scheduler.lanes[0].size)
+        self.assertEqual(2, 12 - scheduler.lanes[1].size)
+
+        scheduler = LaneScheduler(2, weights=[3, 1])
+        for item in range(10):
+            scheduler.push(('a', item), lane=0)
+        for item in range(2):
+            scheduler.push(('b', item), lane=1)
+        self.assertEqual([('a', 0), ('a', 1), ('b', 0), ('a', 2)], [scheduler.pop_fair() for _ in range(4)])
+        # lane 1 runs dry after one more pick, and lane 0 takes the rest of the batch
+        batch = scheduler.pop_many(6, fair=True)
+        self.assertEqual([('a', item) for item in range(3, 8)] + [('b', 1)], batch)
+        self.assertEqual(0b01, scheduler.bitmap)
+        self.assertEqual(0, scheduler.credits[1])
+        self.assertEqual([('a', 8), ('a', 9)], scheduler.pop_many(10, fair=True))
+        self.assertIsNone(scheduler.pop_fair())
+
+
+class StatsTests(unittest.TestCase):
+    def test_circular_deque(self):
+        """
+        Tests the counters, resize histograms and occupancy kept for a CircularDeque
+        """
+        cd = CircularDeque()
+        self.assertIsNone(cd.stats)
+        stats = cd.enable_stats()
+        self.assertIs(stats, cd.stats)
+        for val in range(10):
+            cd.enqueue(val, front=val % 2 == 0)
+        cd.extend(range(5))
+        cd.dequeue()
+        cd.dequeue(False)
+        cd.popmany(3, front=False)
+        snapshot = stats.snapshot()
+        self.assertEqual((5, 10, 1, 4), (snapshot['enqueued_front'], snapshot['enqueued_back'],
+                                         snapshot['dequeued_front'], snapshot['dequeued_back']))
+        self.assertEqual(15, snapshot['peak_size'])
+        self.assertEqual(10, snapshot['size'])
+        self.assertEqual(10 / cd.capacity, snapshot['occupancy'])
+        self.assertEqual(2, snapshot['grows'])
+        self.assertEqual(2, snapshot['grow_ns']['count'])
+        self.assertEqual(0, snapshot['shrinks'])
+        self.assertIsNone(snapshot['shrink_ns']['p50'])
+        while not cd.is_empty():
+            cd.dequeue()
+        self.assertGreater(stats.shrink_ns.count, 0)
+        self.assertIsNone(pickle.loads(pickle.dumps(cd)).stats)
+        cd.disable_stats()
+        cd.enqueue(1)
+        self.assertEqual(15, stats.enqueued_front + stats.enqueued_back)
+
+        bounded = CircularDeque(maxlen=2)
+        stats = bounded.enable_stats()
+        bounded.extend([1, 2, 3])
+        self.assertEqual((3, 1, 1.0), (stats.enqueued_back, stats.evictions, stats.snapshot()['occupancy']))
+
+    def test_linked(self):
+        """
+        Tests the counters kept for the linked backends
+        """
+        for cd in (CDLLCD(), UnrolledCDLLCD(block_size=2)):
+            stats = cd.enable_stats()
+            self.assertIs(stats, cd.stats)
+            for val in range(5):
+                cd.enqueue(val, front=False)
+            cd.dequeue()
+            cd.dequeue(False)
+            cd.dequeue(False)
+            snapshot = stats.snapshot()
+            self.assertEqual((0, 5, 1, 2, 5, 2), (snapshot['enqueued_front'], snapshot['enqueued_back'],
+                                                  snapshot['dequeued_front'], snapshot['dequeued_back'],
+                                                  snapshot['peak_size'], snapshot['size']))
+            self.assertIsNone(snapshot['occupancy'])
+            cd.disable_stats()
+            self.assertIsNone(cd.stats)
+
+    def test_histogram(self):
+        """
+        Tests histogram buckets, percentiles and the Prometheus export
+        """
+        histogram = LatencyHistogram(precision=3)
+        self.assertIsNone(histogram.percentile(50))
+        for value in list(range(8)) + [100, 1000, 1000]:
+            histogram.record(value)
+        self.assertEqual(3, histogram.percentile(30))
+        # 100 lands in the bucket 96..111, and 1000 in 896..1023, capped at the largest value recorded
+        self.assertEqual(111, histogram.percentile(80))
+        self.assertEqual(1000, histogram.percentile(100))
+        self.assertEqual((11, 2128, 0, 1000), (histogram.count, histogram.total, histogram.min, histogram.max))
+        self.assertEqual([(7, 8), (111, 9), (1023, 11)], histogram.buckets()[-3:])
+        for value in range(100000):
+            index = histogram._index(value)
+            self.assertLessEqual(value, histogram.bound(index))
+            self.assertGreater(value, histogram.bound(index - 1))
+
+        cd = CircularDeque()
+        cd.enable_stats()
+        for val in range(4):
+            cd.enqueue(val, front=False)
+        text = cd.stats.prometheus('jobs', {'queue': 'a'})
+        lines = text.splitlines()
+        self.assertIn('jobs_enqueued_total{queue="a",end="back"} 4', lines)
+        self.assertIn('jobs_size{queue="a"} 4', lines)
+        self.assertIn('jobs_resize_seconds_count{queue="a",kind="grow"} 1', lines)
+        self.assertIn('jobs_resize_seconds_bucket{queue="a",kind="shrink",le="+Inf"} 0', lines)
+        self.assertIn('# TYPE jobs_occupancy gauge', lines)
+        self.assertTrue(text.endswith('\n'))
+        lines = CDLLCD().enable_stats().prometheus().splitlines()
+        self.assertIn('deque_peak_size 0', lines)
+        self.assertNotIn('# TYPE deque_capacity gauge', lines)
+
+        # Label values are escaped, so every sample stays on one line
+        lines = CDLLCD().enable_stats().prometheus('q', {'path': 'C:\\jobs', 'note': 'say "hi"\nbye'}).splitlines()
+        self.assertIn('q_size{path="C:\\\\jobs",note="say \\"hi\\"\\nbye"} 0', lines)
+        self.assertTrue(all(line.startswith(('#', 'q_')) for line in lines))
+
+        # The mixin keeps a CDLLCD's stats on its CDLL, where insert and remove record them
+        cd = CDLLCD()
+        stats = cd.enable_stats()
+        self.assertIs(stats, cd.CDLL.stats)
+        cd.CDLL.insert(1)
+        self.assertEqual(1, stats.enqueued_front)
+        cd.disable_stats()
+        self.assertIsNone(cd.CDLL.stats)
+
+
+class MemoryUsageTests(unittest.TestCase):
+    def check_report(self, usage):
+        """
+        Checks that a memory_usage report adds up
+        """
+        self.assertEqual(usage['live'] + usage['slack'] + usage['overhead'] + usage['payload'], usage['total'])
+        for key in ('live', 'slack', 'overhead', 'payload'):
+            self.assertGreaterEqual(usage[key], 0)
+
+    def test_circular_deque(self):
+        """
+        Tests that live and slack cover the whole list and that the list is counted at all
+        """
+        pointer = sys.getsizeof([None]) - sys.getsizeof([])
+        cd = CircularDeque()
+        for i in range(5):
+            cd.enqueue(i, False)
+        usage = cd.memory_usage()
+        self.check_report(usage)
+        self.assertEqual(5 * pointer, usage['live'])
+        self.assertEqual((cd.capacity - 5) * pointer, usage['slack'])
+        self.assertEqual(sys.getsizeof(cd) + sys.getsizeof(cd.queue), usage['total'])
+        self.assertEqual(0, usage['payload'])
+
+        # An item held twice is only counted once
+        shared = 'x' * 1000
+        cd.enqueue(shared)
+        cd.enqueue(shared)
+        expected = sum(sys.getsizeof(i) for i in range(5)) + sys.getsizeof(shared)
+        self.assertEqual(expected, cd.memory_usage(deep=True)['payload'])
+
+        typed = TypedCircularDeque(dtype=int)
+        typed.extend(range(5))
+        usage = typed.memory_usage(deep=True)
+        self.check_report(usage)
+        self.assertEqual(5 * typed.queue.itemsize, usage['live'])
+        self.assertEqual(0, usage['payload'])
+        self.assertEqual(sys.getsizeof(typed) + sys.getsizeof(typed.queue), usage['total'])
+
+    def test_linked(self):
+        """
+        Tests that every node is counted, and pooled nodes as slack
+        """
+        cdll = CDLLCD(pool_size=4)
+        empty = cdll.memory_usage()['total']
+        for i in range(10):
+            cdll.enqueue(i, False)
+        usage = cdll.memory_usage()
+        self.check_report(usage)
+        self.assertEqual(empty + 10 * usage['per_node'], usage['total'])
+        self.assertEqual(0, usage['slack'])
+        for _ in range(3):
+            cdll.dequeue()
+        usage = cdll.memory_usage()
+        self.assertEqual(3 * usage['per_node'], usage['slack'])
+        self.assertEqual(empty + 10 * usage['per_node'], usage['total'])
+
+        unrolled = UnrolledCDLLCD(block_size=4)
+        for i in range(10):
+            unrolled.enqueue(i, False)
+        usage = unrolled.memory_usage(deep=True)
+        self.check_report(usage)
+        pointer = sys.getsizeof([None]) - sys.getsizeof([])
+        self.assertEqual(len(unrolled.blocks) * 4 * pointer, usage['live'] + usage['slack'])
+        self.assertEqual(sum(sys.getsizeof(i) for i in range(10)), usage['payload'])
+
+    def test_other_backends(self):
+        """
+        Tests memory_usage on the concurrent, async and shared memory deques
+        """
+        concurrent = ConcurrentCircularDeque()
+        concurrent.put(1)
+        self.check_report(concurrent.memory_usage())
+        self.assertGreater(concurrent.memory_usage()['overhead'], concurrent.deque.memory_usage()['overhead'])
+
+        spsc = SPSCCircularDeque(8)
+        spsc.enqueue('a')
+        usage = spsc.memory_usage(deep=True)
+        self.check_report(usage)
+        self.assertEqual(sys.getsizeof('a'), usage['payload'])
+        self.assertEqual(sys.getsizeof(spsc) + sys.getsizeof(spsc.queue), usage['total'] - usage['payload'])
+
+        self.check_report(AsyncCircularDeque().memory_usage())
+
+        with SharedCircularDeque(capacity=4, record_size=16) as shared:
+            shared.enqueue(b'abc')
+            usage = shared.memory_usage()
+            self.check_report(usage)
+            self.assertEqual(shared.slot_size, usage['live'])
+            self.assertEqual(3 * shared.slot_size, usage['slack'])
+
+
+class BenchmarkTests(unittest.TestCase):
+    def test_run_benchmarks(self):
+        """
+        Smoke tests every scenario at a tiny size
+        """
+        results = benchmarks.run_benchmarks(sizes=[8], warmup=0, trials=2)
+        self.assertEqual(set(benchmarks.SCENARIOS), {row['scenario'] for row in results})
+        for row in results:
+            self.assertLessEqual(row['min'], row['median'])
+            self.assertLessEqual(row['median'], row['p99'])
+
+        results = benchmarks.run_benchmarks(['grow'], [8], ['array'], warmup=0, trials=1)
+        self.assertEqual([('grow', 'array', 8)], [(row['scenario'], row['variant'], row['size']) for row in results])
+
+        # churn reports node allocations alongside the timings
+        results = {row['variant']: row for row in benchmarks.run_benchmarks(['churn'], [200], warmup=0, trials=1)}
+        self.assertEqual(200, results['cdll']['allocations'])
+        self.assertEqual(0, results['cdll']['pool_hits'])
+        self.assertEqual(200, results['cdll_pooled']['allocations'] + results['cdll_pooled']['pool_hits'])
+        self.assertLess(results['cdll_pooled']['allocations'], 200)
+
+    def test_compare(self):
+        """
+        Tests percentile and regression detection against a baseline
+        """
+        self.assertEqual(99, benchmarks.percentile(list(range(100, 0, -1)), 99))
+        self.assertEqual(1, benchmarks.percentile([3, 1, 2], 0))
+
+        baseline = [{'scenario': 'grow', 'variant': 'array', 'size': 8, 'median': 1.0},
+                    {'scenario': 'grow', 'variant': 'cdll', 'size': 8, 'median': 1.0}]
+        results = [{'scenario': 'grow', 'variant': 'array', 'size': 8, 'median': 1.05},
+                   {'scenario': 'grow', 'variant': 'cdll', 'size': 8, 'median': 1.5},
+                   {'scenario': 'grow', 'variant': 'unrolled', 'size': 8, 'median': 9.0}]
+        regressions = benchmarks.compare(results, baseline, threshold=0.1)
+        self.assertEqual(['cdll'], [row['variant'] for row in regressions])
+        self.assertEqual(1.5, regressions[0]['ratio'])
+
+    def test_run_memory(self):
+        """
+        Tests the memory benchmark rows
+        """
+        results = benchmarks.run_memory([100])
+        self.assertEqual(set(benchmarks.BACKENDS), {row['variant'] for row in results})
+        for row in results:
+            self.assertEqual(row['total'] / 100, row['bytes_per_item'])
+        self.assertIn('bytes/item', benchmarks.format_memory_table(results))
+
+
 if __name__ == '__main__':
     unittest.main()